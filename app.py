@@ -1,4 +1,6 @@
 import os
+import sys
+import subprocess
 import random
 import string
 import threading
@@ -12,14 +14,16 @@ from flask import Flask, render_template, request, redirect, url_for, jsonify, s
 from werkzeug.middleware.proxy_fix import ProxyFix
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-import yfinance as yf
 
 # Importations de nos modules core
-from core.database import init_db, get_db_connection
-from core.analysis import analyze_stock, analyze_sentiment, create_stock_chart
+from core.database import init_db, get_db_connection, normalize_sector
+from core.analysis import analyze_stock, analyze_sentiment, create_stock_chart, sentiment_label as sentiment_label_for
 from core.market import MARKET_STATE, market_lock, fetch_market_data_job, get_global_context
 from core.legal import get_company_legal_info
-from core.news import get_combined_news
+from core.geopolitics import risk_history, risk_trend
+from core.news_ingest import ingest_news, get_symbol_news, ingest_pending
+from core.news_store import get_news_store
+from core.data_source import get_ticker
 from core.auth import hash_password, check_password, generate_code, generate_token, register_device, is_device_recognized
 from core.mailer import send_auth_email
 
@@ -80,17 +84,25 @@ scheduler = BackgroundScheduler()
 # On ajoute le job avec next_run_time=datetime.now() pour qu'il démarre immédiatement
 scheduler.add_job(func=fetch_market_data_job, trigger=IntervalTrigger(minutes=20), id='mkt_job', next_run_time=datetime.now())
 # Planification de l'entraînement des modèles IA s'ils n'existent pas encore ou pour les mettre à jour périodiquement
-# Ici, on l'exécute une fois au démarrage si les modèles ne sont pas trouvés
+# L'entraînement tourne dans un processus séparé (pool retrain_ai_models.py) : le worker web n'entraîne jamais
+training_process = None
+
 def train_models_if_needed():
+    global training_process
     symbols_to_train = ["AI.PA", "MC.PA", "MC.PA", "OR.PA", "SAN.PA", "ACA.PA", "BNP.PA", "GLE.PA", "CS.PA", "ABI.PA", "VIE.PA"] # Exemple de quelques symboles
-    for symbol in symbols_to_train:
-        for horizon in ml_predictor.horizons.keys():
-            model_path = os.path.join(ml_predictor.model_dir, f"{symbol}_{horizon}.joblib")
-            if not os.path.exists(model_path):
-                logger.info(f"Modèle pour {symbol} horizon {horizon} non trouvé, entraînement...")
-                ml_predictor.train_for_horizons(symbol)
-                break # Entraîner pour ce symbole une fois suffit si on trouve un modèle manquant
-
+    symbols_to_train = list(dict.fromkeys(symbols_to_train))
+
+    with t_lock:
+        if training_process is not None and training_process.poll() is None:
+            logger.info("Entraînement IA déjà en cours, cycle ignoré.")
+            return
+        # Mise à jour incrémentale quotidienne : les modèles manquants ou en dérive sont réentraînés complètement
+        logger.info(f"Rafraîchissement des modèles IA pour {len(symbols_to_train)} valeurs...")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'retrain_ai_models.py')
+        training_process = subprocess.Popen([sys.executable, script, '--incremental', *symbols_to_train], start_new_session=True)
+
+# Ingestion des actualités en arrière-plan : les pages ne lisent que le NewsStore
+scheduler.add_job(func=ingest_news, trigger=IntervalTrigger(minutes=15), id='news_job', next_run_time=datetime.now() + timedelta(seconds=30))
 scheduler.add_job(func=train_models_if_needed, trigger=IntervalTrigger(days=1), id='train_job', next_run_time=datetime.now() + timedelta(minutes=5)) # Entraînement quotidien après le démarrage
 
 scheduler.start()
@@ -380,23 +392,16 @@ def ultra_analyze():
         df = MARKET_STATE['dataframes'].get(symbol)
 
     news_list = []
+    news_ingesting = False
     analyst_info = "N/A"
     sentiment_label = "Neutre"
     
     # Force sync fetch if not in cache or if cache is empty skeleton
     if df is None or (info and info.get('price', 0) == 0):
         try:
-            ticker_obj = yf.Ticker(symbol)
+            ticker_obj = get_ticker(symbol)
             df = ticker_obj.history(period="1y") # On garde 1 an pour l'analyse technique visuelle
             
-            # Récupération sécurisée des actualités
-            news_list = []
-            try:
-                if ticker_obj.news:
-                    news_list = ticker_obj.news[:5]
-            except: 
-                logger.warning(f"Impossible de récupérer les news pour {symbol}")
-            
             # Récupération des objectifs de cours des analystes
             target_price = "N/A"
             try:
@@ -414,7 +419,7 @@ def ultra_analyze():
                 sector = "Divers"
                 try:
                     long_name = ticker_obj.info.get('longName', symbol)
-                    sector = ticker_obj.info.get('sector', ticker_obj.info.get('quoteType', 'Inconnu'))
+                    sector = normalize_sector(ticker_obj.info.get('sector', ticker_obj.info.get('quoteType')))
                 except: pass
 
                 info = {
@@ -436,13 +441,9 @@ def ultra_analyze():
         except Exception as e:
             logger.error(f"Sync fetch error for {symbol}: {e}")
     else:
-        # Si on a les données du cache, on tente de récupérer la reco analyste et les news
-        news_list = []
+        # Si on a les données du cache, on tente de récupérer la reco analyste
         try:
-            ticker_obj = yf.Ticker(symbol)
-            if ticker_obj.news:
-                news_list = ticker_obj.news[:5]
-            
+            ticker_obj = get_ticker(symbol)
             analyst_info = info.get('analyst_reco', 'N/A')
             if analyst_info == 'N/A':
                 raw_reco = ticker_obj.info.get('recommendationKey', 'N/A').replace('_', ' ').title()
@@ -453,10 +454,20 @@ def ultra_analyze():
                 target_price = ticker_obj.info.get('targetMeanPrice', 'N/A')
         except: pass
 
-    sentiment_score, sentiment_label = analyze_sentiment(news_list)
-    
     # Infos Légales (Site Web)
     legal_info = get_company_legal_info(symbol)
+
+    # Actualités et sentiment précalculés par l'ingestion (aucune source interrogée ici)
+    try:
+        news_list = get_symbol_news(symbol, legal_info['name'] if legal_info else None)
+        news_ingesting = ingest_pending(symbol)
+        sentiment_score, scored = get_news_store().sentiment(symbol)
+        if scored:
+            sentiment_label = sentiment_label_for(sentiment_score)
+        else:
+            sentiment_score, sentiment_label = analyze_sentiment(news_list)
+    except Exception as e:
+        logger.error(f"Error reading news for {symbol}: {e}")
     if info: # S'assurer que 'info' existe avant d'y ajouter des clés
         info['legal_info'] = legal_info
         info['sentiment_score'] = sentiment_score
@@ -492,10 +503,8 @@ def ultra_analyze():
     currency_code = 'EUR'
     try:
         if df is not None and not df.empty:
-            ticker_obj = yf.Ticker(symbol)
+            ticker_obj = get_ticker(symbol)
             currency_code = ticker_obj.info.get('currency', 'EUR')
-            # Actualités enrichies (Google News + Yahoo)
-            news_list = get_combined_news(ticker_obj, symbol, legal_info['name'] if legal_info else None)
     except: pass
     currency_symbol = CURRENCY_MAP.get(currency_code, currency_code)
 
@@ -504,7 +513,7 @@ def ultra_analyze():
     if info and df is not None and not df.empty:
         try:
             # Utilise le nouveau modèle pour obtenir des prédictions multi-horizons
-            ai_predictions = ml_predictor.predict_future(symbol) 
+            ai_predictions = ml_predictor.predict_future(symbol, sector=info.get('sector')) 
             
             # Suppression de l'auto-train ici pour éviter de saturer la RAM du serveur web
             if not ai_predictions:
@@ -548,6 +557,7 @@ def ultra_analyze():
             'version': VERSION,
             'last_update': MARKET_STATE['last_update'], 
             'news': news_list, 
+            'news_ingesting': news_ingesting,
             'website_url': legal_info.get('website') if legal_info else None,
             'analyst_recommendation': analyst_info,
             'analyst_target': target_price,
@@ -665,10 +675,14 @@ def geopolitical_details():
         with market_lock:
             geo_data = MARKET_STATE.get('geopolitics', {})
         
+        # Tendance lue dans l'historique persisté (aucun flux relu ici)
+        history = risk_history(days=7)
         return render_template('geopolitics_details.html', 
                                score=geo_data.get('risk_score', 50),
                                verdict=geo_data.get('verdict', 'Neutre'),
-                               top_events=geo_data.get('top_events', []))
+                               top_events=geo_data.get('top_events', []),
+                               history=history,
+                               trend=risk_trend(history))
     except Exception as e:
         logger.error(f"Error in geopolitics route: {e}")
         return redirect(url_for('ultra_analyze'))
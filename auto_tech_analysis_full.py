@@ -1,13 +1,13 @@
 import os
 import sys
 import pandas as pd
-import yfinance as yf
 import sqlite3
 from datetime import datetime
 
 # Ajouter le chemin du projet pour l'importation des modules core
 sys.path.append('/home/corentin/trade-analyser-bourse')
 from core.analysis import analyze_stock
+from core.data_source import get_ticker
 
 def get_all_symbols():
     try:
@@ -32,7 +32,7 @@ def run_comprehensive_analysis():
     
     for symbol, sector in symbols_info:
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = get_ticker(symbol)
             df = ticker.history(period="1y", timeout=10)
             if df is None or df.empty:
                 continue
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import argparse
+import logging
+import statistics
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.data_source import Archive, RecordingSource, ReplaySource, LiveSource, set_data_source, DEFAULT_ARCHIVE
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - BENCH - %(levelname)s - %(message)s'
+)
+
+def parse_latency(value):
+    low, _, high = value.partition('-')
+    return (float(low), float(high or low))
+
+def timed(func, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reproductible du moteur (cycle marché, /analyze, corrélateur)")
+    parser.add_argument("--mode", choices=["live", "record", "replay"], default="replay", help="record : capture l'archive, replay : rejeu hors-ligne")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE, help="Répertoire de l'archive")
+    parser.add_argument("--latency", default="0", help="Latence synthétique en ms (ex: 50 ou 20-200)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Taux d'erreurs simulées (0 à 1)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du rejeu")
+    parser.add_argument("--runs", type=int, default=3, help="Répétitions par cible")
+    parser.add_argument("--targets", default="market,analyze,correlator", help="Cibles séparées par des virgules")
+    parser.add_argument("--symbol", default="AI.PA", help="Symbole pour /analyze")
+    args = parser.parse_args()
+
+    if args.mode == "live":
+        source = LiveSource()
+    elif args.mode == "record":
+        source = RecordingSource(Archive(args.archive))
+    else:
+        source = ReplaySource(Archive(args.archive), parse_latency(args.latency), args.error_rate, args.seed)
+    # La source doit être en place avant l'import de l'application (le scheduler démarre à l'import)
+    set_data_source(source)
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    benchmarks = {}
+    if "market" in targets or "analyze" in targets:
+        import app as web
+        # Arrêt du scheduler (on attend le cycle lancé au démarrage) pour mesurer sans interférence
+        web.scheduler.shutdown(wait=True)
+        client = web.app.test_client()
+        if "market" in targets:
+            from core.market import fetch_market_data_job
+            benchmarks["market"] = fetch_market_data_job
+        if "analyze" in targets:
+            benchmarks["analyze"] = lambda: client.get(f"/analyze?symbol={args.symbol}")
+    if "correlator" in targets:
+        from intel_correlator import correlate_and_analyze
+        benchmarks["correlator"] = correlate_and_analyze
+
+    print(f"📊 Benchmark en mode {args.mode} ({args.runs} passes)")
+    for name, func in benchmarks.items():
+        durations = timed(func, args.runs)
+        print(f"⏱️  {name:<12} min {min(durations):7.3f}s | médiane {statistics.median(durations):7.3f}s | max {max(durations):7.3f}s")
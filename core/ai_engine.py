@@ -1,31 +1,77 @@
-import json
-import os
+import time
+import threading
+from collections import deque
+
+from .event_store import get_event_store
+
+RING_SIZE = 100             # Événements conservés en mémoire par symbole
+REFRESH_INTERVAL = 5.0      # Relecture incrémentale du journal au plus toutes les 5 s
 
 class FinancialAI:
-    def __init__(self, memory_file="/home/corentin/trade-analyser-bourse/market_memory.json"):
-        self.memory_file = memory_file
-        self.memory = self.load_memory()
+    """
+    Mémoire des événements indexée par symbole (tampons circulaires) et tenue à jour de façon
+    incrémentale depuis le journal d'événements : seuls les seq nouveaux et les analyses
+    arrivées depuis sur les événements en attente sont relus.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self._lock = threading.Lock()
+        self.memory = {}            # symbole -> deque des derniers événements
+        self.latest_analyzed = {}   # symbole -> dernier événement analysé
+        self._pending = {}          # seq -> événement encore sans analyse
+        self._last_seq = 0
+        self._refreshed_at = 0.0
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_event_store()
+        return self._store
 
-    def load_memory(self):
-        if os.path.exists(self.memory_file):
-            with open(self.memory_file, 'r') as f:
-                return json.load(f)
-        return []
+    def _track(self, event):
+        if 'analysis' in event:
+            current = self.latest_analyzed.get(event['symbol'])
+            if current is None or event['seq'] > current['seq']:
+                self.latest_analyzed[event['symbol']] = event
+        else:
+            self._pending[event['seq']] = event
 
-    def get_prediction(self, current_price, current_vol, symbol):
+    def refresh(self, force=False):
+        """Intègre les nouveaux événements (seq > dernier lu) et les analyses des événements en attente."""
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < REFRESH_INTERVAL:
+                return
+            for event in self.store.events(after_seq=self._last_seq):
+                self.memory.setdefault(event['symbol'], deque(maxlen=RING_SIZE)).append(event)
+                self._last_seq = event['seq']
+                self._track(event)
+
+            if self._pending:
+                for seq, analysis in self.store.analyses(self._pending).items():
+                    event = self._pending.pop(seq)
+                    event['analysis'] = analysis
+                    self._track(event)
+                # Les événements sortis des tampons ne sont plus suivis
+                oldest = {symbol: events[0]['seq'] for symbol, events in self.memory.items() if events}
+                self._pending = {seq: e for seq, e in self._pending.items() if seq >= oldest.get(e['symbol'], 0)}
+            self._refreshed_at = time.monotonic()
+
+    def get_prediction(self, current_price, current_vol, symbol, refresh=True):
         """
         Analyse la situation actuelle par rapport aux souvenirs et aux analyses de news.
         """
+        if refresh:
+            self.refresh()
         if not self.memory:
             return "Analyse en cours (manque de données historiques)...", 50
 
-        # Récupérer les événements les plus récents pour le symbole donné
-        recent_events = [e for e in self.memory if e.get('symbol') == symbol and 'analysis' in e]
+        # Dernier événement analysé du symbole (index, O(1))
+        last_analyzed_event = self.latest_analyzed.get(symbol)
         
-        if not recent_events:
+        if not last_analyzed_event:
             return "Tendance neutre. Aucun événement récent analysé.", 50
 
-        last_analyzed_event = recent_events[-1]
         analysis = last_analyzed_event['analysis']
         
         # Logique de prédiction améliorée:
@@ -63,11 +109,11 @@ class FinancialAI:
 
         return prediction, confidence
         
-    def get_next_session_recommendation(self, symbol: str) -> (str, int):
+    def get_next_session_recommendation(self, symbol: str, refresh: bool = True) -> (str, int):
         """
         Génère une recommandation simple pour la prochaine session basée sur la dernière analyse intraday.
         """
-        prediction, confidence = self.get_prediction(0, 0, symbol) # current_price et current_vol sont ignorés pour cette méthode
+        prediction, confidence = self.get_prediction(0, 0, symbol, refresh=refresh) # current_price et current_vol sont ignorés pour cette méthode
         
         recommendation = "Observer"
         reco_confidence = 50 # Confiance spécifique à la recommandation
@@ -87,5 +133,11 @@ class FinancialAI:
         
         return recommendation, reco_confidence
 
-# Instance globale
+    def get_next_session_recommendations(self, symbols=None) -> dict:
+        """Recommandations de tout l'univers (ou des symboles indiqués) en une passe, après une seule relecture."""
+        self.refresh()
+        symbols = list(self.latest_analyzed) if symbols is None else symbols
+        return {symbol: self.get_next_session_recommendation(symbol, refresh=False) for symbol in symbols}
+
+# Instance globale (le journal n'est lu qu'au premier appel)
 ai_brain = FinancialAI()
@@ -51,30 +51,49 @@ def scan_for_critical_alerts(market_state):
     
     return alerts
 
+# Destinataires des alertes en une requête : abonnés actifs aux symboles en alerte,
+# plus les utilisateurs actifs sans abonnement (symbol NULL) qui reçoivent tout
+RECIPIENTS_QUERY = """
+    SELECT s.email, s.symbol FROM alert_subscriptions s
+    JOIN users u ON u.email = s.email
+    WHERE u.is_active = 1 AND s.symbol IN ({placeholders})
+    UNION ALL
+    SELECT u.email, NULL FROM users u
+    WHERE u.is_active = 1
+      AND NOT EXISTS (SELECT 1 FROM alert_subscriptions s WHERE s.email = u.email)
+"""
+
+def build_digests(alerts, recipients):
+    """
+    Regroupe les alertes par destinataire en une passe sur les couples (email, symbole) :
+    {email: [alertes]} dans l'ordre d'origine. symbole None = toutes les alertes.
+    """
+    by_symbol = {}
+    for index, alert in enumerate(alerts):
+        by_symbol.setdefault(alert['symbol'], []).append(index)
+
+    matched = {}
+    for email, symbol in recipients:
+        if symbol is None:
+            matched[email] = None
+        else:
+            matched.setdefault(email, []).extend(by_symbol.get(symbol, ()))
+
+    return {email: alerts if indexes is None else [alerts[i] for i in sorted(indexes)]
+            for email, indexes in matched.items() if indexes is None or indexes}
+
 def send_global_alert_report(alerts):
     """Envoie un rapport récapitulatif des alertes aux administrateurs/utilisateurs."""
     try:
+        symbols = sorted({a['symbol'] for a in alerts})
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            # On récupère tous les utilisateurs actifs
-            cursor.execute("SELECT email FROM users WHERE is_active = 1")
-            users = [row[0] for row in cursor.fetchall()]
-            
-            for email in users:
-                # Récupérer les abonnements de l'utilisateur
-                cursor.execute("SELECT symbol FROM alert_subscriptions WHERE email = ?", (email,))
-                subs = [row[0] for row in cursor.fetchall()]
-                
-                # Filtrer les alertes pour cet utilisateur
-                if subs:
-                    user_alerts = [a for a in alerts if a['symbol'] in subs]
-                else:
-                    # Si aucun abonnement, on envoie tout par défaut (ou rien, selon votre choix)
-                    user_alerts = alerts 
+            cursor.execute(RECIPIENTS_QUERY.format(placeholders=','.join('?' * len(symbols))), symbols)
+            digests = build_digests(alerts, cursor.fetchall())
+
+        for email, user_alerts in digests.items():
+            send_individual_alert(email, user_alerts)
 
-                if user_alerts:
-                    send_individual_alert(email, user_alerts)
-                    
     except Exception as e:
         logger.error(f"Erreur envoi alertes personnalisées: {e}")
 
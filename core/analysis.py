@@ -7,12 +7,21 @@ from core.geopolitics import analyze_global_risk
 
 logger = logging.getLogger("TradingEngine.Analysis")
 
+# Seuils de la logique de décision (partagés avec le rejeu historique de core/event_study.py)
+RSI_BUY_DIP = 40          # Tendance haussière : repli passager = point d'entrée
+RSI_OVERBOUGHT = 70       # Tendance haussière : surchauffe
+RSI_BEAR_REBOUND = 65     # Tendance baissière : rebond qui s'essouffle
+RSI_OVERSOLD = 25         # Tendance baissière : survente
+GEO_ALERT_SCORE = 35      # En dessous : alerte géopolitique
+SQUEEZE_WIDTH = 0.05      # Largeur relative des bandes de Bollinger
+MIN_HISTORY = 30          # Barres minimales pour analyser
+
 def analyze_stock(df):
     try:
         # --- RÉCUPÉRATION DU CONTEXTE GÉOPOLITIQUE ---
         geo_score, geo_verdict, _ = analyze_global_risk()
         
-        if df is None or len(df) < 30:
+        if df is None or len(df) < MIN_HISTORY:
             return "Neutre", "Données insuffisantes", 50, 0, 0, None, 0, 0, 0
             
         # --- NORMALISATION DES COLONNES (Gère tous les formats de yfinance) ---
@@ -54,9 +63,9 @@ def analyze_stock(df):
 
         if mm200 and not pd.isna(mm200):
             if close > mm200: # Tendance de fond HAUSSIÈRE
-                if rsi < 40:
+                if rsi < RSI_BUY_DIP:
                     reco, reason = "Achat", f"Le titre est dans une bonne dynamique à long terme (au-dessus de sa moyenne 200 jours). Le RSI ({rsi:.0f}) montre une petite baisse passagère, ce qui offre un bon point d'entrée pour acheter."
-                elif rsi > 70:
+                elif rsi > RSI_OVERBOUGHT:
                     reco, reason = "Prudence", f"La tendance est solide, mais le titre a beaucoup monté récemment (RSI à {rsi:.1f}). Il est préférable d'attendre un petit repli avant d'acheter, ou de prendre quelques bénéfices."
                 else:
                     if close > bb_upper:
@@ -64,15 +73,15 @@ def analyze_stock(df):
                     else:
                         reco, reason = "Conserver", f"La tendance de fond reste positive. Le prix se maintient bien au-dessus de sa moyenne de long terme (200 jours). C'est un comportement sain."
             else: # Tendance de fond BAISSIÈRE
-                if rsi > 65:
+                if rsi > RSI_BEAR_REBOUND:
                     reco, reason = "Vendre", f"Méfiance : le titre tente de remonter mais il reste sous sa tendance de fond (moyenne 200 jours). Le RSI ({rsi:.0f}) indique que ce rebond perd déjà de sa force."
-                elif rsi < 25:
+                elif rsi < RSI_OVERSOLD:
                     reco, reason = "Spéculatif", "Le titre a lourdement chuté et semble 'survendu'. Un rebond technique est possible, mais c'est un pari risqué car la tendance générale reste baissière."
                 else:
                     reco, reason = "Vendre", "Le titre montre des signes de faiblesse et reste sous sa moyenne mobile 200 jours. La prudence est de mise, la direction reste orientée à la baisse."
 
         # --- AJUSTEMENT PAR LE RISQUE GÉOPOLITIQUE ---
-        if geo_score < 35: # Risque Géopolitique ÉLEVÉ ou ALERTE ROUGE
+        if geo_score < GEO_ALERT_SCORE: # Risque Géopolitique ÉLEVÉ ou ALERTE ROUGE
             if reco in ["Achat", "Achat Fort"]:
                 reco = "Prudence"
                 reason = f"⚠️ [ALERTE GÉOPOLITIQUE] : {geo_verdict}. Bien que les signaux techniques soient d'achat, le contexte mondial est trop instable pour ouvrir de nouvelles positions."
@@ -84,7 +93,7 @@ def analyze_stock(df):
 
         # 2. Détection de Squeeze de Volatilité
         bb_width = (bb_upper - bb_lower) / mm20 if mm20 != 0 else 1
-        if bb_width < 0.05:
+        if bb_width < SQUEEZE_WIDTH:
             reason += " | NOTE : Les prix sont très resserrés, un mouvement important (hausse ou baisse) se prépare probablement."
         
         return reco, reason, float(rsi), float(mm20), float(mm50), None, float(mm200 or 0), float(close*0.98), float(close*1.05)
@@ -95,58 +104,56 @@ def analyze_stock(df):
         logger.error(f"Analysis Error: {e}")
         return "Erreur", "Problème technique", 50, 0, 0, None, 0, 0, 0
 
+# --- DICTIONNAIRE FINANCIER PONDÉRÉ (Standard Académique) ---
+FIN_LEXICON = {
+    # Positif
+    'croissance': 0.8, 'profit': 0.9, 'dividende': 0.7, 'hausse': 0.6, 'envolée': 0.8,
+    'acquisition': 0.6, 'contrat': 0.7, 'excédent': 0.8, 'surperformer': 0.9,
+    'recommandation': 0.5, 'fusion': 0.6, 'record': 0.8, 'succès': 0.7, 'objectif': 0.5,
+    'achat': 0.7, 'strong buy': 1.0, 'positive': 0.6, 'croissant': 0.6,
+
+    # Négatif
+    'chute': -0.8, 'baisse': -0.6, 'perte': -0.9, 'déficit': -0.9, 'alerte': -0.7,
+    'avertissement': -0.8, 'sanction': -0.7, 'effondre': -0.9, 'sous-performer': -0.9,
+    'litige': -0.6, 'procès': -0.7, 'dette': -0.5, 'restructuration': -0.4,
+    'décevant': -0.7, 'crise': -0.8, 'krach': -1.0, 'vente': -0.7, 'negative': -0.6,
+    'inflation': -0.4, 'incertitude': -0.5, 'plonge': -0.8
+}
+
+def score_title(title):
+    """Score de sentiment d'un titre (-1 à 1)."""
+    text = (title or '').lower()
+
+    # 1. Analyse par dictionnaire financier (Prioritaire)
+    fin_score = 0
+    matches = 0
+    for word, score in FIN_LEXICON.items():
+        if word in text:
+            fin_score += score
+            matches += 1
+
+    # Si on a trouvé des termes financiers, on privilégie ce score
+    if matches > 0:
+        return fin_score / matches
+    # 2. Backup vers TextBlob si aucun mot clé financier n'est trouvé
+    return TextBlob(text).sentiment.polarity
+
+def sentiment_label(avg):
+    # Classification plus fine
+    if avg > 0.2: return "Très Positif"
+    elif avg > 0.05: return "Positif"
+    elif avg < -0.2: return "Très Négatif"
+    elif avg < -0.05: return "Négatif"
+    return "Neutre"
+
 def analyze_sentiment(news_list):
     if not news_list: return 0, "Neutre"
-    
-    # --- DICTIONNAIRE FINANCIER PONDÉRÉ (Standard Académique) ---
-    FIN_LEXICON = {
-        # Positif
-        'croissance': 0.8, 'profit': 0.9, 'dividende': 0.7, 'hausse': 0.6, 'envolée': 0.8,
-        'acquisition': 0.6, 'contrat': 0.7, 'excédent': 0.8, 'surperformer': 0.9,
-        'recommandation': 0.5, 'fusion': 0.6, 'record': 0.8, 'succès': 0.7, 'objectif': 0.5,
-        'achat': 0.7, 'strong buy': 1.0, 'positive': 0.6, 'croissant': 0.6,
-        
-        # Négatif
-        'chute': -0.8, 'baisse': -0.6, 'perte': -0.9, 'déficit': -0.9, 'alerte': -0.7,
-        'avertissement': -0.8, 'sanction': -0.7, 'effondre': -0.9, 'sous-performer': -0.9,
-        'litige': -0.6, 'procès': -0.7, 'dette': -0.5, 'restructuration': -0.4,
-        'décevant': -0.7, 'crise': -0.8, 'krach': -1.0, 'vente': -0.7, 'negative': -0.6,
-        'inflation': -0.4, 'incertitude': -0.5, 'plonge': -0.8
-    }
-
-    sentiments = []
-    for n in news_list:
-        text = n.get('title', '').lower()
-        
-        # 1. Analyse par dictionnaire financier (Prioritaire)
-        fin_score = 0
-        words = text.split()
-        matches = 0
-        for word, score in FIN_LEXICON.items():
-            if word in text:
-                fin_score += score
-                matches += 1
-        
-        # Si on a trouvé des termes financiers, on privilégie ce score
-        if matches > 0:
-            final_score = fin_score / matches
-        else:
-            # 2. Backup vers TextBlob si aucun mot clé financier n'est trouvé
-            blob = TextBlob(text)
-            final_score = blob.sentiment.polarity
-            
-        sentiments.append(final_score)
-        
+
+    # Score déjà calculé à l'ingestion (NewsStore) ou calculé à la volée
+    sentiments = [n['sentiment'] if n.get('sentiment') is not None else score_title(n.get('title', ''))
+                  for n in news_list]
     avg = sum(sentiments) / len(sentiments) if sentiments else 0
-    
-    # Classification plus fine
-    if avg > 0.2: label = "Très Positif"
-    elif avg > 0.05: label = "Positif"
-    elif avg < -0.2: label = "Très Négatif"
-    elif avg < -0.05: label = "Négatif"
-    else: label = "Neutre"
-    
-    return avg, label
+    return avg, sentiment_label(avg)
 
 def create_stock_chart(df, symbol):
     try:
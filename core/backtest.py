@@ -0,0 +1,194 @@
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from . import indicators
+from .http_cache import yf_session
+
+logger = logging.getLogger("TradingEngine.Backtest")
+
+TRADING_DAYS = 252
+
+def load_price_panel(symbols, years=2, end_date=None):
+    """Télécharge l'historique de plusieurs valeurs en un appel et l'aligne en panel {champ: DataFrame dates x symboles}."""
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=years * 365)
+    raw = yf.download(list(symbols), start=start_date, end=end_date, auto_adjust=True, progress=False, group_by='column', session=yf_session())
+    if raw is None or raw.empty:
+        return {}
+
+    panel = {}
+    for field in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        frame = raw[field]
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame(symbols[0])
+        panel[field.lower()] = frame.reindex(columns=list(symbols))
+    return panel
+
+def panel_from_frames(frames):
+    """Construit un panel aligné à partir de DataFrames individuels (colonnes open/high/low/close)."""
+    panel = {}
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        columns = {}
+        for symbol, df in frames.items():
+            lower = {str(c).lower(): c for c in df.columns}
+            if field in lower:
+                columns[symbol] = df[lower[field]]
+        panel[field] = pd.DataFrame(columns)
+    return panel
+
+def strategy_indicators(panel, bb_length=20, bb_std=2.0, adx_length=14, rsi_length=14, sma_length=200):
+    """Indicateurs de la stratégie ADX / Bollinger / MM200 pour tout le panel."""
+    close = panel['close']
+    bb_lower, bb_mid, bb_upper = indicators.bollinger(close, bb_length, bb_std)
+    return {
+        'adx': indicators.adx(panel['high'], panel['low'], close, adx_length),
+        'bb_upper': bb_upper,
+        'bb_lower': bb_lower,
+        'bb_width': (bb_upper - bb_lower) / bb_mid,
+        'rsi': indicators.rsi(close, rsi_length),
+        'sma': indicators.sma(close, sma_length)
+    }
+
+def strategy_signals(close, ind, adx_min=20, rsi_exit=80, rsi_entry_max=None, squeeze_width=None, squeeze_lookback=20):
+    """
+    Conditions d'entrée et de sortie sous forme de tableaux booléens.
+    Comme la boucle historique (dropna puis range(1, n)), aucune décision n'est prise
+    avant que tous les indicateurs soient disponibles, ni sur la première barre valide.
+
+    Filtres optionnels (désactivés par défaut) : pas d'achat au-dessus de rsi_entry_max,
+    et achat seulement après un squeeze (largeur de bandes < squeeze_width sur squeeze_lookback barres).
+    """
+    valid = close.notna()
+    for frame in ind.values():
+        valid &= frame.notna()
+    first_valid = valid & ~valid.shift(1, fill_value=False)
+    active = valid & ~first_valid
+
+    entries = (ind['adx'] > adx_min) & (close > ind['bb_upper']) & (close > ind['sma']) & active
+    if rsi_entry_max is not None:
+        entries &= ind['rsi'] < rsi_entry_max
+    if squeeze_width is not None:
+        entries &= ind['bb_width'].rolling(window=squeeze_lookback, min_periods=1).min().shift(1) < squeeze_width
+    exits = ((close < ind['bb_lower']) | (ind['rsi'] > rsi_exit)) & active
+    return entries, exits, valid
+
+def positions_from_signals(entries, exits):
+    """
+    Propagation vectorisée de l'état (0 = liquide, 1 = investi).
+    Entrée seule -> 1, sortie seule -> 0, entrée et sortie simultanées -> bascule
+    (on achète si on était liquide, on vend si on était investi), sinon l'état est conservé.
+    """
+    e = np.asarray(entries, dtype=bool)
+    x = np.asarray(exits, dtype=bool)
+    both = e & x
+    determined = e ^ x
+    n_bars, n_cols = e.shape
+
+    toggles = np.cumsum(both, axis=0)
+    last = np.where(determined, np.arange(n_bars)[:, None], -1)
+    last = np.maximum.accumulate(last, axis=0)
+    known = last >= 0
+    rows = np.where(known, last, 0)
+    cols = np.arange(n_cols)[None, :]
+
+    state = np.where(known, e[rows, cols], False)
+    since = toggles - np.where(known, toggles[rows, cols], 0)
+    return state ^ (since & 1).astype(bool)
+
+def extract_trades(position, close, symbols, dates):
+    """Liste des trades (entrée/sortie au cours de clôture), une position ouverte étant soldée à la dernière barre."""
+    pos = position.astype(np.int8)
+    change = np.diff(pos, axis=0, prepend=np.zeros((1, pos.shape[1]), dtype=np.int8))
+    entry_t, entry_c = np.nonzero(change == 1)
+    exit_t, exit_c = np.nonzero(change == -1)
+
+    still_open = np.flatnonzero(pos[-1] == 1)
+    exit_t = np.concatenate([exit_t, np.full(len(still_open), len(pos) - 1)])
+    exit_c = np.concatenate([exit_c, still_open])
+
+    # Entrées et sorties alternent dans chaque colonne : un tri par (colonne, date) suffit à les apparier
+    e_order = np.lexsort((entry_t, entry_c))
+    x_order = np.lexsort((exit_t, exit_c))
+    entry_t, entry_c = entry_t[e_order], entry_c[e_order]
+    exit_t = exit_t[x_order]
+
+    entry_price = close[entry_t, entry_c]
+    exit_price = close[exit_t, entry_c]
+    return pd.DataFrame({
+        'symbol': np.asarray(symbols)[entry_c],
+        'entry_date': dates[entry_t],
+        'exit_date': dates[exit_t],
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'return_pct': (exit_price / entry_price - 1) * 100
+    })
+
+def run_backtest(close, entries, exits, valid=None, capital=10000):
+    """
+    Backtest vectorisé all-in/all-out sur un panel : rendements, equity, trades,
+    drawdowns et ratio de Sharpe par symbole, sans boucle sur les barres.
+    """
+    symbols = list(close.columns)
+    dates = close.index
+    prices = close.to_numpy(dtype=np.float64)
+    valid = close.notna() if valid is None else valid
+    valid_np = valid.to_numpy()
+
+    position = positions_from_signals(entries, exits)
+    # Rendements entre clôtures valides consécutives : un jour férié de la valeur (NaN dans
+    # le calendrier union) donne un rendement nul et la séance suivante porte tout l'écart
+    held_prices = close.ffill().to_numpy(dtype=np.float64)
+    bar_returns = np.zeros_like(prices)
+    bar_returns[1:] = held_prices[1:] / held_prices[:-1] - 1
+    bar_returns = np.nan_to_num(bar_returns)
+    strat_returns = np.zeros_like(prices)
+    strat_returns[1:] = position[:-1] * bar_returns[1:]
+
+    growth = np.cumprod(1 + strat_returns, axis=0)
+    equity = capital * growth
+    drawdown = growth / np.maximum.accumulate(growth, axis=0) - 1
+
+    # Buy & hold entre la première et la dernière barre valide de chaque symbole
+    first_idx = np.argmax(valid_np, axis=0)
+    last_idx = len(dates) - 1 - np.argmax(valid_np[::-1], axis=0)
+    cols = np.arange(len(symbols))
+    hold_return = (prices[last_idx, cols] / prices[first_idx, cols] - 1) * 100
+
+    n_valid = np.maximum(valid_np.sum(axis=0), 1)
+    masked = np.where(valid_np, strat_returns, np.nan)
+    mean = np.nanmean(masked, axis=0)
+    std = np.nanstd(masked, axis=0)
+    sharpe = np.where(std > 0, mean / np.where(std > 0, std, 1) * np.sqrt(TRADING_DAYS), 0.0)
+
+    trades = extract_trades(position, held_prices, symbols, dates)
+    n_trades = trades.groupby('symbol').size().reindex(symbols, fill_value=0).to_numpy()
+    win_rate = trades.assign(win=trades['return_pct'] > 0).groupby('symbol')['win'].mean().reindex(symbols).to_numpy()
+
+    final_return = (growth[-1] - 1) * 100
+    summary = pd.DataFrame({
+        'strategy_return': final_return,
+        'buy_hold_return': hold_return,
+        'excess_return': final_return - hold_return,
+        'trades': n_trades,
+        'win_rate': win_rate,
+        'max_drawdown': drawdown.min(axis=0) * 100,
+        'sharpe': sharpe,
+        'exposure': position.sum(axis=0) / n_valid
+    }, index=symbols)
+
+    return {
+        'summary': summary,
+        'trades': trades,
+        'equity': pd.DataFrame(equity, index=dates, columns=symbols),
+        'positions': pd.DataFrame(position, index=dates, columns=symbols)
+    }
+
+def backtest_panel(panel, adx_min=20, rsi_exit=80, bb_length=20, bb_std=2.0, sma_length=200, capital=10000):
+    """Stratégie ADX / Bollinger / MM200 de bout en bout sur un panel de prix."""
+    ind = strategy_indicators(panel, bb_length=bb_length, bb_std=bb_std, sma_length=sma_length)
+    entries, exits, valid = strategy_signals(panel['close'], ind, adx_min, rsi_exit)
+    return run_backtest(panel['close'], entries, exits, valid, capital)
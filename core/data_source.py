@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+import feedparser
+import yfinance as yf
+
+from .http_cache import yf_session, fetch_feed
+
+logger = logging.getLogger("TradingEngine.DataSource")
+
+# Sélection de la source par variables d'environnement (défaut : live, comportement historique)
+MODE_ENV = "TRADING_DATA_MODE"                  # live | record | replay
+ARCHIVE_ENV = "TRADING_DATA_ARCHIVE"            # Répertoire de l'archive
+LATENCY_ENV = "TRADING_REPLAY_LATENCY_MS"       # "50" ou intervalle "20-200"
+ERROR_RATE_ENV = "TRADING_REPLAY_ERROR_RATE"    # Probabilité d'erreur simulée (0 à 1)
+SEED_ENV = "TRADING_REPLAY_SEED"
+
+DEFAULT_ARCHIVE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data_archive')
+
+class ReplayError(ConnectionError):
+    """Erreur réseau simulée en mode replay."""
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else None
+
+def _window_params(params):
+    """
+    start/end calculés depuis datetime.now() changent à chaque appel : seule la date compte.
+    Une fenêtre qui se termine aujourd'hui est réduite à sa durée ("jusqu'à maintenant"),
+    pour qu'un rejeu d'un autre jour retrouve l'enregistrement.
+    """
+    start, end = _as_date(params.get('start')), _as_date(params.get('end'))
+    if end is not None and end == date.today():
+        params['end'] = 'now'
+        if start is not None:
+            params['start'] = f"-{(end - start).days}d"
+        return params
+    for field, value in (('start', start), ('end', end)):
+        if value is not None:
+            params[field] = value.isoformat()
+    return params
+
+def _archive_key(kind, name, params=None):
+    # Le timeout ne change pas la réponse : il ne fait pas partie de la clé
+    params = _window_params({k: v for k, v in (params or {}).items() if k != 'timeout'})
+    raw = json.dumps([kind, name, params], sort_keys=True, default=str)
+    return f"{kind}_{hashlib.sha1(raw.encode()).hexdigest()[:16]}"
+
+class Archive:
+    """Réponses enregistrées sur disque (un fichier par requête) et index lisible des enregistrements."""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key, ext):
+        return os.path.join(self.root, f"{key}.{ext}")
+
+    def _write(self, path, data, mode='wb'):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, mode) as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _log(self, key, kind, name, params):
+        entry = {'key': key, 'kind': kind, 'name': name, 'params': params, 'recorded_at': datetime.now().isoformat()}
+        with self._lock, open(os.path.join(self.root, 'index.jsonl'), 'a') as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+    def save_frame(self, kind, name, params, df):
+        key = _archive_key(kind, name, params)
+        path = self.path(key, 'pkl')
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, path)
+        self._log(key, kind, name, params)
+
+    def load_frame(self, kind, name, params):
+        path = self.path(_archive_key(kind, name, params), 'pkl')
+        return pd.read_pickle(path) if os.path.exists(path) else None
+
+    def save_json(self, kind, name, params, obj):
+        key = _archive_key(kind, name, params)
+        self._write(self.path(key, 'json'), json.dumps(obj, default=str), mode='w')
+        self._log(key, kind, name, params)
+
+    def load_json(self, kind, name, params):
+        path = self.path(_archive_key(kind, name, params), 'json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save_bytes(self, kind, name, params, data):
+        key = _archive_key(kind, name, params)
+        self._write(self.path(key, 'bin'), data)
+        self._log(key, kind, name, params)
+
+    def load_bytes(self, kind, name, params):
+        path = self.path(_archive_key(kind, name, params), 'bin')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+class LiveSource:
+    """Accès réseau (yfinance, flux RSS) via le cache HTTP partagé."""
+    mode = "live"
+
+    def ticker(self, symbol):
+        return yf.Ticker(symbol, session=yf_session())
+
+    def parse_feed(self, url):
+        return feedparser.parse(fetch_feed(url))
+
+class RecordingTicker:
+    """yf.Ticker dont chaque réponse history / info / news est copiée dans l'archive."""
+
+    def __init__(self, symbol, archive):
+        self.symbol = symbol
+        self._ticker = yf.Ticker(symbol, session=yf_session())
+        self._archive = archive
+
+    def history(self, **kwargs):
+        df = self._ticker.history(**kwargs)
+        if df is not None:
+            self._archive.save_frame('history', self.symbol, kwargs, df)
+        return df
+
+    @property
+    def info(self):
+        info = self._ticker.info
+        self._archive.save_json('info', self.symbol, None, info)
+        return info
+
+    @property
+    def news(self):
+        news = self._ticker.news
+        self._archive.save_json('news', self.symbol, None, news)
+        return news
+
+class RecordingSource(LiveSource):
+    """Source live qui enregistre toutes les réponses pour un rejeu ultérieur."""
+    mode = "record"
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def ticker(self, symbol):
+        return RecordingTicker(symbol, self.archive)
+
+    def parse_feed(self, url):
+        # Le flux brut est conservé (et non le résultat parsé) pour que le rejeu passe par le même parseur
+        data = fetch_feed(url)
+        self.archive.save_bytes('feed', url, None, data)
+        return feedparser.parse(data)
+
+class ReplayTicker:
+    """Équivalent hors-ligne de yf.Ticker alimenté par l'archive."""
+
+    def __init__(self, symbol, source):
+        self.symbol = symbol
+        self._source = source
+
+    def history(self, **kwargs):
+        self._source.simulate()
+        df = self._source.archive.load_frame('history', self.symbol, kwargs)
+        if df is None:
+            logger.warning(f"Replay : pas d'historique enregistré pour {self.symbol} {kwargs}")
+            return pd.DataFrame()
+        return df.copy()
+
+    @property
+    def info(self):
+        self._source.simulate()
+        return self._source.archive.load_json('info', self.symbol, None) or {}
+
+    @property
+    def news(self):
+        self._source.simulate()
+        return self._source.archive.load_json('news', self.symbol, None) or []
+
+class ReplaySource:
+    """
+    Rejoue l'archive sans réseau, avec une latence synthétique (tirée uniformément
+    dans latency_ms) et une injection d'erreurs (error_rate) reproductibles via seed.
+    """
+    mode = "replay"
+
+    def __init__(self, archive, latency_ms=(0, 0), error_rate=0.0, seed=None):
+        self.archive = archive
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def simulate(self):
+        with self._lock:
+            delay = self._rng.uniform(*self.latency_ms) / 1000.0
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise ReplayError("Erreur réseau simulée (replay)")
+
+    def ticker(self, symbol):
+        return ReplayTicker(symbol, self)
+
+    def parse_feed(self, url):
+        self.simulate()
+        data = self.archive.load_bytes('feed', url, None)
+        if data is None:
+            logger.warning(f"Replay : flux non enregistré {url}")
+            data = b""
+        return feedparser.parse(data)
+
+def _parse_latency(value):
+    if not value:
+        return (0, 0)
+    low, _, high = value.partition('-')
+    return (float(low), float(high or low))
+
+def source_from_env():
+    mode = os.environ.get(MODE_ENV, "live").lower()
+    if mode == "live":
+        return LiveSource()
+    archive = Archive(os.environ.get(ARCHIVE_ENV, DEFAULT_ARCHIVE))
+    if mode == "record":
+        return RecordingSource(archive)
+    if mode == "replay":
+        seed = os.environ.get(SEED_ENV)
+        return ReplaySource(archive, _parse_latency(os.environ.get(LATENCY_ENV)),
+                            float(os.environ.get(ERROR_RATE_ENV, 0)), int(seed) if seed else None)
+    raise ValueError(f"{MODE_ENV} inconnu : {mode} (live, record ou replay)")
+
+_source = None
+_source_lock = threading.Lock()
+
+def get_data_source():
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = source_from_env()
+            if _source.mode != "live":
+                logger.info(f"Source de données : {_source.mode}")
+        return _source
+
+def set_data_source(source):
+    """Remplace la source active (benchmarks, scripts)."""
+    global _source
+    with _source_lock:
+        _source = source
+
+def get_ticker(symbol):
+    return get_data_source().ticker(symbol)
+
+def parse_feed(url):
+    return get_data_source().parse_feed(url)
@@ -3,6 +3,47 @@ import os
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'users.db')
 
+# Liste des actions du CAC 40 (symbole, nom, secteur)
+CAC40_TICKERS = [
+    ('^FCHI', 'CAC 40', 'Indices'), ('^SBF120', 'SBF 120', 'Indices'), ('^VIX', 'Indice VIX', 'Indices'),
+    ('AC.PA', 'Accor', 'Consommation'), ('AI.PA', 'Air Liquide', 'Industrie'),
+    ('AIR.PA', 'Airbus', 'Aéronautique'), ('ALO.PA', 'Alstom', 'Industrie'),
+    ('MT.AS', 'ArcelorMittal', 'Matériaux'), ('CS.PA', 'AXA', 'Finance'), ('BNP.PA', 'BNP Paribas', 'Finance'), ('EN.PA', 'Bouygues', 'Industrie'),
+    ('CAP.PA', 'Capgemini', 'Technologie'), ('CA.PA', 'Carrefour', 'Consommation'), ('ACA.PA', 'Crédit Agricole', 'Finance'), ('BN.PA', 'Danone', 'Consommation'),
+    ('DSY.PA', 'Dassault Systèmes', 'Technologie'), ('EDEN.PA', 'Edenred', 'Finance'), ('ENGI.PA', 'Engie', 'Services Publics'), ('EL.PA', 'EssilorLuxottica', 'Santé'),
+    ('ERF.PA', 'Eurofins Scientific', 'Santé'), ('RMS.PA', 'Hermès', 'Luxe'), ('KER.PA', 'Kering', 'Luxe'), ('OR.PA', "L'Oréal", 'Consommation'),
+    ('LR.PA', 'Legrand', 'Industrie'), ('MC.PA', 'LVMH', 'Luxe'), ('ML.PA', 'Michelin', 'Industrie'), ('ORA.PA', 'Orange', 'Télécoms'),
+    ('PUB.PA', 'Publicis', 'Consommation'), ('RI.PA', 'Pernod Ricard', 'Consommation'), ('RNO.PA', 'Renault', 'Consommation'), ('SAF.PA', 'Safran', 'Aéronautique'),
+    ('SGO.PA', 'Saint-Gobain', 'Industrie'), ('SAN.PA', 'Sanofi', 'Santé'), ('SU.PA', 'Schneider Electric', 'Industrie'), ('GLE.PA', 'Société Générale', 'Finance'),
+    ('STLAP.PA', 'Stellantis', 'Consommation'), ('STMPA.PA', 'STMicroelectronics', 'Technologie'), ('TEP.PA', 'Teleperformance', 'Industrie'), ('HO.PA', 'Thales', 'Aéronautique'),
+    ('TTE.PA', 'TotalEnergies', 'Énergie'), ('URW.PA', 'Unibail-Rodamco-Westfield', 'Immobilier'), ('VIE.PA', 'Veolia', 'Services Publics'), ('DG.PA', 'Vinci', 'Industrie'),
+    ('WLN.PA', 'Worldline', 'Technologie')
+]
+
+SECTORS = {sector for _, _, sector in CAC40_TICKERS}
+
+# Secteurs yfinance (et quoteType à défaut) ramenés à la taxonomie française de CAC40_TICKERS
+YF_SECTORS = {
+    'Basic Materials': 'Matériaux',
+    'Communication Services': 'Télécoms',
+    'Consumer Cyclical': 'Consommation',
+    'Consumer Defensive': 'Consommation',
+    'Energy': 'Énergie',
+    'Financial Services': 'Finance',
+    'Healthcare': 'Santé',
+    'Industrials': 'Industrie',
+    'Real Estate': 'Immobilier',
+    'Technology': 'Technologie',
+    'Utilities': 'Services Publics',
+    'INDEX': 'Indices'
+}
+
+def normalize_sector(sector):
+    """Secteur dans la taxonomie du projet (libellé yfinance traduit, libellé français conservé)."""
+    if not sector:
+        return "Divers"
+    return YF_SECTORS.get(sector, sector if sector in SECTORS else "Divers")
+
 def get_db_connection():
     conn = sqlite3.connect(DB_PATH)
     # Activation du mode WAL pour la concurrence (lectures et écritures simultanées)
@@ -11,6 +52,20 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_sector_map():
+    """Retourne {symbole: secteur} pour les valeurs suivies (table tickers)."""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT symbol, sector FROM tickers")
+            sectors = {row[0]: normalize_sector(row[1]) for row in cursor.fetchall()}
+            if sectors:
+                return sectors
+    except Exception as e:
+        print(f"Erreur get_sector_map: {e}")
+    # Table absente ou vide : liste de référence du CAC 40
+    return {symbol: sector for symbol, _, sector in CAC40_TICKERS}
+
 def init_db():
     try:
         with get_db_connection() as conn:
@@ -66,23 +121,6 @@ def init_db():
                 PRIMARY KEY (email, symbol)
             )''')
             
-            # Liste des actions du CAC 40 pour initialisation
-            cac40 = [
-                ('^FCHI', 'CAC 40', 'Indices'), ('^SBF120', 'SBF 120', 'Indices'), ('^VIX', 'Indice VIX', 'Indices'),
-                ('AC.PA', 'Accor', 'Consommation'),
- ('AI.PA', 'Air Liquide', 'Industrie'),
-                ('AIR.PA', 'Airbus', 'Aéronautique'), ('ALO.PA', 'Alstom', 'Industrie'),
-                ('MT.AS', 'ArcelorMittal', 'Matériaux'), ('CS.PA', 'AXA', 'Finance'), ('BNP.PA', 'BNP Paribas', 'Finance'), ('EN.PA', 'Bouygues', 'Industrie'),
-                ('CAP.PA', 'Capgemini', 'Technologie'), ('CA.PA', 'Carrefour', 'Consommation'), ('ACA.PA', 'Crédit Agricole', 'Finance'), ('BN.PA', 'Danone', 'Consommation'),
-                ('DSY.PA', 'Dassault Systèmes', 'Technologie'), ('EDEN.PA', 'Edenred', 'Finance'), ('ENGI.PA', 'Engie', 'Services Publics'), ('EL.PA', 'EssilorLuxottica', 'Santé'),
-                ('ERF.PA', 'Eurofins Scientific', 'Santé'), ('RMS.PA', 'Hermès', 'Luxe'), ('KER.PA', 'Kering', 'Luxe'), ('OR.PA', "L'Oréal", 'Consommation'),
-                ('LR.PA', 'Legrand', 'Industrie'), ('MC.PA', 'LVMH', 'Luxe'), ('ML.PA', 'Michelin', 'Industrie'), ('ORA.PA', 'Orange', 'Télécoms'),
-                ('PUB.PA', 'Publicis', 'Consommation'), ('RI.PA', 'Pernod Ricard', 'Consommation'), ('RNO.PA', 'Renault', 'Consommation'), ('SAF.PA', 'Safran', 'Aéronautique'),
-                ('SGO.PA', 'Saint-Gobain', 'Industrie'), ('SAN.PA', 'Sanofi', 'Santé'), ('SU.PA', 'Schneider Electric', 'Industrie'), ('GLE.PA', 'Société Générale', 'Finance'),
-                ('STLAP.PA', 'Stellantis', 'Consommation'), ('STMPA.PA', 'STMicroelectronics', 'Technologie'), ('TEP.PA', 'Teleperformance', 'Industrie'), ('HO.PA', 'Thales', 'Aéronautique'),
-                ('TTE.PA', 'TotalEnergies', 'Énergie'), ('URW.PA', 'Unibail-Rodamco-Westfield', 'Immobilier'), ('VIE.PA', 'Veolia', 'Services Publics'), ('DG.PA', 'Vinci', 'Industrie'),
-                ('WLN.PA', 'Worldline', 'Technologie')
-            ]
             
             conn.commit()
             return True
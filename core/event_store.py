@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+from .database import DB_PATH
+
+logger = logging.getLogger("TradingEngine.EventStore")
+
+LEGACY_MEMORY_FILE = "/home/corentin/trade-analyser-bourse/market_memory.json"
+RETENTION_DAYS = int(os.environ.get("TRADING_EVENT_RETENTION_DAYS", 90))
+BATCH_SIZE = 500            # Événements écrits par transaction au maximum
+FLUSH_INTERVAL = 0.5        # Attente maximale (s) avant l'écriture d'un lot incomplet
+PRUNE_INTERVAL = 3600
+
+def _event_ts(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+class EventStore:
+    """
+    Journal des événements de marché (table market_events) remplaçant market_memory.json :
+    - append() est O(1) : l'événement est mis en file et un unique thread écrivain
+      l'insère par lots (une transaction par lot) ;
+    - chaque événement reçoit un numéro de séquence croissant (seq) qui sert de curseur
+      aux lecteurs incrémentaux ;
+    - index par (symbole, seq) et rétention en jours (TRADING_EVENT_RETENTION_DAYS).
+    """
+
+    def __init__(self, db_path=DB_PATH, retention_days=RETENTION_DAYS):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._read_conn = self._connect()
+        self._create_schema(self._read_conn)
+        self._writer = threading.Thread(target=self._run_writer, name="event-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def _create_schema(conn):
+        with conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS market_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                time TEXT,
+                ts REAL,
+                price REAL,
+                volume INTEGER,
+                change_pct REAL,
+                type TEXT,
+                analysis TEXT,
+                UNIQUE(symbol, time, type)
+            )''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_symbol_seq ON market_events(symbol, seq)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON market_events(ts)")
+            # Curseurs des lecteurs incrémentaux (dernier seq traité)
+            conn.execute("CREATE TABLE IF NOT EXISTS event_cursors (name TEXT PRIMARY KEY, seq INTEGER)")
+
+    # --- Écriture (thread unique) ---
+
+    def append(self, event):
+        """Met un événement en file d'écriture (dict avec symbol, time, price, volume, change_pct, type)."""
+        self._queue.put(('event', event))
+
+    def set_analysis(self, seq, analysis):
+        self._queue.put(('analysis', (seq, analysis)))
+
+    def set_cursor(self, name, seq):
+        """Avance le curseur d'un lecteur ; écrit après les opérations déjà en file (analyses comprises)."""
+        self._queue.put(('cursor', (name, seq)))
+
+    def flush(self, timeout=None):
+        """Attend que toutes les écritures en file soient commitées."""
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def _run_writer(self):
+        conn = self._connect()
+        last_prune = 0.0
+        while True:
+            ops = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(ops) < BATCH_SIZE and ops[-1][0] != 'flush':
+                try:
+                    ops.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, ops)
+            except Exception as e:
+                logger.error(f"Erreur d'écriture de {len(ops)} événements: {e}")
+            for kind, payload in ops:
+                if kind == 'flush':
+                    payload.set()
+            if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                last_prune = time.monotonic()
+                try:
+                    self._prune(conn)
+                except Exception as e:
+                    logger.error(f"Erreur de purge des événements: {e}")
+
+    def _write_batch(self, conn, ops):
+        events = [payload for kind, payload in ops if kind == 'event']
+        analyses = [payload for kind, payload in ops if kind == 'analysis']
+        cursors = [payload for kind, payload in ops if kind == 'cursor']
+        with conn:
+            if events:
+                conn.executemany('''INSERT OR IGNORE INTO market_events
+                    (symbol, time, ts, price, volume, change_pct, type, analysis) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                    [(e['symbol'], e.get('time'), _event_ts(e.get('time')), e.get('price'), e.get('volume'),
+                      e.get('change_pct'), e.get('type'),
+                      json.dumps(e['analysis'], ensure_ascii=False) if e.get('analysis') is not None else None)
+                     for e in events])
+            if analyses:
+                conn.executemany("UPDATE market_events SET analysis = ? WHERE seq = ?",
+                                 [(json.dumps(analysis, ensure_ascii=False), seq) for seq, analysis in analyses])
+            if cursors:
+                conn.executemany("INSERT OR REPLACE INTO event_cursors (name, seq) VALUES (?, ?)", cursors)
+
+    def _prune(self, conn):
+        with conn:
+            cursor = conn.execute("DELETE FROM market_events WHERE ts < ?", (time.time() - self.retention_days * 86400,))
+        if cursor.rowcount:
+            logger.info(f"{cursor.rowcount} événements de plus de {self.retention_days} jours supprimés")
+
+    # --- Lecture ---
+
+    @staticmethod
+    def _as_event(row):
+        event = {'seq': row[0], 'symbol': row[1], 'time': row[2], 'price': row[3],
+                 'volume': row[4], 'change_pct': row[5], 'type': row[6]}
+        if row[7] is not None:
+            event['analysis'] = json.loads(row[7])
+        return event
+
+    def events(self, symbol=None, after_seq=0, unanalyzed=False, limit=None):
+        """Événements par ordre de séquence, éventuellement filtrés (symbole, après un curseur, non analysés)."""
+        query = "SELECT seq, symbol, time, price, volume, change_pct, type, analysis FROM market_events WHERE seq > ?"
+        params = [after_seq]
+        if symbol:
+            query += " AND symbol = ?"
+            params.append(symbol)
+        if unanalyzed:
+            query += " AND analysis IS NULL"
+        query += " ORDER BY seq"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._read_lock:
+            rows = self._read_conn.execute(query, params).fetchall()
+        return [self._as_event(row) for row in rows]
+
+    def latest(self, symbol, limit=100):
+        """Derniers événements d'un symbole (du plus ancien au plus récent)."""
+        with self._read_lock:
+            rows = self._read_conn.execute('''SELECT seq, symbol, time, price, volume, change_pct, type, analysis
+                FROM market_events WHERE symbol = ? ORDER BY seq DESC LIMIT ?''', (symbol, limit)).fetchall()
+        return [self._as_event(row) for row in reversed(rows)]
+
+    def analyses(self, seqs):
+        """{seq: analyse} pour les événements indiqués qui ont été analysés depuis (recherche par clé primaire)."""
+        seqs = list(seqs)
+        found = {}
+        for i in range(0, len(seqs), 500):
+            chunk = seqs[i:i + 500]
+            with self._read_lock:
+                rows = self._read_conn.execute(
+                    f"SELECT seq, analysis FROM market_events WHERE seq IN ({','.join('?' * len(chunk))}) AND analysis IS NOT NULL",
+                    chunk).fetchall()
+            found.update({row[0]: json.loads(row[1]) for row in rows})
+        return found
+
+    def cursor(self, name):
+        with self._read_lock:
+            row = self._read_conn.execute("SELECT seq FROM event_cursors WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def has_events(self, symbol):
+        with self._read_lock:
+            return self._read_conn.execute("SELECT 1 FROM market_events WHERE symbol = ? LIMIT 1", (symbol,)).fetchone() is not None
+
+    def symbols(self):
+        with self._read_lock:
+            return [row[0] for row in self._read_conn.execute("SELECT DISTINCT symbol FROM market_events")]
+
+    def last_seq(self):
+        with self._read_lock:
+            return self._read_conn.execute("SELECT COALESCE(MAX(seq), 0) FROM market_events").fetchone()[0]
+
+    def migrate_json(self, path=LEGACY_MEMORY_FILE):
+        """Importe l'ancien market_memory.json (idempotent grâce à la contrainte d'unicité). Retourne le nombre lu."""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'r') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.error(f"Migration de {path} impossible: {e}")
+            return 0
+        for event in legacy:
+            if event.get('symbol'):
+                self.append(event)
+        self.flush()
+        logger.info(f"{len(legacy)} événements importés depuis {path}")
+        return len(legacy)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_event_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore()
+            if not _store.last_seq():
+                _store.migrate_json()
+            # Les événements encore en file sont écrits avant la sortie du processus
+            atexit.register(_store.flush, 5)
+        return _store
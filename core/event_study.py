@@ -0,0 +1,93 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from . import indicators
+from .analysis import (RSI_BUY_DIP, RSI_OVERBOUGHT, RSI_BEAR_REBOUND, RSI_OVERSOLD,
+                       GEO_ALERT_SCORE, MIN_HISTORY)
+from .ml_processor import HORIZONS
+
+logger = logging.getLogger("TradingEngine.EventStudy")
+
+def replay_recommendations(panel, geo_score=None):
+    """
+    Rejoue la logique de décision d'analyze_stock à chaque date et pour chaque valeur.
+
+    Les indicateurs d'analyze_stock sont causaux : calculés une fois sur tout l'historique
+    (fenêtres glissantes), leur valeur à la date t est celle qu'aurait vue un appel
+    d'analyze_stock sur l'historique tronqué à t, sans coût quadratique.
+    geo_score : score géopolitique historique inconnu, None = pas d'ajustement.
+    """
+    close = panel['close']
+    rsi = indicators.rsi(close, 14)
+    mm200 = indicators.sma(close, 200)
+    _, _, bb_upper = indicators.bollinger(close, 20, 2.0)
+
+    has_trend = mm200.notna().to_numpy()
+    above = (close > mm200).to_numpy()
+    rsi_np = rsi.to_numpy()
+    breakout = (close > bb_upper).to_numpy()
+    bull = has_trend & above
+    bear = has_trend & ~above
+
+    # Même ordre de priorité que les if/elif d'analyze_stock (comparaisons NaN = faux)
+    with np.errstate(invalid='ignore'):
+        labels = np.select(
+            [
+                bull & (rsi_np < RSI_BUY_DIP),
+                bull & (rsi_np > RSI_OVERBOUGHT),
+                bull & breakout,
+                bull,
+                bear & (rsi_np > RSI_BEAR_REBOUND),
+                bear & (rsi_np < RSI_OVERSOLD),
+                bear
+            ],
+            ["Achat", "Prudence", "Achat Fort", "Conserver", "Vendre", "Spéculatif", "Vendre"],
+            default="Conserver"
+        ).astype(object)
+
+    if geo_score is not None and geo_score < GEO_ALERT_SCORE:
+        labels[np.isin(labels, ["Achat", "Achat Fort", "Conserver"])] = "Prudence"
+
+    history = close.notna().cumsum().to_numpy()
+    labels[history < MIN_HISTORY] = "Neutre"
+    labels[close.isna().to_numpy()] = None
+    return pd.DataFrame(labels, index=close.index, columns=close.columns)
+
+def forward_returns(close, horizons=None):
+    """Rendement futur à chaque horizon de MLPredictor (NaN quand le futur n'est pas connu)."""
+    horizons = horizons or HORIZONS
+    return {name: close.shift(-days) / close - 1 for name, days in horizons.items()}
+
+def event_study(panel, geo_score=None, horizons=None, by_symbol=False):
+    """
+    Agrège les rendements futurs par recommandation et par horizon :
+    nombre de signaux, rendement moyen / médian, écart-type et taux de hausse.
+    """
+    labels = replay_recommendations(panel, geo_score)
+    flat_labels = labels.to_numpy().ravel()
+    flat_symbols = np.tile(np.asarray(labels.columns, dtype=object), len(labels))
+
+    frames = []
+    for name, fwd in forward_returns(panel['close'], horizons).items():
+        values = fwd.to_numpy().ravel()
+        mask = ~np.isnan(values) & pd.notna(flat_labels)
+        frame = pd.DataFrame({'label': flat_labels[mask], 'ret': values[mask] * 100, 'up': values[mask] > 0})
+        if by_symbol:
+            frame['symbol'] = flat_symbols[mask]
+        frame['horizon'] = name
+        frames.append(frame)
+    data = pd.concat(frames, ignore_index=True)
+
+    keys = ['label', 'horizon'] + (['symbol'] if by_symbol else [])
+    grouped = data.groupby(keys, sort=False)
+    stats = pd.DataFrame({
+        'count': grouped['ret'].size(),
+        'mean_return': grouped['ret'].mean(),
+        'median_return': grouped['ret'].median(),
+        'std_return': grouped['ret'].std(),
+        'hit_rate': grouped['up'].mean()
+    })
+    order = {name: i for i, name in enumerate((horizons or HORIZONS).keys())}
+    return stats.reset_index().sort_values(['label', 'horizon'], key=lambda col: col.map(order) if col.name == 'horizon' else col).reset_index(drop=True)
@@ -1,8 +1,16 @@
-import feedparser
+import os
+import json
+import time
 import urllib.parse
 import logging
 import socket
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from .data_source import parse_feed
+from .database import get_db_connection
+from .news_store import TitleIndex, dedupe, link_hash, title_features, parse_published
 
 # Sécurité : Timeout de 10 secondes pour éviter les blocages réseau
 socket.setdefaulttimeout(10)
@@ -38,79 +46,236 @@ GEOPOL_LEXICON = {
     "assouplissement": 0.5, "pivot": 0.5
 }
 
+GEO_FEEDS_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'geo_feeds.json')
+
+def _google_news_feed(query):
+    return f"https://news.google.com/rss/search?q={urllib.parse.quote(query)}&hl=fr&gl=FR&ceid=FR:fr"
+
+# Flux surveillés par défaut (remplaçables par config/geo_feeds.json : {"nom": "url", ...})
+DEFAULT_GEO_FEEDS = {
+    'global': _google_news_feed("géopolitique économie marchés krach guerre récession"),
+    'banques_centrales': _google_news_feed("BCE FED taux d'intérêt inflation"),
+    'energie': _google_news_feed("OPEP pétrole gaz prix de l'énergie"),
+    'conflits': _google_news_feed("guerre sanctions économiques OTAN conflit"),
+    'commerce': _google_news_feed("tensions commerciales droits de douane protectionnisme")
+}
+
+MAX_ITEMS_PER_FEED = 30
+HALF_LIFE_HOURS = 12        # Un article de 12 h pèse deux fois moins qu'un article récent
+MAX_AGE_HOURS = 72          # Au-delà, l'article sort du calcul
+REFRESH_INTERVAL = 600      # Rafraîchissement des flux au plus toutes les 10 minutes
+HISTORY_MIN_INTERVAL = 3600 # Série compacte : un point par heure, ou à chaque changement de score
+
+_feed_pool = ThreadPoolExecutor(max_workers=len(DEFAULT_GEO_FEEDS), thread_name_prefix="geo-feeds")
+_state_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_state = {
+    'items': {},            # hash du lien -> article noté (impact, mots-clés, horodatage)
+    'titles': TitleIndex(),
+    'refreshed_at': 0.0,
+    'last_recorded': None   # (horodatage, score) du dernier point de l'historique
+}
+
+def load_geo_feeds():
+    if os.path.exists(GEO_FEEDS_FILE):
+        try:
+            with open(GEO_FEEDS_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Configuration des flux géopolitiques illisible: {e}")
+    return DEFAULT_GEO_FEEDS
+
+def _fetch_feed(name, url):
+    feed = parse_feed(url)
+    now = time.time()
+    items = []
+    for entry in feed.entries[:MAX_ITEMS_PER_FEED]:
+        title = getattr(entry, 'title', None)
+        link = getattr(entry, 'link', None)
+        if not title or not link:
+            continue
+        published = entry.published if hasattr(entry, 'published') else 'N/A'
+        items.append({
+            'title': title,
+            'link': link,
+            'published': published,
+            'published_ts': parse_published(published, now),
+            'feed': name
+        })
+    return items
+
 def fetch_geopolitical_news():
-    """Récupère les actualités macro et géopolitiques globales."""
-    query = "géopolitique économie marchés krach guerre récession"
-    encoded_query = urllib.parse.quote(query)
-    rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=fr&gl=FR&ceid=FR:fr"
-    
+    """Récupère en parallèle les actualités macro et géopolitiques des flux configurés, sans doublons."""
+    feeds = load_geo_feeds()
+    futures = {name: _feed_pool.submit(_fetch_feed, name, url) for name, url in feeds.items()}
     news_items = []
-    try:
-        feed = feedparser.parse(rss_url)
-        for entry in feed.entries[:15]: # On prend un peu plus d'articles pour une meilleure couverture
-            news_items.append({
-                'title': entry.title,
-                'link': entry.link,
-                'published': entry.published if hasattr(entry, 'published') else 'N/A'
-            })
-    except Exception as e:
-        logger.error(f"Error fetching geopolitical news: {e}")
-    return news_items
+    for name, future in futures.items():
+        try:
+            news_items.extend(future.result())
+        except Exception as e:
+            logger.error(f"Error fetching geopolitical news ({name}): {e}")
+    return dedupe(news_items)
 
-def analyze_global_risk():
-    """Analyse les news globales et retourne un score de risque (0-100) et un résumé."""
+def score_item(title):
+    """Impact d'un titre (-1 à 1) et mots-clés détectés ; None si aucun signal."""
+    title = title.lower()
+    item_score = 0
+    found_keywords = []
+
+    # 1. Analyse par lexique spécifique
+    for word, weight in GEOPOL_LEXICON.items():
+        if word in title:
+            item_score += weight
+            found_keywords.append(word)
+
+    # 2. Bonus de détection d'entités/thèmes
+    for theme in GEOPOLITICAL_THEMES:
+        if theme.lower() in title:
+            found_keywords.append(theme)
+            if item_score == 0: item_score = -0.1
+
+    return (item_score, found_keywords) if found_keywords else None
+
+def ingest_geopolitical_news():
+    """Ajoute les nouveaux articles (notés une seule fois) et oublie ceux trop anciens. Retourne le nombre d'ajouts."""
     news = fetch_geopolitical_news()
-    if not news:
-        return 50, "Données géopolitiques indisponibles", []
+    added = 0
+    with _state_lock:
+        items, titles = _state['items'], _state['titles']
+        for item in news:
+            key = link_hash(item['link'])
+            features = title_features(item['title'])
+            if key in items or titles.find(features) is not None:
+                continue
+            titles.add(features, key)
+            scored = score_item(item['title'])
+            items[key] = {**item, 'impact': scored[0] if scored else None, 'keywords': scored[1] if scored else []}
+            added += 1
 
-    impacts = []
-    top_events = []
-
-    for item in news:
-        title = item['title'].lower()
-        item_score = 0
-        found_keywords = []
-
-        # 1. Analyse par lexique spécifique
-        for word, weight in GEOPOL_LEXICON.items():
-            if word in title:
-                item_score += weight
-                found_keywords.append(word)
-        
-        # 2. Bonus de détection d'entités/thèmes
-        for theme in GEOPOLITICAL_THEMES:
-            if theme.lower() in title:
-                found_keywords.append(theme)
-                if item_score == 0: item_score = -0.1 
-
-        if found_keywords:
-            impacts.append(item_score)
-            top_events.append(item['title'])
-
-    if not impacts:
-        return 50, "Aucun signal géopolitique majeur détecté.", []
+        cutoff = time.time() - MAX_AGE_HOURS * 3600
+        expired = [key for key, item in items.items() if item['published_ts'] < cutoff]
+        for key in expired:
+            del items[key]
+        if expired:
+            # Index des titres reconstruit sans les articles expirés
+            _state['titles'] = TitleIndex()
+            for key, item in items.items():
+                _state['titles'].add(title_features(item['title']), key)
+        _state['refreshed_at'] = time.time()
+    return added
+
+def compute_stress(items, now=None):
+    """
+    Score de stress (0-100) à partir des articles notés : moyenne et pire impact pondérés
+    par une décroissance exponentielle de demi-vie HALF_LIFE_HOURS selon l'âge de l'article.
+    Retourne (score, articles signalés triés par poids décroissant) ; score None sans signal.
+    """
+    now = now or time.time()
+    weighted = []
+    for item in items:
+        if item['impact'] is None:
+            continue
+        age_hours = max(0.0, now - item['published_ts']) / 3600
+        weighted.append((0.5 ** (age_hours / HALF_LIFE_HOURS), item))
+    if not weighted:
+        return None, []
+
+    total = sum(w for w, _ in weighted)
+    avg_impact = sum(w * item['impact'] for w, item in weighted) / total
+    worst_impact = min(w * item['impact'] for w, item in weighted)
 
     # Calcul du score de STRESS (Hybride)
-    avg_impact = sum(impacts) / len(impacts)
-    worst_impact = min(impacts)
-    
     final_impact = (avg_impact * 0.5) + (worst_impact * 0.5)
-    
+
     # Normalisation : Un impact de -1.0 devient un STRESS de 100
     # Score de 0 (Calme) à 100 (Panique Totale)
-    stress_score = abs(final_impact) * 100
-    stress_score = max(0, min(100, stress_score))
+    stress_score = max(0, min(100, abs(final_impact) * 100))
+    ranked = [item for _, item in sorted(weighted, key=lambda pair: pair[0] * abs(pair[1]['impact']), reverse=True)]
+    return stress_score, ranked
 
+def verdict_for(stress_score):
     # Génération du verdict
     if stress_score > 75:
-        verdict = "PANIQUE : Risque systémique ou géopolitique EXTRÊME."
+        return "PANIQUE : Risque systémique ou géopolitique EXTRÊME."
     elif stress_score > 60:
-        verdict = "STRESS ÉLEVÉ : Forte volatilité et tensions majeures."
+        return "STRESS ÉLEVÉ : Forte volatilité et tensions majeures."
     elif stress_score > 40:
-        verdict = "STRESS MODÉRÉ : Le contexte macroéconomique est fragile."
+        return "STRESS MODÉRÉ : Le contexte macroéconomique est fragile."
     elif stress_score < 20:
-        verdict = "SÉRÉNITÉ : Signes d'apaisement ou de relance."
-    else:
-        verdict = "STABLE : Pas de choc géopolitique majeur."
+        return "SÉRÉNITÉ : Signes d'apaisement ou de relance."
+    return "STABLE : Pas de choc géopolitique majeur."
+
+def _ensure_history_table(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS geo_risk_history (ts INTEGER PRIMARY KEY, score INTEGER, items INTEGER)")
+
+def record_risk_score(score, items):
+    """Ajoute un point à l'historique si le score a changé ou si le dernier point date de plus d'une heure."""
+    now = int(time.time())
+    last = _state['last_recorded']
+    if last and last[1] == score and now - last[0] < HISTORY_MIN_INTERVAL:
+        return
+    try:
+        with get_db_connection() as conn:
+            _ensure_history_table(conn)
+            conn.execute("INSERT OR REPLACE INTO geo_risk_history (ts, score, items) VALUES (?, ?, ?)", (now, score, items))
+            conn.commit()
+        _state['last_recorded'] = (now, score)
+    except Exception as e:
+        logger.error(f"Erreur d'enregistrement de l'historique géopolitique: {e}")
+
+def risk_history(days=7):
+    """Historique [(horodatage, score)] du score de stress, du plus ancien au plus récent."""
+    try:
+        with get_db_connection() as conn:
+            _ensure_history_table(conn)
+            rows = conn.execute("SELECT ts, score FROM geo_risk_history WHERE ts >= ? ORDER BY ts",
+                                (int(time.time() - days * 86400),)).fetchall()
+        return [(row[0], row[1]) for row in rows]
+    except Exception as e:
+        logger.error(f"Erreur de lecture de l'historique géopolitique: {e}")
+        return []
+
+def risk_trend(history, hours=24):
+    """Variation du score sur les `hours` dernières heures (None si l'historique est trop court)."""
+    if not history:
+        return None
+    cutoff = history[-1][0] - hours * 3600
+    past = [score for ts, score in history if ts <= cutoff]
+    return history[-1][1] - past[-1] if past else None
+
+def refresh_if_stale():
+    """Relit les flux si l'état a plus de REFRESH_INTERVAL secondes. Retourne True si relus."""
+    if time.time() - _state['refreshed_at'] <= REFRESH_INTERVAL:
+        return False
+    # Premier appel : on attend les flux ; ensuite un seul thread rafraîchit, les autres lisent l'état courant
+    if not _refresh_lock.acquire(blocking=not _state['refreshed_at']):
+        return False
+    try:
+        if time.time() - _state['refreshed_at'] <= REFRESH_INTERVAL:
+            return False
+        ingest_geopolitical_news()
+        return True
+    finally:
+        _refresh_lock.release()
+
+def analyze_global_risk():
+    """
+    Analyse les news globales et retourne un score de risque (0-100) et un résumé.
+    Les flux ne sont relus que toutes les REFRESH_INTERVAL secondes (un seul rafraîchissement
+    à la fois, les autres appelants utilisent l'état courant) ; le score est recalculé à partir
+    des articles déjà notés, ce qui le rend peu coûteux à chaque appel.
+    """
+    refreshed = refresh_if_stale()
+    with _state_lock:
+        items = list(_state['items'].values())
+    if not items:
+        return 50, "Données géopolitiques indisponibles", []
+
+    stress_score, ranked = compute_stress(items)
+    if stress_score is None:
+        return 50, "Aucun signal géopolitique majeur détecté.", []
 
-    return int(stress_score), verdict, top_events[:5]
+    score = int(stress_score)
+    if refreshed:
+        record_risk_score(score, len(ranked))
+    return score, verdict_for(stress_score), [item['title'] for item in ranked[:5]]
@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from urllib.parse import urlencode
+
+import requests
+
+logger = logging.getLogger("TradingEngine.HttpCache")
+
+CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), 'http_cache.db'))
+
+# Durée de validité (s) par famille d'URL ; 0 = jamais mis en cache (cookies, crumb, consentement)
+ENDPOINT_TTLS = [
+    (re.compile(r"fc\.yahoo\.com|/getcrumb|consent\.yahoo|guce\.yahoo"), 0),
+    (re.compile(r"finance\.yahoo\.com/v8/finance/chart"), 120),
+    (re.compile(r"finance\.yahoo\.com/v\d+/finance/quoteSummary"), 3600),
+    (re.compile(r"finance\.yahoo\.com/v\d+/finance/search"), 600),
+    (re.compile(r"finance\.yahoo\.com"), 300),
+    (re.compile(r"news\.google\.com/rss"), 600),
+    (re.compile(r"lesechos\.fr/rss"), 600),
+    (re.compile(r"api\.twelvedata\.com|finnhub\.io|alphavantage\.co"), 60)
+]
+# Paramètres propres à la session, exclus de la clé de cache
+VOLATILE_PARAMS = {'crumb'}
+RETENTION = 2 * 86400
+FEED_TIMEOUT = 10
+FEED_HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) TradeAnalyser/1.0'}
+
+def ttl_for(url):
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(url):
+            return ttl
+    return 0
+
+def cache_key(url, params=None):
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS)
+    return hashlib.sha1(f"GET {url}?{urlencode(items)}".encode()).hexdigest()
+
+class CachedResponse:
+    """Réponse servie depuis le cache (même interface utile qu'une réponse requests / curl_cffi)."""
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.reason = "OK"
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} pour {self.url}")
+
+class HttpCache:
+    """
+    Cache HTTP sur disque (SQLite en WAL) partagé par tous les processus : application web,
+    scheduler et scripts. Une entrée valide est servie sans appel réseau ; une entrée
+    expirée est revalidée par GET conditionnel (If-None-Match / If-Modified-Since).
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                expires_at REAL
+            )''')
+            conn.execute("DELETE FROM http_cache WHERE expires_at < ?", (time.time() - RETENTION,))
+
+    def _conn(self):
+        # Une connexion par thread ; busy_timeout pour les écritures concurrentes entre processus
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, key):
+        row = self._conn().execute("SELECT url, status, headers, body, etag, last_modified, expires_at FROM http_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {'url': row[0], 'status': row[1], 'headers': json.loads(row[2]), 'body': row[3],
+                'etag': row[4], 'last_modified': row[5], 'expires_at': row[6]}
+
+    def store(self, key, url, response, ttl):
+        headers = {k: v for k, v in response.headers.items() if k.lower() in ('content-type', 'etag', 'last-modified')}
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key, url, response.status_code, json.dumps(headers), response.content,
+                          response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now + ttl))
+
+    def invalidate(self, url, params=None):
+        """Retire une réponse (ex. message d'erreur renvoyé avec un statut 200)."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM http_cache WHERE key = ?", (cache_key(url, params),))
+
+    def touch(self, key, ttl):
+        with self._conn() as conn:
+            conn.execute("UPDATE http_cache SET expires_at = ? WHERE key = ?", (time.time() + ttl, key))
+
+    def get(self, send, url, params=None, ttl=None, headers=None, **kwargs):
+        """
+        GET via le cache. send(url, params=..., headers=..., **kwargs) effectue l'appel réseau
+        (session.get ou équivalent) ; seules les réponses 200 sont conservées.
+        """
+        ttl = ttl_for(url) if ttl is None else ttl
+        if ttl <= 0:
+            return send(url, params=params, headers=headers, **kwargs)
+
+        key = cache_key(url, params)
+        entry = self.lookup(key)
+        if entry and entry['expires_at'] > time.time():
+            return CachedResponse(url, entry['status'], entry['headers'], entry['body'])
+
+        conditional = dict(headers or {})
+        if entry and entry['etag']:
+            conditional['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            conditional['If-Modified-Since'] = entry['last_modified']
+
+        response = send(url, params=params, headers=conditional or None, **kwargs)
+        if response.status_code == 304 and entry:
+            self.touch(key, ttl)
+            return CachedResponse(url, entry['status'], entry['headers'], entry['body'])
+        if response.status_code == 200:
+            try:
+                self.store(key, url, response, ttl)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache HTTP indisponible pour {url}: {e}")
+        return response
+
+_cache = None
+_cache_lock = threading.RLock()
+
+def get_http_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
+
+try:
+    from curl_cffi import requests as _curl_requests
+    _SessionBase = _curl_requests.Session
+    _SESSION_KWARGS = {'impersonate': 'chrome'}
+except ImportError:
+    _SessionBase = requests.Session
+    _SESSION_KWARGS = {}
+
+class CachedSession(_SessionBase):
+    """
+    Session acceptée par yfinance (curl_cffi si disponible) dont les GET passent par le cache partagé.
+    Pas d'attribut `cache` : yfinance refuse les sessions de type requests_cache.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**{**_SESSION_KWARGS, **kwargs})
+        self._http_cache = get_http_cache()
+
+    def get(self, url, params=None, **kwargs):
+        return self._http_cache.get(lambda u, **kw: super(CachedSession, self).get(u, **kw), url, params=params, **kwargs)
+
+_yf_session = None
+_feed_session = None
+
+def yf_session():
+    """Session unique par processus pour yfinance (cookies et crumb partagés par tous les threads)."""
+    global _yf_session
+    with _cache_lock:
+        if _yf_session is None:
+            _yf_session = CachedSession()
+        return _yf_session
+
+def fetch_feed(url):
+    """Contenu brut d'un flux RSS via le cache partagé (GET conditionnel à l'expiration)."""
+    global _feed_session
+    with _cache_lock:
+        if _feed_session is None:
+            _feed_session = requests.Session()
+            _feed_session.headers.update(FEED_HEADERS)
+    response = get_http_cache().get(_feed_session.get, url, timeout=FEED_TIMEOUT)
+    response.raise_for_status()
+    return response.content
@@ -0,0 +1,88 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+# Indicateurs vectorisés sur des panels (index = dates, colonnes = symboles).
+# Mêmes définitions que pandas_ta (moyennes de Wilder via ewm), mais calculés
+# pour toutes les valeurs à la fois au lieu d'une boucle par symbole.
+
+def on_own_calendar(n_frames=1):
+    """
+    Calcule l'indicateur sur les seules séances de chaque valeur. Un panel multi-marchés
+    suit le calendrier union : un jour férié laisse un NaN qui, sans cela, rendrait les
+    fenêtres glissantes NaN pendant `length` barres. Les colonnes de même calendrier
+    (même masque de cours valides) sont traitées ensemble, l'indicateur reste donc
+    vectorisé par marché ; le résultat est réaligné sur l'index d'origine.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            frames, params = args[:n_frames], args[n_frames:]
+            index = frames[0].index
+            valid = frames[0].notna()
+            for frame in frames[1:]:
+                valid &= frame.notna()
+
+            if isinstance(valid, pd.Series):
+                result = func(*(frame[valid] for frame in frames), *params, **kwargs)
+                if isinstance(result, tuple):
+                    return tuple(part.reindex(index) for part in result)
+                return result.reindex(index)
+
+            groups = {}
+            for column in valid.columns:
+                mask = valid[column].to_numpy()
+                if mask.any():
+                    groups.setdefault(mask.tobytes(), (mask, []))[1].append(column)
+            if not groups:
+                return func(*frames, *params, **kwargs)
+
+            parts = []
+            for mask, columns in groups.values():
+                result = func(*(frame.loc[mask, columns] for frame in frames), *params, **kwargs)
+                parts.append(result if isinstance(result, tuple) else (result,))
+            outputs = tuple(pd.concat([piece.reindex(index) for piece in pieces], axis=1).reindex(columns=frames[0].columns)
+                            for pieces in zip(*parts))
+            return outputs if len(outputs) > 1 else outputs[0]
+        return wrapper
+    return decorator
+
+def rma(df, length):
+    """Moyenne mobile de Wilder (RMA)."""
+    return df.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+@on_own_calendar()
+def sma(close, length):
+    return close.rolling(window=length, min_periods=length).mean()
+
+@on_own_calendar()
+def rsi(close, length=14):
+    delta = close.diff()
+    gain = rma(delta.clip(lower=0), length)
+    loss = rma((-delta).clip(lower=0), length)
+    return 100 * gain / (gain + loss)
+
+@on_own_calendar()
+def bollinger(close, length=20, std=2.0):
+    """Bandes de Bollinger : (basse, milieu, haute)."""
+    mid = sma(close, length)
+    dev = close.rolling(window=length, min_periods=length).std(ddof=0)
+    return mid - std * dev, mid, mid + std * dev
+
+@on_own_calendar(n_frames=3)
+def adx(high, low, close, length=14):
+    prev_close = close.shift(1)
+    # np.maximum propage les NaN : pas de vrai range sur la première barre
+    true_range = np.maximum(high - low, np.maximum((high - prev_close).abs(), (low - prev_close).abs()))
+    atr = rma(true_range, length)
+
+    up = high - high.shift(1)
+    down = low.shift(1) - low
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+
+    plus_di = 100 * rma(plus_dm, length) / atr
+    minus_di = 100 * rma(minus_dm, length) / atr
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return rma(dx, length)
@@ -1,15 +1,15 @@
 import requests
 import logging
 import re
-import yfinance as yf
 from .database import get_db_connection
+from .data_source import get_ticker
 
 logger = logging.getLogger("TradingEngine.Legal")
 
 def fetch_company_website(symbol):
     """Récupère le site web officiel via yfinance et l'enregistre en base."""
     try:
-        ticker = yf.Ticker(symbol)
+        ticker = get_ticker(symbol)
         info = ticker.info
         website = info.get('website')
         if website:
@@ -1,10 +1,11 @@
-import yfinance as yf
+import pandas as pd
 import threading
 import logging
 import time
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .database import get_db_connection
+from .data_source import get_ticker
 from .analysis import analyze_stock
 from .memory_manager import save_event_to_memory
 import sys
@@ -39,7 +40,7 @@ MARKET_STATE = {
 def process_single_symbol(symbol, sector_name):
     """Analyse un seul symbole avec sécurité de timeout."""
     try:
-        ticker = yf.Ticker(symbol)
+        ticker = get_ticker(symbol)
         # Timeout strict de 10s pour Yahoo Finance (Évite de bloquer les workers)
         df = ticker.history(period="1y", timeout=10)
         
@@ -1,42 +1,114 @@
 import os
+import json
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from ta.momentum import RSIIndicator
 from ta.trend import MACD, SMAIndicator, EMAIndicator, ADXIndicator
 from ta.volatility import BollingerBands
-from xgboost import XGBRegressor
+import xgboost as xgb
 import joblib
+import tempfile
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
+from .data_source import get_ticker
+from .database import normalize_sector
+
 logger = logging.getLogger("TradingEngine.ML")
 
+# Horizons de prédiction en jours de bourse (environ)
+HORIZONS = {
+    "1d": 1,
+    "3d": 3,
+    "1w": 5,
+    "1m": 21,
+    "3m": 63,
+    "6m": 126,
+    "1y": 252
+}
+
+# Modèle XGBoost optimisé (équivalent de XGBRegressor(n_estimators=150, learning_rate=0.03, max_depth=6, subsample=0.8))
+XGB_PARAMS = {
+    'objective': 'reg:squarederror',
+    'eta': 0.03,
+    'max_depth': 6,
+    'subsample': 0.8,
+    'tree_method': 'hist'
+}
+N_ROUNDS = 150
+
+# Mise à jour incrémentale : rounds ajoutés, seuil de dérive et âge maximal avant réentraînement complet
+INCREMENTAL_ROUNDS = 10
+INCREMENTAL_MIN_ROWS = 5
+DRIFT_THRESHOLD = 0.10
+MAX_MODEL_AGE_DAYS = 90
+# Modèle mutualisé (cross-section) : un seul artefact par horizon pour tout l'univers
+POOLED_PREFIX = "_pooled"
+POOLED_FEATURE_COLS = ['rsi', 'macd_rel', 'macd_signal_rel', 'sma_20_rel', 'ema_50_rel', 'volatility', 'returns', 'adx', 'bb_width']
+
+# Historique chargé avant le filigrane pour stabiliser les indicateurs (EMA 50, MACD, ADX)
+FEATURE_WARMUP_DAYS = 150
+
+def predict_rows(model, features):
+    """Prédit avec un Booster natif ou un ancien modèle XGBRegressor sérialisé."""
+    if isinstance(model, xgb.Booster):
+        return model.inplace_predict(features)
+    return model.predict(features)
+
+def _atomic_write(path, write, binary=True):
+    """Écrit via un fichier temporaire puis os.replace (jamais de fichier à moitié écrit visible)."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def atomic_dump(obj, path):
+    """Sauvegarde joblib atomique d'un artefact (modèle)."""
+    _atomic_write(path, lambda f: joblib.dump(obj, f))
+
+def atomic_write_json(data, path):
+    """Sauvegarde JSON atomique (checkpoints, métadonnées, rapports)."""
+    _atomic_write(path, lambda f: json.dump(data, f, indent=4), binary=False)
+
+def normalize_ohlc(df):
+    """Accepte les DataFrames du cache marché (colonnes en minuscules) comme ceux de yfinance."""
+    renames = {c: c.capitalize() for c in df.columns if isinstance(c, str) and c in ('open', 'high', 'low', 'close', 'volume')}
+    return df.rename(columns=renames) if renames else df
+
 class MLPredictor:
-    def __init__(self, model_dir="/home/corentin/trade-analyser-bourse/models"):
+    def __init__(self, model_dir="/home/corentin/trade-analyser-bourse/models", n_jobs=None, mode="per_symbol"):
         self.model_dir = model_dir
+        # 'per_symbol' : modèles par valeur (repli sur le modèle mutualisé s'il existe), 'pooled' : modèle mutualisé uniquement
+        self.mode = mode
+        # Nombre de threads XGBoost par entraînement (None = tous les cœurs)
+        self.n_jobs = n_jobs
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
         
-        # Horizons de prédiction en jours de bourse (environ)
-        self.horizons = {
-            "1d": 1,
-            "3d": 3,
-            "1w": 5,
-            "1m": 21,
-            "3m": 63,
-            "6m": 126,
-            "1y": 252
-        }
+        self.horizons = dict(HORIZONS)
         self.models = {}
+        # mtime (ns) du fichier de chaque modèle en cache : un fichier réécrit par un autre
+        # processus (réentraînement planifié) est rechargé au prochain accès
+        self.model_mtimes = {}
+        self.pooled_meta = None
+        self.pooled_meta_mtime = None
         self.feature_cols = ['rsi', 'macd', 'macd_signal', 'sma_20', 'ema_50', 'volatility', 'returns', 'adx', 'bb_width']
 
-    def fetch_data(self, symbol):
-        """Récupère 5 ans d'historique maximum"""
+    def fetch_data(self, symbol, start_date=None):
+        """Récupère 5 ans d'historique maximum (ou depuis start_date)"""
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=5*365)
+        start_date = start_date or end_date - timedelta(days=5*365)
         
-        ticker = yf.Ticker(symbol)
+        ticker = get_ticker(symbol)
         df = ticker.history(start=start_date, end=end_date)
         return df
 
@@ -72,6 +144,26 @@ class MLPredictor:
         # Supprimer les lignes avec des valeurs manquantes dues au calcul des indicateurs
         return df.dropna()
 
+    def xgb_params(self):
+        """Hyperparamètres XGBoost (API native) communs à tous les horizons."""
+        params = dict(XGB_PARAMS)
+        if self.n_jobs:
+            params['nthread'] = self.n_jobs
+        return params
+
+    def build_training_matrices(self, df):
+        """
+        Construit une matrice de features float32 contiguë et une matrice de cibles
+        (une colonne par horizon, NaN quand le futur n'est pas encore connu).
+        """
+        X = np.ascontiguousarray(df[self.feature_cols].to_numpy(dtype=np.float32))
+        close = df['Close'].to_numpy(dtype=np.float64)
+        Y = np.full((len(df), len(self.horizons)), np.nan, dtype=np.float32)
+        for j, days in enumerate(self.horizons.values()):
+            if days < len(close):
+                Y[:-days, j] = close[days:] / close[:-days] - 1
+        return X, Y
+
     def train_for_horizons(self, symbol):
         """Entraîne un modèle pour chaque horizon de temps"""
         logger.info(f"Début de l'entraînement IA pour {symbol}...")
@@ -81,43 +173,44 @@ class MLPredictor:
             return False
 
         df = self.prepare_features(raw_df)
+        X, Y = self.build_training_matrices(df)
         
         training_results = {}
+        label_until = {}
+
+        # Une seule matrice quantifiée pour tous les horizons : seuls label et poids changent
+        dtrain = xgb.QuantileDMatrix(X, feature_names=self.feature_cols, nthread=self.n_jobs or -1)
 
-        for name, days in self.horizons.items():
+        for j, name in enumerate(self.horizons.keys()):
             try:
-                # Créer la cible (Target): le retour futur à X jours
-                df_target = df.copy()
-                df_target['target'] = df_target['Close'].shift(-days) / df_target['Close'] - 1
-                
-                # Supprimer les dernières lignes car on ne connaît pas encore leur futur
-                train_data = df_target.dropna()
-                
-                if train_data.empty:
+                # Les dernières lignes n'ont pas encore de futur connu : poids nul (masque de lignes valides)
+                valid = ~np.isnan(Y[:, j])
+                if not valid.any():
                     continue
 
-                X = train_data[self.feature_cols]
-                y = train_data['target']
+                dtrain.set_label(np.where(valid, Y[:, j], 0.0))
+                dtrain.set_weight(valid.astype(np.float32))
+                model = xgb.train(self.xgb_params(), dtrain, num_boost_round=N_ROUNDS)
                 
-                # Modèle XGBoost optimisé
-                model = XGBRegressor(n_estimators=150, learning_rate=0.03, max_depth=6, subsample=0.8)
-                model.fit(X, y)
-                
-                # Sauvegarde
-                model_path = os.path.join(self.model_dir, f"{symbol}_{name}.joblib")
-                joblib.dump(model, model_path)
-                self.models[name] = model
+                # Sauvegarde atomique
+                self.save_model(symbol, name, model)
                 
                 # Calculer une erreur approximative sur le dernier point pour info
-                last_pred = model.predict(X.tail(1))[0]
+                last_valid = np.flatnonzero(valid)[-1]
+                last_pred = model.inplace_predict(X[last_valid:last_valid + 1])[0]
                 training_results[name] = float(last_pred) * 100 # En pourcentage
+                label_until[name] = df.index[last_valid].isoformat()
             except Exception as e:
                 logger.error(f"Erreur entraînement {symbol} horizon {name}: {e}")
+
+        if label_until:
+            now = datetime.now().isoformat()
+            self.save_meta(symbol, {'full_trained_at': now, 'updated_at': now, 'label_until': label_until})
             
         logger.info(f"✓ Modèles entraînés avec succès pour {symbol}")
         return training_results
 
-    def predict_future(self, symbol):
+    def predict_future(self, symbol, sector=None):
         """Prédit les rendements pour tous les horizons à partir du prix actuel (Lazy Loading avec Cache)"""
         try:
             raw_df = self.fetch_data(symbol)
@@ -131,36 +224,305 @@ class MLPredictor:
             last_features = df[self.feature_cols].tail(1)
             
             predictions = {}
+            missing = []
             for name in self.horizons.keys():
                 model_key = f"{symbol}_{name}"
-                model_path = os.path.join(self.model_dir, f"{model_key}.joblib")
-                
+                if self.mode == "pooled":
+                    missing.append(name)
+                    continue
+
                 # Chargement à la demande (Lazy) avec mise en cache
-                if model_key not in self.models:
-                    if os.path.exists(model_path):
-                        try:
-                            self.models[model_key] = joblib.load(model_path)
-                            logger.info(f"Modèle IA chargé en mémoire : {model_key}")
-                        except Exception as e:
-                            logger.warning(f"Échec du chargement du modèle {model_key}: {e}")
-                            continue
-                    else:
-                        continue # Pas de modèle pour cet horizon/symbole
+                try:
+                    model = self.load_model(symbol, name)
+                except Exception as e:
+                    logger.warning(f"Échec du chargement du modèle {model_key}: {e}")
+                    model = None
+                if model is None:
+                    missing.append(name) # Pas de modèle pour cet horizon/symbole
+                    continue
 
                 # Utilisation du modèle en cache
                 try:
-                    model = self.models[model_key]
-                    pred = model.predict(last_features)[0]
+                    pred = predict_rows(model, last_features)[0]
                     predictions[name] = round(float(pred) * 100, 2)
                 except Exception as e:
                     logger.error(f"Erreur lors de la prédiction avec {model_key}: {e}")
                     continue
+
+            # Repli sur le modèle mutualisé : prédiction immédiate pour une valeur jamais entraînée
+            if missing:
+                pooled = self.predict_pooled_rows({symbol: df.tail(1)}, {symbol: sector} if sector else None, horizons=missing)
+                predictions.update(pooled.get(symbol, {}))
             
             return predictions
         except Exception as e:
             logger.error(f"Erreur globale predict_future pour {symbol}: {e}")
             return {}
 
+    # --- MODÈLE MUTUALISÉ (CROSS-SECTION) ---
+
+    def pooled_features(self, df):
+        """Features sans unité de prix, comparables d'une valeur à l'autre."""
+        close = df['Close']
+        return pd.DataFrame({
+            'rsi': df['rsi'],
+            'macd_rel': df['macd'] / close,
+            'macd_signal_rel': df['macd_signal'] / close,
+            'sma_20_rel': df['sma_20'] / close - 1,
+            'ema_50_rel': df['ema_50'] / close - 1,
+            'volatility': df['volatility'],
+            'returns': df['returns'],
+            'adx': df['adx'],
+            'bb_width': df['bb_width']
+        }, index=df.index)[POOLED_FEATURE_COLS]
+
+    def pooled_meta_path(self):
+        return os.path.join(self.model_dir, f"{POOLED_PREFIX}.meta.json")
+
+    def load_pooled_meta(self):
+        """Vocabulaires secteur/symbole et options d'encodage du modèle mutualisé (None s'il n'existe pas)."""
+        path = self.pooled_meta_path()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self.pooled_meta, self.pooled_meta_mtime = None, None
+            return None
+        if self.pooled_meta is None or mtime != self.pooled_meta_mtime:
+            with open(path, 'r') as f:
+                self.pooled_meta = json.load(f)
+            self.pooled_meta_mtime = mtime
+        return self.pooled_meta
+
+    def _encode_pooled(self, features, symbols, sectors, meta):
+        """Ajoute les codes catégoriels secteur/symbole (NaN = inconnu, branche par défaut de l'arbre)."""
+        columns = [features]
+        if meta['encode_sector']:
+            vocab = {name: i for i, name in enumerate(meta['sectors'])}
+            # Même taxonomie à l'entraînement et en service (libellés yfinance traduits)
+            labels = [(sectors or {}).get(s) for s in symbols]
+            codes = [vocab.get(normalize_sector(label), np.nan) if label else np.nan for label in labels]
+            columns.append(np.array(codes, dtype=np.float32)[:, None])
+        if meta['encode_symbol']:
+            vocab = {name: i for i, name in enumerate(meta['symbols'])}
+            columns.append(np.array([vocab.get(s, np.nan) for s in symbols], dtype=np.float32)[:, None])
+        return np.ascontiguousarray(np.hstack(columns), dtype=np.float32)
+
+    def _prepare_symbol(self, symbol, raw_df=None):
+        raw_df = self.fetch_data(symbol) if raw_df is None else raw_df
+        if raw_df is None or raw_df.empty:
+            return symbol, None
+        df = self.prepare_features(normalize_ohlc(raw_df).copy())
+        return symbol, (df if not df.empty else None)
+
+    def _prepare_universe(self, symbols, frames=None):
+        """Features de chaque valeur, téléchargées en parallèle si aucun DataFrame n'est fourni."""
+        frames = frames or {}
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = executor.map(lambda s: self._prepare_symbol(s, frames.get(s)), symbols)
+            return {s: df for s, df in results if df is not None}
+
+    def train_pooled(self, symbols, sectors=None, encode_sector=True, encode_symbol=False, frames=None):
+        """
+        Entraîne un modèle par horizon sur le panel empilé de toutes les valeurs.
+        Sept artefacts au total, quel que soit le nombre de symboles.
+        """
+        logger.info(f"Début de l'entraînement IA mutualisé sur {len(symbols)} valeurs...")
+        prepared = self._prepare_universe(symbols, frames)
+        if not prepared:
+            logger.warning("Aucune donnée pour l'entraînement mutualisé")
+            return False
+
+        meta = {
+            'encode_sector': encode_sector,
+            'encode_symbol': encode_symbol,
+            'sectors': sorted({normalize_sector(sectors[s]) for s in prepared if sectors and sectors.get(s)}),
+            'symbols': sorted(prepared.keys()),
+            'trained_at': datetime.now().isoformat()
+        }
+
+        blocks_X, blocks_Y = [], []
+        for symbol, df in prepared.items():
+            _, Y = self.build_training_matrices(df)
+            features = self.pooled_features(df).to_numpy(dtype=np.float32)
+            blocks_X.append(self._encode_pooled(features, [symbol] * len(df), sectors, meta))
+            blocks_Y.append(Y)
+        X = np.concatenate(blocks_X)
+        Y = np.concatenate(blocks_Y)
+        del blocks_X, blocks_Y
+
+        feature_names = POOLED_FEATURE_COLS + (['sector'] if encode_sector else []) + (['symbol'] if encode_symbol else [])
+        feature_types = ['q'] * len(POOLED_FEATURE_COLS) + ['c'] * (len(feature_names) - len(POOLED_FEATURE_COLS))
+        dtrain = xgb.QuantileDMatrix(X, feature_names=feature_names, feature_types=feature_types, enable_categorical=True, nthread=self.n_jobs or -1)
+
+        training_results = {}
+        for j, name in enumerate(self.horizons.keys()):
+            try:
+                valid = ~np.isnan(Y[:, j])
+                if not valid.any():
+                    continue
+                dtrain.set_label(np.where(valid, Y[:, j], 0.0))
+                dtrain.set_weight(valid.astype(np.float32))
+                model = xgb.train(self.xgb_params(), dtrain, num_boost_round=N_ROUNDS)
+
+                self.save_model(POOLED_PREFIX, name, model)
+                training_results[name] = int(valid.sum())
+            except Exception as e:
+                logger.error(f"Erreur entraînement mutualisé horizon {name}: {e}")
+
+        atomic_write_json(meta, self.pooled_meta_path())
+        self.pooled_meta = meta
+        self.pooled_meta_mtime = os.stat(self.pooled_meta_path()).st_mtime_ns
+        logger.info(f"✓ Modèle mutualisé entraîné sur {len(X)} lignes ({len(prepared)} valeurs)")
+        return training_results
+
+    def predict_pooled_rows(self, prepared, sectors=None, horizons=None):
+        """Inférence groupée : une seule prédiction par horizon pour toutes les valeurs fournies."""
+        meta = self.load_pooled_meta()
+        if not meta or not prepared:
+            return {}
+
+        symbols = list(prepared.keys())
+        features = np.vstack([self.pooled_features(prepared[s].tail(1)).to_numpy(dtype=np.float32) for s in symbols])
+        X = self._encode_pooled(features, symbols, sectors, meta)
+
+        predictions = {s: {} for s in symbols}
+        for name in (horizons or self.horizons.keys()):
+            model = self.load_model(POOLED_PREFIX, name)
+            if model is None:
+                continue
+            for symbol, pred in zip(symbols, model.inplace_predict(X)):
+                predictions[symbol][name] = round(float(pred) * 100, 2)
+        return predictions
+
+    def predict_universe(self, symbols, sectors=None, frames=None):
+        """Prédictions du modèle mutualisé pour tout l'univers en un appel (frames : cache marché optionnel)."""
+        try:
+            prepared = self._prepare_universe(symbols, frames)
+            return self.predict_pooled_rows(prepared, sectors)
+        except Exception as e:
+            logger.error(f"Erreur predict_universe: {e}")
+            return {}
+
+    def meta_path(self, symbol):
+        return os.path.join(self.model_dir, f"{symbol}.meta.json")
+
+    def load_meta(self, symbol):
+        """Métadonnées d'entraînement : date du dernier entraînement complet et filigrane par horizon."""
+        path = self.meta_path(symbol)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Métadonnées illisibles pour {symbol}: {e}")
+        return None
+
+    def save_meta(self, symbol, meta):
+        atomic_write_json(meta, self.meta_path(symbol))
+
+    def model_path(self, symbol, name):
+        return os.path.join(self.model_dir, f"{symbol}_{name}.joblib")
+
+    def save_model(self, symbol, name, model):
+        """Sauvegarde atomique du modèle d'un horizon et mise en cache avec le mtime du fichier écrit."""
+        model_key = f"{symbol}_{name}"
+        path = self.model_path(symbol, name)
+        atomic_dump(model, path)
+        self.models[model_key] = model
+        self.model_mtimes[model_key] = os.stat(path).st_mtime_ns
+
+    def load_model(self, symbol, name):
+        """
+        Charge (ou récupère du cache) le modèle d'un horizon, None s'il n'existe pas.
+        Le cache est invalidé quand le fichier a été réécrit depuis le chargement.
+        """
+        model_key = f"{symbol}_{name}"
+        try:
+            mtime = os.stat(self.model_path(symbol, name)).st_mtime_ns
+        except FileNotFoundError:
+            self.models.pop(model_key, None)
+            self.model_mtimes.pop(model_key, None)
+            return None
+        if model_key not in self.models or self.model_mtimes.get(model_key) != mtime:
+            self.models[model_key] = joblib.load(self.model_path(symbol, name))
+            self.model_mtimes[model_key] = mtime
+        return self.models[model_key]
+
+    def update_incremental(self, symbol, rounds=INCREMENTAL_ROUNDS, drift_threshold=DRIFT_THRESHOLD, max_age_days=MAX_MODEL_AGE_DAYS):
+        """
+        Met à jour les modèles d'un symbole en poursuivant le boosting sur les barres
+        arrivées depuis le dernier filigrane d'entraînement.
+
+        Un réentraînement complet est déclenché si les modèles ou métadonnées manquent,
+        si le dernier entraînement complet date de plus de max_age_days, ou si le modèle
+        fait pire qu'une prédiction nulle de plus de drift_threshold sur les nouvelles barres.
+        """
+        meta = self.load_meta(symbol)
+        if not meta or not self.has_all_models(symbol):
+            logger.info(f"Pas de modèle incrémental pour {symbol}, entraînement complet.")
+            return self.train_for_horizons(symbol)
+
+        if datetime.now() - datetime.fromisoformat(meta['full_trained_at']) > timedelta(days=max_age_days):
+            logger.info(f"Modèles de {symbol} trop anciens, entraînement complet.")
+            return self.train_for_horizons(symbol)
+
+        label_until = {name: pd.Timestamp(ts) for name, ts in meta['label_until'].items()}
+        start_date = min(label_until.values()).to_pydatetime().replace(tzinfo=None) - timedelta(days=FEATURE_WARMUP_DAYS)
+        raw_df = self.fetch_data(symbol, start_date=start_date)
+        if raw_df is None or raw_df.empty:
+            return {}
+
+        df = self.prepare_features(raw_df)
+        X, Y = self.build_training_matrices(df)
+        dates = df.index
+
+        # 1. Détection de dérive sur les nouvelles barres, avant toute mise à jour
+        updates = {}
+        for j, name in enumerate(self.horizons.keys()):
+            model = self.load_model(symbol, name)
+            if name not in label_until or not isinstance(model, xgb.Booster):
+                logger.info(f"Modèle {symbol}_{name} non incrémental, entraînement complet.")
+                return self.train_for_horizons(symbol)
+
+            new_rows = ~np.isnan(Y[:, j]) & (dates > label_until[name])
+            if new_rows.sum() < INCREMENTAL_MIN_ROWS:
+                continue
+
+            y_new = Y[new_rows, j]
+            rmse_model = float(np.sqrt(np.mean((model.inplace_predict(X[new_rows]) - y_new) ** 2)))
+            rmse_zero = float(np.sqrt(np.mean(y_new ** 2)))
+            if rmse_model > rmse_zero * (1 + drift_threshold):
+                logger.info(f"Dérive détectée pour {symbol}_{name} (RMSE {rmse_model:.4f} vs {rmse_zero:.4f}), entraînement complet.")
+                return self.train_for_horizons(symbol)
+            updates[name] = (j, model, new_rows)
+
+        # 2. Poursuite du boosting sur les seules nouvelles barres
+        training_results = {}
+        for name, (j, model, new_rows) in updates.items():
+            try:
+                dnew = xgb.DMatrix(X[new_rows], label=Y[new_rows, j], feature_names=self.feature_cols)
+                model = xgb.train(self.xgb_params(), dnew, num_boost_round=rounds, xgb_model=model)
+
+                self.save_model(symbol, name, model)
+
+                last_valid = np.flatnonzero(new_rows)[-1]
+                training_results[name] = float(model.inplace_predict(X[last_valid:last_valid + 1])[0]) * 100
+                meta['label_until'][name] = dates[last_valid].isoformat()
+            except Exception as e:
+                logger.error(f"Erreur mise à jour incrémentale {symbol} horizon {name}: {e}")
+
+        meta['updated_at'] = datetime.now().isoformat()
+        self.save_meta(symbol, meta)
+        logger.info(f"✓ Mise à jour incrémentale de {symbol} : {len(training_results)} horizons rafraîchis")
+        return training_results
+
+    def has_all_models(self, symbol):
+        """Vrai si un modèle existe sur disque pour chaque horizon du symbole."""
+        return all(
+            os.path.exists(os.path.join(self.model_dir, f"{symbol}_{name}.joblib"))
+            for name in self.horizons.keys()
+        )
+
 if __name__ == "__main__":
     # Test sur Air Liquide (AI.PA)
     predictor = MLPredictor()
@@ -1,13 +1,130 @@
-import feedparser
+import re
 import urllib.parse
 import logging
+import unicodedata
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Import de notre nouveau module
 from core.social_intelligence import fetch_official_social_news, load_social_config # Import de load_social_config
+from core.data_source import parse_feed
+from core.database import CAC40_TICKERS
+from core.http_cache import ttl_for
+from core.quote_cache import QuoteCache
+from core.news_store import dedupe
 
 logger = logging.getLogger("TradingEngine.News")
 
+LESECHOS_RSS = "https://services.lesechos.fr/rss/lesechos-finance-marches.xml"
+MAX_FEED_ITEMS = 8
+NEWS_DEADLINE = 4.0     # Échéance globale (s) de get_combined_news
+NEWS_TTL = 300          # Durée de validité d'une réponse par source et symbole
+NEWS_WORKERS = 16
+
+# Noms usuels en complément des raisons sociales (titres de presse)
+COMPANY_ALIASES = {
+    'MC.PA': ['Louis Vuitton', 'Moët Hennessy'],
+    'OR.PA': ['Oréal'],
+    'GLE.PA': ['SocGen'],
+    'STMPA.PA': ['STMicro', 'ST Micro'],
+    'STLAP.PA': ['Peugeot'],
+    'URW.PA': ['Unibail', 'URW'],
+    'EL.PA': ['Essilor'],
+    'SU.PA': ['Schneider'],
+    'ERF.PA': ['Eurofins'],
+    'RI.PA': ['Pernod'],
+    'MT.AS': ['Arcelor'],
+    'TTE.PA': ['Total Energies'],
+    'AIR.PA': ['Airbus Group']
+}
+# Suffixes juridiques ignorés en fin de nom ("Apple Inc." -> "apple")
+LEGAL_SUFFIXES = {'sa', 'se', 'inc', 'corp', 'corporation', 'plc', 'ltd', 'nv', 'ag', 'group', 'groupe'}
+
+def normalize_tokens(text):
+    """Mots en minuscules, sans accents ni ponctuation ("L'Oréal" -> ['l', 'oreal'])."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.findall(r"[a-z0-9]+", text)
+
+def alias_tokens(name):
+    tokens = normalize_tokens(name)
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return tuple(tokens)
+
+def build_alias_index(extra=None):
+    """
+    Index {premier mot: [(mots de l'alias, symbole)]} construit à partir des noms du CAC 40,
+    des alias usuels et de la configuration sociale ; extra = {symbole: [noms]} supplémentaires.
+    """
+    names = {}
+    for symbol, name, sector in CAC40_TICKERS:
+        if sector != 'Indices':
+            names.setdefault(symbol, set()).add(name)
+    for symbol, company in load_social_config().items():
+        if company.get('company_name'):
+            names.setdefault(symbol, set()).add(company['company_name'])
+    for source in (COMPANY_ALIASES, extra or {}):
+        for symbol, aliases in source.items():
+            names.setdefault(symbol, set()).update(aliases)
+
+    index = {}
+    for symbol, aliases in names.items():
+        for alias in aliases:
+            tokens = alias_tokens(alias)
+            if tokens:
+                index.setdefault(tokens[0], []).append((tokens, symbol))
+    return index
+
+def match_symbols(text, index):
+    """Symboles dont un alias apparaît (mots entiers consécutifs) dans le texte."""
+    tokens = normalize_tokens(text)
+    found = set()
+    for i, token in enumerate(tokens):
+        for alias, symbol in index.get(token, ()):
+            if tuple(tokens[i:i + len(alias)]) == alias:
+                found.add(symbol)
+    return found
+
+class FeedIndex:
+    """Entrées d'un flux RSS parsées une fois, avec leur affectation aux symboles."""
+
+    def __init__(self, feed, publisher, alias_index=None):
+        self.items = []
+        self.by_symbol = {}
+        for entry in feed.entries:
+            title = getattr(entry, 'title', None)
+            link = getattr(entry, 'link', None)
+            if not title or not link or title.lower() == 'none':
+                continue
+            item = {
+                'title': title,
+                'link': link,
+                'publisher': publisher or entry.get('source', {}).get('title', 'Google News'),
+                'published': entry.published if hasattr(entry, 'published') else 'N/A'
+            }
+            self.items.append(item)
+            if alias_index is not None:
+                text = f"{title} {getattr(entry, 'summary', '')}"
+                for symbol in match_symbols(text, alias_index):
+                    self.by_symbol.setdefault(symbol, []).append(item)
+
+    def for_symbol(self, symbol, name=None):
+        """Entrées concernant le symbole ; le nom fourni sert d'alias pour un symbole hors index."""
+        if symbol in self.by_symbol or not name or name == symbol:
+            return self.by_symbol.get(symbol, [])
+        alias_index = build_alias_index({symbol: [name]})
+        return [item for item in self.items if symbol in match_symbols(item['title'], alias_index)]
+
+# Flux parsés partagés : chaque URL est téléchargée (GET conditionnel via le cache HTTP)
+# et parsée au plus une fois par TTL, les appels simultanés attendent le même téléchargement
+_feed_cache = QuoteCache(ttl=lambda url: ttl_for(url[1]), refresh_workers=2)
+
+def get_feed_index(url, publisher=None, match=False):
+    """FeedIndex du flux (None si le téléchargement a échoué)."""
+    return _feed_cache.get((publisher, url, match),
+                           lambda: FeedIndex(parse_feed(url), publisher, build_alias_index() if match else None))
+
 def fetch_google_finance_news(symbol, name=None):
     """
     Récupère les actualités via le flux RSS de Google News.
@@ -17,89 +134,94 @@ def fetch_google_finance_news(symbol, name=None):
     encoded_query = urllib.parse.quote(query)
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}+bourse&hl=fr&gl=FR&ceid=FR:fr"
     
-    news_items = []
     try:
-        feed = feedparser.parse(rss_url)
-        for entry in feed.entries[:8]:
-            title = getattr(entry, 'title', None)
-            link = getattr(entry, 'link', None)
-            if not title or not link or title.lower() == 'none':
-                continue
-                
-            news_items.append({
-                'title': title,
-                'link': link,
-                'publisher': entry.source.get('title', 'Google News'),
-                'published': entry.published if hasattr(entry, 'published') else 'N/A'
-            })
+        index = get_feed_index(rss_url)
+        return index.items[:MAX_FEED_ITEMS] if index else []
     except Exception as e:
         logger.error(f"Error fetching Google News for {symbol}: {e}")
-        
-    return news_items
+        return []
 
 def fetch_lesechos_news(symbol, name=None):
     """
     Récupère les actualités via le flux RSS de Les Echos Finance & Marchés.
+    Le flux étant global, il est téléchargé une fois par TTL pour tous les symboles
+    et ses entrées sont affectées aux sociétés citées (nom ou alias).
     """
-    rss_url = "https://services.lesechos.fr/rss/lesechos-finance-marches.xml"
-    
-    news_items = []
     try:
-        feed = feedparser.parse(rss_url)
-        for entry in feed.entries[:8]: # Limit to 8 entries like Google News
-            title = getattr(entry, 'title', None)
-            link = getattr(entry, 'link', None)
-            if not title or not link or title.lower() == 'none':
-                continue
-                
-            news_items.append({
-                'title': title,
-                'link': link,
-                'publisher': 'Les Echos',
-                'published': entry.published if hasattr(entry, 'published') else 'N/A'
-            })
+        index = get_feed_index(LESECHOS_RSS, 'Les Echos', match=True)
+        return index.for_symbol(symbol, name)[:MAX_FEED_ITEMS] if index else []
     except Exception as e:
         logger.error(f"Error fetching Les Echos news for {symbol}: {e}")
-        
+        return []
+
+def fetch_yahoo_news(ticker_obj):
+    news_items = []
+    for n in (ticker_obj.news or [])[:5]:
+        title = n.get('title')
+        link = n.get('link')
+        if not title or not link or title.lower() == 'none':
+            continue
+
+        news_items.append({
+            'title': title,
+            'link': link,
+            'publisher': n.get('publisher', 'Yahoo Finance'),
+            'published': datetime.fromtimestamp(n.get('providerPublishTime')).strftime('%d/%m/%Y %H:%M') if n.get('providerPublishTime') else 'N/A'
+        })
     return news_items
 
-def get_combined_news(ticker_obj, symbol, name=None):
-    """Combine les news de yfinance, Google News et les réseaux sociaux officiels."""
-    combined = []
-    
-    # 1. News yfinance
-    try:
-        yf_news = ticker_obj.news
-        for n in yf_news[:5]:
-            title = n.get('title')
-            link = n.get('link')
-            if not title or not link or title.lower() == 'none':
-                continue
-                
-            combined.append({
-                'title': title,
-                'link': link,
-                'publisher': n.get('publisher', 'Yahoo Finance'),
-                'published': datetime.fromtimestamp(n.get('providerPublishTime')).strftime('%d/%m/%Y %H:%M') if n.get('providerPublishTime') else 'N/A'
-            })
-    except: pass
-    
-    # 2. News Google (en français)
-    google_news = fetch_google_finance_news(symbol, name)
-    combined.extend(google_news)
+def fetch_social_news(symbol):
+    # News des réseaux sociaux officiels (dynamique via social_config.json)
+    # Cas normal pour la plupart des valeurs : pas d'avertissement à chaque ingestion
+    if not load_social_config().get(symbol):
+        logger.debug(f"Aucune configuration sociale pour {symbol}, actualités sociales ignorées.")
+        return []
+    official_social_news, _ = fetch_official_social_news(symbol)
+    return official_social_news
 
-    # 3. News Les Echos
-    lesechos_news = fetch_lesechos_news(symbol, name)
-    combined.extend(lesechos_news)
-    
-    # 4. News des réseaux sociaux officiels (dynamique via social_config.json)
-    social_config = load_social_config()
-    company_data = social_config.get(symbol)
-    
-    if company_data:
-        official_social_news, _ = fetch_official_social_news(symbol)
-        combined.extend(official_social_news)
-    else:
-        logger.warning(f"Aucune configuration sociale trouvée pour le symbole {symbol}. Les actualités sociales officielles ne seront pas incluses.")
-    
-    return combined
+class NewsResult(list):
+    """Actualités disponibles à l'échéance ; timed_out liste les sources encore en attente."""
+
+    def __init__(self, items=(), timed_out=()):
+        super().__init__(items)
+        self.timed_out = list(timed_out)
+
+# Résultats par (source, symbole, nom) : une réponse arrivée après l'échéance
+# y est tout de même conservée et servie à l'appel suivant
+_source_cache = QuoteCache(ttl=lambda key: NEWS_TTL, refresh_workers=2)
+_news_pool = ThreadPoolExecutor(max_workers=NEWS_WORKERS, thread_name_prefix="news")
+
+def _cached_source(source, symbol, name, fetch):
+    return _source_cache.get((source, symbol, name), fetch) or []
+
+def get_combined_news(ticker_obj, symbol, name=None, deadline=NEWS_DEADLINE):
+    """
+    Combine les news de yfinance, Google News, Les Echos et les réseaux sociaux officiels.
+    Les sources sont interrogées en parallèle ; au bout de `deadline` secondes, seules les
+    réponses arrivées sont retournées (ordre des sources conservé, doublons retirés) et les
+    autres sont signalées dans `timed_out`. Appelé par l'ingestion (core/news_ingest.py),
+    les pages lisent le NewsStore.
+    """
+    sources = []
+    if ticker_obj is not None:
+        sources.append(('yahoo', lambda: fetch_yahoo_news(ticker_obj)))
+    sources += [
+        ('google', lambda: fetch_google_finance_news(symbol, name)),
+        ('lesechos', lambda: fetch_lesechos_news(symbol, name)),
+        ('social', lambda: fetch_social_news(symbol))
+    ]
+    futures = [(source, _news_pool.submit(_cached_source, source, symbol, name, fetch)) for source, fetch in sources]
+    wait([future for _, future in futures], timeout=deadline)
+
+    combined, timed_out = [], []
+    for source, future in futures:
+        if not future.done():
+            timed_out.append(source)
+            continue
+        try:
+            combined.extend(future.result())
+        except Exception as e:
+            logger.error(f"Erreur de la source {source} pour {symbol}: {e}")
+    if timed_out:
+        logger.warning(f"Actualités {symbol} : sources hors délai ({deadline}s) {', '.join(timed_out)}")
+    return NewsResult(dedupe(combined), timed_out)
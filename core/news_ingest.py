@@ -0,0 +1,134 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .database import get_db_connection, CAC40_TICKERS
+from .data_source import get_ticker
+from .social_intelligence import load_social_config, fetch_social_news_batch
+from .analysis import score_title
+from .news import get_combined_news
+from .news_store import get_news_store
+
+logger = logging.getLogger("TradingEngine.NewsIngest")
+
+MAX_SYMBOLS_PER_RUN = 60    # Symboles rafraîchis par passage (les plus anciens d'abord)
+REQUESTS_PER_MINUTE = 60    # Budget de requêtes vers les sources d'actualités
+INGEST_WORKERS = 4
+INGEST_DEADLINE = 15.0      # Hors requête web : échéance plus large que /analyze
+SOURCES_PER_SYMBOL = 2      # Requêtes propres à un symbole (Yahoo, Google News ; Les Echos est partagé)
+
+class RateBudget:
+    """Espacement régulier des requêtes : au plus per_minute appels par minute, tous threads confondus."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, units=1):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + units * self.interval
+        if start > now:
+            time.sleep(start - now)
+
+_budget = RateBudget(REQUESTS_PER_MINUTE)
+_last_ingested = {}         # symbole -> dernier passage (monotonic)
+_pending = set()
+_pending_lock = threading.Lock()
+_on_demand = ThreadPoolExecutor(max_workers=2, thread_name_prefix="news-ingest")
+
+def active_universe():
+    """{symbole: nom} des valeurs suivies : table tickers, abonnements aux alertes et configuration sociale."""
+    names = {symbol: name for symbol, name, _ in CAC40_TICKERS}
+    # Requêtes séparées : la table tickers n'existe pas sur une base neuve
+    for query in ("SELECT symbol, name FROM tickers", "SELECT DISTINCT symbol, NULL FROM alert_subscriptions"):
+        try:
+            with get_db_connection() as conn:
+                for symbol, name in conn.execute(query).fetchall():
+                    names[symbol] = name or names.get(symbol, symbol)
+        except Exception as e:
+            logger.warning(f"Univers suivi incomplet ({query}): {e}")
+    for symbol, company in load_social_config().items():
+        names.setdefault(symbol, company.get('company_name') or symbol)
+    return {symbol: name for symbol, name in names.items() if not symbol.startswith('^')}
+
+def ingest_symbol(symbol, name=None):
+    """Récupère, note et archive les actualités d'un symbole. Retourne (nouveaux, doublons)."""
+    _budget.acquire(SOURCES_PER_SYMBOL)
+    try:
+        ticker_obj = get_ticker(symbol)
+    except Exception as e:
+        logger.warning(f"Ticker indisponible pour {symbol}: {e}")
+        ticker_obj = None
+    news = get_combined_news(ticker_obj, symbol, name, deadline=INGEST_DEADLINE)
+    articles = [{**item, 'symbol': symbol, 'sentiment': score_title(item.get('title'))} for item in news]
+    result = get_news_store().upsert_many(articles)
+    _last_ingested[symbol] = time.monotonic()
+    return result
+
+def ingest_news(symbols=None, max_symbols=MAX_SYMBOLS_PER_RUN):
+    """
+    Tâche planifiée : rafraîchit les actualités de l'univers suivi sous le budget de requêtes,
+    en commençant par les symboles rafraîchis le moins récemment.
+    """
+    universe = active_universe()
+    if symbols is not None:
+        universe = {symbol: universe.get(symbol, symbol) for symbol in symbols}
+    batch = sorted(universe, key=lambda s: _last_ingested.get(s, 0.0))[:max_symbols]
+
+    start = time.time()
+    inserted = duplicates = 0
+    # Requêtes sociales dédupliquées sur tout le lot (cache de recherche chaud pour chaque symbole),
+    # limitées aux valeurs ayant une configuration sociale
+    social_config = load_social_config()
+    configured = [symbol for symbol in batch if symbol in social_config]
+    if configured:
+        try:
+            fetch_social_news_batch(configured)
+        except Exception as e:
+            logger.error(f"Erreur de préchargement des actualités sociales: {e}")
+    with ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="news-ingest") as executor:
+        futures = {executor.submit(ingest_symbol, symbol, universe[symbol]): symbol for symbol in batch}
+        for future, symbol in futures.items():
+            try:
+                new, dup = future.result()
+                inserted += new
+                duplicates += dup
+            except Exception as e:
+                logger.error(f"Erreur d'ingestion des actualités {symbol}: {e}")
+    get_news_store().prune()
+    logger.info(f"Ingestion actualités : {len(batch)} symboles, {inserted} articles, {duplicates} doublons en {time.time() - start:.1f}s")
+    return inserted, duplicates
+
+def request_ingest(symbol, name=None):
+    """Ingestion en arrière-plan d'un symbole absent du stock (ex. première consultation), sans attendre."""
+    with _pending_lock:
+        if symbol in _pending:
+            return
+        _pending.add(symbol)
+
+    def run():
+        try:
+            ingest_symbol(symbol, name)
+        except Exception as e:
+            logger.error(f"Erreur d'ingestion des actualités {symbol}: {e}")
+        finally:
+            with _pending_lock:
+                _pending.discard(symbol)
+
+    _on_demand.submit(run)
+
+def ingest_pending(symbol):
+    """Vrai si une ingestion à la demande du symbole est en cours."""
+    with _pending_lock:
+        return symbol in _pending
+
+def get_symbol_news(symbol, name=None, days=7, limit=20):
+    """Actualités précalculées d'un symbole (lecture seule) ; ingestion asynchrone si le stock est vide."""
+    news = get_news_store().recent(symbol, days=days, limit=limit)
+    if not news:
+        request_ingest(symbol, name)
+    return news
@@ -0,0 +1,298 @@
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .database import DB_PATH
+
+logger = logging.getLogger("TradingEngine.NewsStore")
+
+RETENTION_DAYS = 90
+DEDUP_WINDOW_DAYS = 3       # Fenêtre de recherche des quasi-doublons d'un titre
+TITLE_SIMILARITY = 0.8      # Jaccard des mots des titres à partir duquel deux articles sont le même
+# Suffixe " - Éditeur" ajouté par Google News (et certains flux) à la fin des titres
+PUBLISHER_SUFFIX = re.compile(r"\s+[-–—|]\s+([^-–—|]+)$")
+TRACKING_PARAMS = ('utm_', 'xtor', 'at_', 'fbclid', 'gclid', 'ocid')
+
+# Colonnes ajoutées à la table news_cache créée par init_db
+NEWS_COLUMNS = {
+    'link_hash': 'TEXT',
+    'published_ts': 'REAL',
+    'sentiment': 'REAL',
+    'duplicate_of': 'INTEGER'
+}
+
+def normalize_link(url):
+    """Lien canonique : hôte en minuscules, sans fragment, paramètres de suivi ni slash final."""
+    parts = urlsplit((url or '').strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), urlencode(sorted(query)), ''))
+
+def link_hash(url):
+    return hashlib.sha1(normalize_link(url).encode()).hexdigest()
+
+def strip_publisher(title, publisher=None):
+    """Titre sans le suffixe " - Éditeur" (éditeur connu, ou suffixe court après un titre d'au moins 4 mots)."""
+    title = (title or '').strip()
+    match = PUBLISHER_SUFFIX.search(title)
+    if match:
+        suffix, head = match.group(1).strip(), title[:match.start()]
+        if (publisher and suffix.lower() == publisher.lower()) or (len(suffix.split()) <= 4 and len(head.split()) >= 4):
+            return head
+    return title
+
+def title_features(title, publisher=None):
+    """Ensemble des mots normalisés du titre, hors suffixe d'éditeur."""
+    from .news import normalize_tokens
+    return frozenset(normalize_tokens(strip_publisher(title, publisher)))
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+class TitleIndex:
+    """
+    Recherche des titres quasi identiques (Jaccard des mots >= TITLE_SIMILARITY) par index
+    inversé mot -> titres : seuls les titres partageant au moins un mot sont comparés.
+    Un mot ajouté ou retiré dans un titre de 8 à 12 mots reste au-dessus du seuil.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._postings = {}
+
+    def add(self, features, ref):
+        position = len(self._entries)
+        self._entries.append((features, ref))
+        for token in features:
+            self._postings.setdefault(token, []).append(position)
+
+    def find(self, features):
+        """Référence d'un titre proche déjà indexé (None sinon)."""
+        if not features:
+            return None
+        shared = Counter(position for token in features for position in self._postings.get(token, ()))
+        for position, count in shared.most_common():
+            other, ref = self._entries[position]
+            if count / (len(features) + len(other) - count) >= TITLE_SIMILARITY:
+                return ref
+            if count < TITLE_SIMILARITY * len(features):
+                break
+        return None
+
+def dedupe(items):
+    """Retire d'une liste d'actualités les doublons (même lien ou titre quasi identique), ordre conservé."""
+    seen_links, seen_titles, unique = set(), TitleIndex(), []
+    for item in items:
+        key = link_hash(item.get('link'))
+        features = title_features(item.get('title'), item.get('publisher'))
+        if key in seen_links or seen_titles.find(features) is not None:
+            continue
+        seen_links.add(key)
+        seen_titles.add(features, key)
+        unique.append(item)
+    return unique
+
+def parse_published(value, default=None):
+    """Horodatage d'une date RSS (RFC 822), ISO ou 'jj/mm/aaaa hh:mm' ; default si illisible."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value and value != 'N/A':
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            pass
+        for fmt in ('%d/%m/%Y %H:%M', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%d %H:%M:%S'):
+            try:
+                return datetime.strptime(value, fmt).timestamp()
+            except ValueError:
+                continue
+    return default
+
+class NewsStore:
+    """
+    Stockage persistant des actualités (table news_cache) : une ligne par (lien normalisé, symbole),
+    quasi-doublons de titres marqués (Jaccard des mots), titres indexés en FTS5 pour la recherche.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+
+    def _migrate(self):
+        with self._lock, self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS news_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT,
+                title TEXT,
+                link TEXT,
+                pubDate TEXT,
+                source TEXT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            )''')
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(news_cache)")}
+            for name, sql_type in NEWS_COLUMNS.items():
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE news_cache ADD COLUMN {name} {sql_type}")
+            # Anciennes lignes sans empreinte : complétées une fois pour rejoindre l'index
+            for row_id, link, title, pub_date in self.conn.execute(
+                    "SELECT id, link, title, pubDate FROM news_cache WHERE link_hash IS NULL").fetchall():
+                self.conn.execute("UPDATE news_cache SET link_hash = ?, published_ts = ? WHERE id = ?",
+                                  (link_hash(link), parse_published(pub_date, time.time()), row_id))
+            self.conn.execute('''DELETE FROM news_cache WHERE id NOT IN
+                                 (SELECT MIN(id) FROM news_cache GROUP BY link_hash, symbol)''')
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_news_link_symbol ON news_cache(link_hash, symbol)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_news_symbol_ts ON news_cache(symbol, published_ts)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_news_ts ON news_cache(published_ts)")
+
+            fts_exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'news_fts'").fetchone()
+            self.conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+                title, content='news_cache', content_rowid='id', tokenize='unicode61 remove_diacritics 2')''')
+            self.conn.execute('''CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news_cache BEGIN
+                INSERT INTO news_fts(rowid, title) VALUES (new.id, new.title);
+            END''')
+            self.conn.execute('''CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news_cache BEGIN
+                INSERT INTO news_fts(news_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            END''')
+            self.conn.execute('''CREATE TRIGGER IF NOT EXISTS news_fts_update AFTER UPDATE OF title ON news_cache BEGIN
+                INSERT INTO news_fts(news_fts, rowid, title) VALUES ('delete', old.id, old.title);
+                INSERT INTO news_fts(rowid, title) VALUES (new.id, new.title);
+            END''')
+            if not fts_exists:
+                self.conn.execute("INSERT INTO news_fts(news_fts) VALUES ('rebuild')")
+
+    def _recent_titles(self, symbols, since):
+        placeholders = ','.join('?' * len(symbols))
+        rows = self.conn.execute(f'''SELECT symbol, id, title, source FROM news_cache
+                                     WHERE symbol IN ({placeholders}) AND published_ts >= ? AND duplicate_of IS NULL''',
+                                 (*symbols, since)).fetchall()
+        titles = {}
+        for symbol, row_id, title, source in rows:
+            titles.setdefault(symbol, TitleIndex()).add(title_features(title, source), row_id)
+        return titles
+
+    def upsert_many(self, articles):
+        """
+        Insertion groupée d'actualités (dicts avec symbol, title, link, publisher / source,
+        published et éventuellement sentiment). Un lien déjà connu pour le symbole n'est pas
+        dupliqué ; un titre quasi identique à un article récent est marqué duplicate_of.
+        Retourne (nouveaux articles, quasi-doublons).
+        """
+        now = time.time()
+        rows = []
+        for article in articles:
+            title, link, symbol = article.get('title'), article.get('link'), article.get('symbol')
+            if not title or not link or not symbol:
+                continue
+            rows.append({
+                'symbol': symbol, 'title': title, 'link': link,
+                'pubDate': article.get('published'),
+                'source': article.get('publisher') or article.get('source'),
+                'link_hash': link_hash(link),
+                'published_ts': parse_published(article.get('published'), now),
+                'sentiment': article.get('sentiment')
+            })
+        if not rows:
+            return 0, 0
+
+        inserted = duplicates = 0
+        with self._lock, self.conn:
+            titles = self._recent_titles(sorted({r['symbol'] for r in rows}), now - DEDUP_WINDOW_DAYS * 86400)
+            known = {(r[0], r[1]) for r in self.conn.execute(
+                f"SELECT link_hash, symbol FROM news_cache WHERE link_hash IN ({','.join('?' * len(rows))})",
+                [r['link_hash'] for r in rows])}
+            for row in rows:
+                key = (row['link_hash'], row['symbol'])
+                if key in known:
+                    if row['sentiment'] is not None:
+                        self.conn.execute("UPDATE news_cache SET sentiment = ? WHERE link_hash = ? AND symbol = ?",
+                                          (row['sentiment'], *key))
+                    continue
+                known.add(key)
+                recent = titles.setdefault(row['symbol'], TitleIndex())
+                features = title_features(row['title'], row['source'])
+                row['duplicate_of'] = recent.find(features)
+                cursor = self.conn.execute('''INSERT INTO news_cache
+                    (symbol, title, link, pubDate, source, link_hash, published_ts, sentiment, duplicate_of)
+                    VALUES (:symbol, :title, :link, :pubDate, :source, :link_hash, :published_ts, :sentiment, :duplicate_of)''', row)
+                if row['duplicate_of'] is None:
+                    recent.add(features, cursor.lastrowid)
+                    inserted += 1
+                else:
+                    duplicates += 1
+        return inserted, duplicates
+
+    def recent(self, symbol, days=7, limit=50, include_duplicates=False):
+        """Actualités d'un symbole sur les `days` derniers jours, les plus récentes d'abord."""
+        query = '''SELECT title, link, source, pubDate, published_ts, sentiment FROM news_cache
+                   WHERE symbol = ? AND published_ts >= ?'''
+        if not include_duplicates:
+            query += " AND duplicate_of IS NULL"
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY published_ts DESC LIMIT ?",
+                                     (symbol, time.time() - days * 86400, limit)).fetchall()
+        return [self._as_item(row) for row in rows]
+
+    def sentiment(self, symbol, days=7):
+        """Sentiment moyen (scores calculés à l'ingestion) et nombre d'articles notés sur la fenêtre."""
+        with self._lock:
+            row = self.conn.execute('''SELECT AVG(sentiment), COUNT(sentiment) FROM news_cache
+                                       WHERE symbol = ? AND published_ts >= ? AND duplicate_of IS NULL''',
+                                    (symbol, time.time() - days * 86400)).fetchone()
+        return (row[0] or 0.0), row[1]
+
+    def search(self, text, symbol=None, days=None, limit=50):
+        """Recherche plein texte dans les titres (tous les mots requis, accents ignorés)."""
+        from .news import normalize_tokens
+        tokens = normalize_tokens(text)
+        if not tokens:
+            return []
+        query = '''SELECT n.title, n.link, n.source, n.pubDate, n.published_ts, n.sentiment
+                   FROM news_fts JOIN news_cache n ON n.id = news_fts.rowid
+                   WHERE news_fts MATCH ? AND n.duplicate_of IS NULL'''
+        params = [' '.join(f'"{token}"' for token in tokens)]
+        if symbol:
+            query += " AND n.symbol = ?"
+            params.append(symbol)
+        if days:
+            query += " AND n.published_ts >= ?"
+            params.append(time.time() - days * 86400)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY n.published_ts DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._as_item(row) for row in rows]
+
+    @staticmethod
+    def _as_item(row):
+        return {'title': row[0], 'link': row[1], 'publisher': row[2], 'published': row[3] or 'N/A',
+                'published_ts': row[4], 'sentiment': row[5]}
+
+    def prune(self, days=RETENTION_DAYS):
+        with self._lock, self.conn:
+            cursor = self.conn.execute("DELETE FROM news_cache WHERE published_ts < ?", (time.time() - days * 86400,))
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_news_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NewsStore()
+        return _store
@@ -0,0 +1,136 @@
+import os
+import random
+import shutil
+import logging
+import tempfile
+import itertools
+import multiprocessing
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from . import indicators
+from .backtest import strategy_signals, run_backtest
+
+logger = logging.getLogger("TradingEngine.ParamSweep")
+
+# Seuils aujourd'hui figés dans la stratégie et dans analyze_stock
+PARAM_GRID = {
+    'adx_min': [20, 25, 30, 50],
+    'rsi_exit': [65, 70, 75, 80],
+    'rsi_entry_max': [None, 65, 70],
+    'bb_length': [15, 20, 25],
+    'bb_std': [1.5, 2.0, 2.5],
+    'squeeze_width': [None, 0.05, 0.08],
+    'sma_length': [100, 200],
+    'rsi_length': [14]
+}
+
+# Paramètres qui changent les indicateurs : les points de grille qui les partagent sont regroupés
+INDICATOR_KEYS = ('bb_length', 'bb_std', 'sma_length', 'rsi_length')
+
+# Panel partagé (memmap en lecture seule), ouvert une fois par processus
+_panel = None
+
+def share_panel(panel, directory):
+    """Écrit close/high/low en .npy pour que les processus les mappent en mémoire au lieu de les recevoir par pickle."""
+    for field in ('close', 'high', 'low'):
+        np.save(os.path.join(directory, f"{field}.npy"), panel[field].to_numpy(dtype=np.float64))
+    np.save(os.path.join(directory, "dates.npy"), panel['close'].index.to_numpy())
+    np.save(os.path.join(directory, "symbols.npy"), np.asarray(panel['close'].columns, dtype=str))
+
+def _init_worker(directory):
+    global _panel
+    dates = pd.Index(np.load(os.path.join(directory, "dates.npy"), allow_pickle=True))
+    symbols = list(np.load(os.path.join(directory, "symbols.npy")))
+    _panel = {
+        field: pd.DataFrame(np.load(os.path.join(directory, f"{field}.npy"), mmap_mode='r'), index=dates, columns=symbols, copy=False)
+        for field in ('close', 'high', 'low')
+    }
+    _indicator.cache_clear()
+
+@lru_cache(maxsize=64)
+def _indicator(name, *params):
+    """Indicateur calculé une seule fois par valeur de paramètre, réutilisé par tous les points de grille."""
+    close = _panel['close']
+    if name == 'adx':
+        return indicators.adx(_panel['high'], _panel['low'], close, *params)
+    if name == 'rsi':
+        return indicators.rsi(close, *params)
+    if name == 'sma':
+        return indicators.sma(close, *params)
+    if name == 'bollinger':
+        lower, mid, upper = indicators.bollinger(close, *params)
+        return lower, upper, (upper - lower) / mid
+    raise ValueError(f"Indicateur inconnu : {name}")
+
+def evaluate_params(params):
+    """Backtest de tout l'univers pour une combinaison de paramètres, résumé en métriques agrégées."""
+    bb_lower, bb_upper, bb_width = _indicator('bollinger', params['bb_length'], params['bb_std'])
+    ind = {
+        'adx': _indicator('adx', 14),
+        'bb_upper': bb_upper,
+        'bb_lower': bb_lower,
+        'bb_width': bb_width,
+        'rsi': _indicator('rsi', params['rsi_length']),
+        'sma': _indicator('sma', params['sma_length'])
+    }
+    close = _panel['close']
+    entries, exits, valid = strategy_signals(close, ind, params['adx_min'], params['rsi_exit'],
+                                             params['rsi_entry_max'], params['squeeze_width'], params['bb_length'])
+    summary = run_backtest(close, entries, exits, valid)['summary']
+    return {
+        **params,
+        'mean_return': summary['strategy_return'].mean(),
+        'median_return': summary['strategy_return'].median(),
+        'mean_excess': summary['excess_return'].mean(),
+        'mean_sharpe': summary['sharpe'].mean(),
+        'mean_drawdown': summary['max_drawdown'].mean(),
+        'trades': int(summary['trades'].sum())
+    }
+
+def _evaluate_chunk(chunk):
+    return [evaluate_params(params) for params in chunk]
+
+def grid_points(grid=None, n_random=None, seed=42):
+    """Grille complète, ou n_random points tirés au hasard dans la grille."""
+    grid = grid or PARAM_GRID
+    keys = list(grid.keys())
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    if n_random and n_random < len(combos):
+        combos = random.Random(seed).sample(combos, n_random)
+    return combos
+
+def run_sweep(panel, grid=None, n_random=None, workers=None, rank_by='mean_sharpe', chunk_size=16):
+    """
+    Évalue chaque point de la grille sur tout l'univers dans un pool de processus
+    et retourne le tableau des résultats classé par rank_by (décroissant).
+    """
+    points = grid_points(grid, n_random)
+    # Regroupement par paramètres d'indicateurs : un même chunk réutilise le cache de son processus
+    points.sort(key=lambda p: tuple(p[k] for k in INDICATOR_KEYS))
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    logger.info(f"Balayage de {len(points)} combinaisons ({len(chunks)} lots, {workers} processus)")
+
+    directory = tempfile.mkdtemp(prefix="param_sweep_")
+    results = []
+    try:
+        share_panel(panel, directory)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(directory,)) as executor:
+            futures = [executor.submit(_evaluate_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                try:
+                    results.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Erreur d'évaluation d'un lot: {e}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    table = pd.DataFrame(results)
+    if table.empty:
+        return table
+    return table.sort_values(rank_by, ascending=False).reset_index(drop=True)
@@ -0,0 +1,163 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .backtest import TRADING_DAYS, strategy_indicators, strategy_signals, positions_from_signals
+from .database import get_sector_map
+
+logger = logging.getLogger("TradingEngine.Portfolio")
+
+VOL_LOOKBACK = 63
+
+def rebalance_schedule(dates, freq="W"):
+    """
+    Positions des dates de rebalancement dans l'index : dernière séance de chaque période
+    pandas ('W', 'M', 'Q'...) ou une séance sur freq si freq est un entier.
+    """
+    if isinstance(freq, int):
+        return np.arange(0, len(dates), max(freq, 1))
+    periods = pd.Series(np.arange(len(dates)), index=dates).groupby(dates.to_period(freq)).max()
+    return periods.to_numpy()
+
+def target_weights(active, vol=None, scores=None, codes=None, max_positions=20, max_weight=0.10, sector_cap=0.30, frozen=None):
+    """
+    Poids cibles d'une date : équipondéré (ou inverse de la volatilité si vol est fourni)
+    sur les max_positions meilleurs signaux, plafonné par ligne puis par secteur.
+    Le poids retiré par les plafonds reste en liquidités.
+    frozen : poids des positions non échangeables ce jour-là (pas de cours) ; ils réduisent
+    le budget à répartir et comptent dans l'exposition de leur secteur.
+    """
+    raw = np.where(active, 1.0, 0.0)
+    if vol is not None:
+        raw = np.where(active & (vol > 0), 1.0 / np.where(vol > 0, vol, 1.0), 0.0)
+
+    held = np.flatnonzero(raw > 0)
+    if len(held) > max_positions:
+        rank = scores[held] if scores is not None else raw[held]
+        dropped = held[np.argsort(-np.nan_to_num(rank, nan=-np.inf), kind='stable')[max_positions:]]
+        raw[dropped] = 0.0
+
+    total = raw.sum()
+    budget = 1.0 - frozen.sum() if frozen is not None else 1.0
+    if total <= 0 or budget <= 0:
+        return np.zeros_like(raw)
+    weights = np.minimum(raw / total * budget, max_weight)
+
+    if codes is not None and sector_cap is not None:
+        exposure = np.bincount(codes, weights=weights)
+        room = np.full(len(exposure), sector_cap)
+        if frozen is not None:
+            room = np.maximum(room - np.bincount(codes, weights=frozen, minlength=len(exposure)), 0.0)
+        scale = np.where(exposure > room, room / np.where(exposure > 0, exposure, 1.0), 1.0)
+        weights = weights * scale[codes]
+    return weights
+
+def simulate_portfolio(close, signals, sectors=None, scores=None, capital=100000, max_positions=20, max_weight=0.10,
+                       sector_cap=0.30, cost_bps=10, rebalance="W", sizing="equal"):
+    """
+    Simulation d'un portefeuille multi-valeurs à partir d'un panel de signaux (True = position souhaitée).
+
+    L'état (liquidités, nombre de titres par symbole) est tenu dans des tableaux numpy et
+    n'évolue qu'aux dates de rebalancement ; entre deux rebalancements la valeur du
+    portefeuille est un produit matriciel prix x quantités, sans boucle sur les barres.
+    Les ordres sont exécutés au cours de clôture, les frais (cost_bps) sont prélevés sur le
+    montant échangé.
+    """
+    symbols = list(close.columns)
+    dates = close.index
+    # Valorisation au dernier cours connu, mais échanges uniquement aux séances de la valeur :
+    # un rebalancement tombant sur son jour férié ne vend pas au cours reporté
+    prices = close.ffill().to_numpy(dtype=np.float64)
+    tradable = close.notna().to_numpy()
+    prices_val = np.nan_to_num(prices)
+    wanted = np.asarray(signals, dtype=bool) & tradable
+
+    codes = None
+    if sector_cap is not None:
+        sectors = sectors if sectors is not None else get_sector_map()
+        codes, _ = pd.factorize(pd.Series([sectors.get(s, "Autre") for s in symbols]))
+
+    vol = None
+    if sizing == "inverse_vol":
+        vol = close.pct_change(fill_method=None).rolling(VOL_LOOKBACK, min_periods=VOL_LOOKBACK // 2).std().to_numpy()
+    score_np = scores.reindex(index=dates, columns=symbols).to_numpy() if scores is not None else None
+
+    schedule = rebalance_schedule(dates, rebalance)
+    cost_rate = cost_bps / 10000.0
+    cash = float(capital)
+    holdings = np.zeros(len(symbols))
+    equity = np.empty(len(dates))
+    weights_log, turnover_log, costs_log, cash_log = [], [], [], []
+
+    bounds = np.append(schedule, len(dates))
+    if bounds[0] > 0:
+        equity[:bounds[0]] = cash
+    for k, t in enumerate(schedule):
+        value = cash + prices_val[t] @ holdings
+        # Une valeur sans cours ne peut pas être échangée : sa position est conservée telle quelle
+        # et sa valeur est retirée du budget réparti entre les valeurs échangeables
+        current = prices_val[t] * holdings
+        frozen = np.where(tradable[t], 0.0, current)
+        frozen_value = frozen.sum()
+        weights = target_weights(wanted[t], None if vol is None else vol[t],
+                                 None if score_np is None else score_np[t],
+                                 codes, max_positions, max_weight, sector_cap,
+                                 frozen / value if value > 0 else None)
+
+        target = np.where(tradable[t], weights * value, current)
+        traded = np.abs(target - current).sum()
+        cost = traded * cost_rate
+        # Les frais réduisent le montant investi (au prorata) pour ne pas passer en découvert
+        free = value - frozen_value
+        invest_scale = max(free - cost, 0.0) / free if free > 0 else 0.0
+        target = np.where(tradable[t], target * invest_scale, current)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            holdings = np.where(tradable[t] & (prices_val[t] > 0), target / prices_val[t], holdings)
+        cash = value - cost - prices_val[t] @ holdings
+
+        end = bounds[k + 1]
+        equity[t:end] = cash + prices_val[t:end] @ holdings
+        # Poids effectifs : une position gelée (pas de séance) garde son poids courant
+        weights_log.append(np.where(tradable[t], weights, current / value if value > 0 else 0.0))
+        turnover_log.append(traded / value if value > 0 else 0.0)
+        costs_log.append(cost)
+        cash_log.append(cash)
+
+    rebalance_dates = dates[schedule]
+    equity = pd.Series(equity, index=dates)
+    weights = pd.DataFrame(np.array(weights_log).reshape(len(schedule), len(symbols)), index=rebalance_dates, columns=symbols)
+    return {
+        'equity': equity,
+        'weights': weights,
+        'turnover': pd.Series(turnover_log, index=rebalance_dates),
+        'costs': pd.Series(costs_log, index=rebalance_dates),
+        'cash': pd.Series(cash_log, index=rebalance_dates),
+        'summary': portfolio_summary(equity, weights, costs_log, turnover_log, capital)
+    }
+
+def portfolio_summary(equity, weights, costs, turnover, capital):
+    """Rendement, CAGR, volatilité, Sharpe, drawdown max, frais et rotation annuels."""
+    returns = equity.pct_change().dropna()
+    years = max(len(equity) / TRADING_DAYS, 1e-9)
+    std = returns.std()
+    return {
+        'total_return': float((equity.iloc[-1] / capital - 1) * 100),
+        'cagr': float(((equity.iloc[-1] / capital) ** (1 / years) - 1) * 100) if equity.iloc[-1] > 0 else -100.0,
+        'volatility': float(std * np.sqrt(TRADING_DAYS) * 100),
+        'sharpe': float(returns.mean() / std * np.sqrt(TRADING_DAYS)) if std > 0 else 0.0,
+        'max_drawdown': float((equity / equity.cummax() - 1).min() * 100),
+        'avg_positions': float((weights > 0).sum(axis=1).mean()) if len(weights) else 0.0,
+        'avg_exposure': float(weights.sum(axis=1).mean() * 100) if len(weights) else 0.0,
+        'total_costs': float(np.sum(costs)),
+        'annual_turnover': float(np.sum(turnover) / years * 100)
+    }
+
+def strategy_portfolio(panel, adx_min=20, rsi_exit=80, bb_length=20, bb_std=2.0, sma_length=200, **kwargs):
+    """Portefeuille alimenté par les signaux ADX / Bollinger / MM200 du moteur vectorisé."""
+    ind = strategy_indicators(panel, bb_length=bb_length, bb_std=bb_std, sma_length=sma_length)
+    entries, exits, _ = strategy_signals(panel['close'], ind, adx_min, rsi_exit)
+    signals = positions_from_signals(entries, exits)
+    kwargs.setdefault('scores', ind['adx'])
+    return simulate_portfolio(panel['close'], signals, **kwargs)
@@ -0,0 +1,132 @@
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+
+from .database import DB_PATH
+
+logger = logging.getLogger("TradingEngine.QuotaLedger")
+
+# Quotas des offres gratuites par fenêtre (unités décomptées par chaque API)
+QUOTA_LIMITS = {
+    'yahoo': {},
+    'finnhub': {'minute': 60},
+    'twelve_data': {'day': 800, 'minute': 8},
+    'alpha_vantage': {'day': 25, 'minute': 5}
+}
+
+# Coût relatif d'une unité de quota : plus le budget est rare, plus l'appel est cher
+PROVIDER_COST = {
+    'yahoo': 0,
+    'finnhub': 1,
+    'twelve_data': 2,
+    'alpha_vantage': 5
+}
+
+STATS_WINDOW = 50           # Derniers appels pris en compte pour latence et taux d'erreur
+MAX_ERROR_RATE = 0.5        # Au-delà, l'API est considérée en panne...
+UNHEALTHY_COOLDOWN = 300    # ...jusqu'à ce que sa dernière erreur date de plus de 5 minutes
+RETENTION_DAYS = 7
+
+class QuotaLedger:
+    """
+    Registre persistant (SQLite) des appels aux APIs de cotation : consommation par
+    fenêtre (jour calendaire UTC, minute glissante), latence et taux d'erreur récents.
+    Sert à router chaque requête vers l'API saine la moins chère ayant encore du budget.
+    """
+
+    def __init__(self, db_path=DB_PATH, limits=None):
+        self.db_path = db_path
+        self.limits = limits or QUOTA_LIMITS
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS api_usage (
+            provider TEXT,
+            ts REAL,
+            cost INTEGER,
+            latency REAL,
+            ok INTEGER
+        )''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_api_usage_provider_ts ON api_usage(provider, ts)")
+        self.conn.commit()
+        self.prune()
+
+    def record(self, provider, latency, ok=True, cost=1):
+        """Enregistre un appel (cost = unités de quota consommées)."""
+        with self._lock:
+            self.conn.execute("INSERT INTO api_usage (provider, ts, cost, latency, ok) VALUES (?, ?, ?, ?, ?)",
+                              (provider, time.time(), cost, latency, int(bool(ok))))
+            self.conn.commit()
+
+    def _window_start(self, window):
+        if window == 'day':
+            today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+            return today.timestamp()
+        return time.time() - 60
+
+    def used(self, provider, window):
+        with self._lock:
+            row = self.conn.execute("SELECT COALESCE(SUM(cost), 0) FROM api_usage WHERE provider = ? AND ts >= ?",
+                                    (provider, self._window_start(window))).fetchone()
+        return row[0]
+
+    def remaining(self, provider):
+        """Unités encore disponibles (minimum sur toutes les fenêtres), None si l'API n'a pas de quota."""
+        limits = self.limits.get(provider, {})
+        if not limits:
+            return None
+        return max(0, min(limit - self.used(provider, window) for window, limit in limits.items()))
+
+    def stats(self, provider):
+        """Latence moyenne / p95 et taux d'erreur sur les derniers appels."""
+        with self._lock:
+            rows = self.conn.execute("SELECT latency, ok, ts FROM api_usage WHERE provider = ? ORDER BY ts DESC LIMIT ?",
+                                     (provider, STATS_WINDOW)).fetchall()
+        if not rows:
+            return {'calls': 0, 'latency_avg': None, 'latency_p95': None, 'error_rate': 0.0, 'last_error': None}
+        latencies = sorted(r[0] for r in rows)
+        errors = [r[2] for r in rows if not r[1]]
+        return {
+            'calls': len(rows),
+            'latency_avg': sum(latencies) / len(latencies),
+            'latency_p95': latencies[min(len(latencies) - 1, int(0.95 * (len(latencies) - 1) + 0.5))],
+            'error_rate': len(errors) / len(rows),
+            'last_error': max(errors) if errors else None
+        }
+
+    def healthy(self, provider, stats=None):
+        stats = stats or self.stats(provider)
+        if stats['error_rate'] <= MAX_ERROR_RATE:
+            return True
+        return time.time() - stats['last_error'] > UNHEALTHY_COOLDOWN
+
+    def route(self, providers, units=1):
+        """
+        Ordonne les APIs candidates : d'abord les saines ayant au moins `units` de budget,
+        de la moins chère à la plus chère (coût majoré par la part de quota déjà consommée),
+        à latence égale la plus rapide. Les APIs épuisées ou en panne sont écartées.
+        """
+        candidates = []
+        for provider in providers:
+            remaining = self.remaining(provider)
+            if remaining is not None and remaining < units:
+                continue
+            stats = self.stats(provider)
+            if not self.healthy(provider, stats):
+                continue
+            day_limit = self.limits.get(provider, {}).get('day')
+            used_share = self.used(provider, 'day') / day_limit if day_limit else 0.0
+            cost = PROVIDER_COST.get(provider, 1) * (1 + used_share)
+            candidates.append((cost, stats['latency_avg'] if stats['latency_avg'] is not None else 0.0, provider))
+        return [provider for _, _, provider in sorted(candidates)]
+
+    def prune(self, days=RETENTION_DAYS):
+        with self._lock:
+            self.conn.execute("DELETE FROM api_usage WHERE ts < ?", (time.time() - days * 86400,))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,153 @@
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, time as dtime
+from concurrent.futures import Future, ThreadPoolExecutor
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("TradingEngine.QuoteCache")
+
+# Horaires de cotation par suffixe de symbole (fuseau, ouverture, clôture)
+MARKET_HOURS = {
+    '.PA': ('Europe/Paris', dtime(9, 0), dtime(17, 30)),
+    '.AS': ('Europe/Amsterdam', dtime(9, 0), dtime(17, 30)),
+    '.BR': ('Europe/Brussels', dtime(9, 0), dtime(17, 30)),
+    '.DE': ('Europe/Berlin', dtime(9, 0), dtime(17, 30)),
+    '.MI': ('Europe/Rome', dtime(9, 0), dtime(17, 30)),
+    '.L': ('Europe/London', dtime(8, 0), dtime(16, 30)),
+    '': ('America/New_York', dtime(9, 30), dtime(16, 0))
+}
+# Indices sans suffixe cotés à Paris
+INDEX_MARKETS = {'^FCHI': '.PA', '^SBF120': '.PA'}
+
+OPEN_TTL = 60               # Séance ouverte : cours rafraîchi toutes les minutes
+MIN_CLOSED_TTL = 900        # Marché fermé : jusqu'à la prochaine ouverture, au moins 15 min...
+MAX_CLOSED_TTL = 6 * 3600   # ...et au plus 6 h
+MAX_STALE = 24 * 3600       # Au-delà, une valeur expirée n'est plus servie
+
+def market_of(symbol):
+    if symbol in INDEX_MARKETS:
+        return MARKET_HOURS[INDEX_MARKETS[symbol]]
+    for suffix, hours in MARKET_HOURS.items():
+        if suffix and symbol.upper().endswith(suffix):
+            return hours
+    return MARKET_HOURS['']
+
+def market_ttl(symbol, now=None):
+    """Durée de validité d'un cours : courte pendant la séance, jusqu'à l'ouverture suivante sinon."""
+    tz_name, open_at, close_at = market_of(symbol)
+    tz = ZoneInfo(tz_name)
+    now = (now or datetime.now(tz)).astimezone(tz)
+    if now.weekday() < 5 and open_at <= now.time() < close_at:
+        return OPEN_TTL
+
+    day = now.date() if now.time() < open_at else now.date() + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    next_open = datetime.combine(day, open_at, tzinfo=tz)
+    return min(MAX_CLOSED_TTL, max(MIN_CLOSED_TTL, (next_open - now).total_seconds()))
+
+class QuoteCache:
+    """
+    Cache mémoire des cours avec TTL par symbole et regroupement des requêtes :
+    - un seul appel amont en vol par symbole, les appelants simultanés attendent son résultat ;
+    - une valeur expirée (depuis moins de MAX_STALE) est servie immédiatement pendant
+      qu'un unique rafraîchissement tourne en arrière-plan.
+    """
+
+    def __init__(self, ttl=market_ttl, max_stale=MAX_STALE, refresh_workers=4):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries = {}      # symbole -> (valeur, expire_à)
+        self._inflight = {}     # symbole -> Future de l'appel en cours
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="quote-refresh")
+        self.counters = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stale_served': 0, 'refreshes': 0, 'errors': 0}
+
+    def _bump(self, name):
+        self.counters[name] += 1
+
+    def put(self, key, value):
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (value, time.monotonic() + self.ttl(key))
+
+    def get(self, key, fetch):
+        """Retourne la valeur en cache ou exécute fetch() une seule fois pour tous les appelants simultanés."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._bump('hits')
+                return entry[0]
+            if entry and now - entry[1] < self.max_stale:
+                self._bump('stale_served')
+                if key not in self._inflight:
+                    self._bump('refreshes')
+                    self._inflight[key] = Future()
+                    self._refresher.submit(self._run, key, fetch)
+                return entry[0]
+            future = self._inflight.get(key)
+            if future is not None:
+                self._bump('coalesced')
+                leader = False
+            else:
+                self._bump('misses')
+                future = self._inflight[key] = Future()
+                leader = True
+
+        if leader:
+            self._run(key, fetch)
+        return future.result()
+
+    def claim_many(self, keys):
+        """
+        Version groupée de get() pour les appels amont par lots. Retourne (valeurs valides,
+        {clé: Future} des appels déjà en vol à attendre, clés dont l'appelant devient responsable).
+        Chaque clé prise doit être soldée par resolve(), même en cas d'échec.
+        """
+        now = time.monotonic()
+        values, waiting, owned = {}, {}, []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry and entry[1] > now:
+                    self._bump('hits')
+                    values[key] = entry[0]
+                elif key in self._inflight:
+                    self._bump('coalesced')
+                    waiting[key] = self._inflight[key]
+                else:
+                    self._bump('misses')
+                    self._inflight[key] = Future()
+                    owned.append(key)
+        return values, waiting, owned
+
+    def resolve(self, key, value):
+        """Enregistre le résultat d'un appel amont et réveille les appelants en attente."""
+        self.put(key, value)
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            future.set_result(value)
+
+    def _run(self, key, fetch):
+        try:
+            value = fetch()
+        except Exception as e:
+            logger.error(f"Erreur de rafraîchissement de {key}: {e}")
+            with self._lock:
+                self._bump('errors')
+            value = None
+        self.resolve(key, value)
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'size': len(self._entries), 'inflight': len(self._inflight)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def close(self):
+        self._refresher.shutdown(wait=False)
@@ -1,103 +1,115 @@
 import logging
 import json
 import os
-from typing import List, Dict
-import subprocess # Pour appeler la commande shell de google_web_search
+import threading
+from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from core.quote_cache import QuoteCache
 
 logger = logging.getLogger("TradingEngine.SocialIntelligence")
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'social_config.json')
 
+SEARCH_TTL = 3600
+SEARCH_WORKERS = 8
+# Domaines retenus par type de requête (example.com pour le stub de recherche)
+COMPANY_DOMAINS = ['twitter.com', 'linkedin.com', 'boursorama.com', 'lesechos.fr', 'example.com']
+EXEC_DOMAINS = ['twitter.com', 'linkedin.com', 'example.com']
+FUND_DOMAINS = ['twitter.com', 'bloomberg.com', 'reuters.com', 'example.com']
+
+_config_lock = threading.Lock()
+_config_cache = {'mtime': None, 'data': {}}
+
 def load_social_config() -> Dict:
-    """Charge la configuration sociale depuis social_config.json."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def _run_google_web_search_command(query: str, collected_queries: List[str]) -> List[Dict]:
-    """Collecte la requête pour exécution par l'agent et retourne un résultat factice pour le script."""
-    collected_queries.append(query)
-    # Retourne toujours un résultat factice pour que le script Python continue de s'exécuter
+    """
+    Charge la configuration sociale depuis social_config.json.
+    Le fichier n'est relu que si sa date de modification change (dict partagé : ne pas le modifier).
+    """
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    with _config_lock:
+        if _config_cache['mtime'] != mtime:
+            with open(CONFIG_FILE, 'r') as f:
+                _config_cache['data'] = json.load(f)
+            _config_cache['mtime'] = mtime
+        return _config_cache['data']
+
+def _search_backend(query: str) -> List[Dict]:
+    """Backend de recherche (stub local) : retourne un résultat factice pour que le script continue de s'exécuter."""
     return [{
         'title': f"Simulated Result for '{query}'",
         'link': f"https://example.com/search?q={query}",
         'snippet': "This is a simulated search result for testing purposes."
     }]
 
-def fetch_official_social_news(symbol: str) -> (List[Dict], List[str]):
-    """
-    Récupère les actualités pertinentes des comptes sociaux officiels et collecte les requêtes générées,
-    en utilisant les informations du fichier de configuration.
-    """
-    config = load_social_config()
-    company_data = config.get(symbol)
+# Résultats de recherche partagés entre symboles (les requêtes sur les fonds se répètent d'une société à l'autre)
+_search_cache = QuoteCache(ttl=lambda query: SEARCH_TTL, refresh_workers=2)
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="social-search")
 
-    if not company_data:
-        logger.warning(f"Aucune configuration sociale trouvée pour le symbole {symbol}.")
-        return [], []
+def cached_search(query: str) -> List[Dict]:
+    return _search_cache.get(query, lambda: _search_backend(query)) or []
 
+def build_social_queries(company_data: Dict) -> List[Tuple[str, str, List[str]]]:
+    """Requêtes (texte, source, domaines retenus) pour une société, ses dirigeants et ses fonds actionnaires."""
     company_name = company_data.get("company_name")
-    exec_names = company_data.get("exec_names", [])
-    fund_names = company_data.get("fund_names", [])
+    queries = []
 
-    all_social_news = []
-    generated_queries = []
-    
     # 1. Recherche pour l'entreprise
-    company_queries = [
-        f'"{company_name}" official twitter news',
-        f'"{company_name}" linkedin announcements',
-        f'"{company_name}" financial news'
-    ]
-    for query in company_queries:
-        results = _run_google_web_search_command(query, generated_queries)
-        for res in results:
-            if any(domain in res.get('link', '') for domain in ['twitter.com', 'linkedin.com', 'boursorama.com', 'lesechos.fr', 'example.com']): # Ajout example.com pour le mock
-                all_social_news.append({
-                    'title': res.get('title'),
-                    'link': res.get('link'),
-                    'source': 'Social Media (Official)',
-                    'query': query
-                })
+    for query in (f'"{company_name}" official twitter news',
+                  f'"{company_name}" linkedin announcements',
+                  f'"{company_name}" financial news'):
+        queries.append((query, 'Social Media (Official)', COMPANY_DOMAINS))
 
     # 2. Recherche pour les cadres dirigeants
-    if exec_names:
-        for exec_name in exec_names:
-            exec_queries = [
-                f'"{exec_name}" "{company_name}" twitter',
-                f'"{exec_name}" "{company_name}" linkedin'
-            ]
-            for query in exec_queries:
-                results = _run_google_web_search_command(query, generated_queries)
-                for res in results:
-                    if any(domain in res.get('link', '') for domain in ['twitter.com', 'linkedin.com', 'example.com']):
-                        all_social_news.append({
-                            'title': res.get('title'),
-                            'link': res.get('link'),
-                            'source': f'Executive Social ({exec_name})',
-                            'query': query
-                        })
-    
+    for exec_name in company_data.get("exec_names", []):
+        for query in (f'"{exec_name}" "{company_name}" twitter',
+                      f'"{exec_name}" "{company_name}" linkedin'):
+            queries.append((query, f'Executive Social ({exec_name})', EXEC_DOMAINS))
+
     # 3. Recherche pour les fonds d'investissement actionnaires
-    if fund_names:
-        for fund_name in fund_names:
-            fund_queries = [
-                f'"{fund_name}" "{company_name}" investment news',
-                f'"{fund_name}" twitter'
-            ]
-            for query in fund_queries:
-                results = _run_google_web_search_command(query, generated_queries)
-                for res in results:
-                    if any(domain in res.get('link', '') for domain in ['twitter.com', 'bloomberg.com', 'reuters.com', 'example.com']):
-                        all_social_news.append({
-                            'title': res.get('title'),
-                            'link': res.get('link'),
-                            'source': f'Fund Social ({fund_name})',
-                            'query': query
-                        })
-                    
-    return all_social_news, generated_queries
+    for fund_name in company_data.get("fund_names", []):
+        for query in (f'"{fund_name}" "{company_name}" investment news',
+                      f'"{fund_name}" twitter'):
+            queries.append((query, f'Fund Social ({fund_name})', FUND_DOMAINS))
+    return queries
+
+def fetch_social_news_batch(symbols) -> Dict[str, Tuple[List[Dict], List[str]]]:
+    """
+    Actualités sociales de plusieurs symboles : chaque requête distincte n'est exécutée qu'une fois
+    (en parallèle, via le cache de recherche) puis ses résultats sont redistribués aux symboles concernés.
+    Retourne {symbole: (actualités, requêtes générées)}.
+    """
+    config = load_social_config()
+    # Requêtes planifiées pour les seuls symboles configurés (les autres n'ont pas d'actualités sociales)
+    plans = {symbol: build_social_queries(config[symbol]) if config.get(symbol) else [] for symbol in symbols}
+
+    unique_queries = list(dict.fromkeys(query for plan in plans.values() for query, _, _ in plan))
+    results = dict(zip(unique_queries, _search_pool.map(cached_search, unique_queries)))
+
+    output = {}
+    for symbol, plan in plans.items():
+        all_social_news = []
+        for query, source, domains in plan:
+            for res in results[query]:
+                if any(domain in res.get('link', '') for domain in domains):
+                    all_social_news.append({
+                        'title': res.get('title'),
+                        'link': res.get('link'),
+                        'source': source,
+                        'query': query
+                    })
+        output[symbol] = (all_social_news, [query for query, _, _ in plan])
+    return output
+
+def fetch_official_social_news(symbol: str) -> (List[Dict], List[str]):
+    """
+    Récupère les actualités pertinentes des comptes sociaux officiels et collecte les requêtes générées,
+    en utilisant les informations du fichier de configuration.
+    """
+    return fetch_social_news_batch([symbol])[symbol]
 
 # --- Exemple d'utilisation (pour les tests) ---
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+import os
+import json
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from .ml_processor import MLPredictor, atomic_write_json
+
+logger = logging.getLogger("TradingEngine.TrainingPool")
+
+CHECKPOINT_FILE = "training_checkpoint.json"
+
+# Univers entraîné par défaut par les scripts de réentraînement et d'évaluation
+DEFAULT_SYMBOLS = [
+    "AI.PA", "MC.PA", "OR.PA", "SAN.PA", "TTE.PA", 
+    "GLE.PA", "BNP.PA", "AIR.PA", "SU.PA", "DG.PA",
+    "AAPL", "MSFT", "GOOGL", "TSLA"
+]
+
+# Prédicteur propre à chaque processus du pool (créé par _init_worker)
+_worker_predictor = None
+
+def _init_worker(model_dir, n_jobs):
+    """Initialise un MLPredictor par processus, avec un nombre de threads XGBoost borné."""
+    global _worker_predictor
+    _worker_predictor = MLPredictor(model_dir=model_dir, n_jobs=n_jobs)
+
+def _train_symbol(symbol, incremental=False):
+    """Tâche exécutée dans un processus du pool : entraîne (ou met à jour) tous les horizons d'un symbole."""
+    try:
+        if incremental:
+            results = _worker_predictor.update_incremental(symbol)
+            return symbol, results is not False, results or {}
+        results = _worker_predictor.train_for_horizons(symbol)
+        return symbol, bool(results), results or {}
+    except Exception as e:
+        logger.error(f"Erreur entraînement {symbol} dans le pool: {e}")
+        return symbol, False, {}
+
+def default_pool_size(workers=None, n_jobs=None):
+    """Répartit les cœurs entre processus et threads XGBoost pour éviter la sursouscription."""
+    cpus = os.cpu_count() or 1
+    workers = workers or cpus
+    n_jobs = n_jobs or max(1, cpus // workers)
+    return workers, n_jobs
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Checkpoint illisible ({path}): {e}")
+    return {'done': {}}
+
+def save_checkpoint(checkpoint, path):
+    """Écriture atomique du checkpoint (fichier temporaire + os.replace)."""
+    atomic_write_json(checkpoint, path)
+
+def run_training_pool(symbols, model_dir=None, workers=None, n_jobs=None, resume=False, missing_only=False, incremental=False, on_result=None):
+    """
+    Entraîne les symboles en parallèle dans un pool de processus.
+
+    - workers : nombre de processus (défaut : nombre de cœurs)
+    - n_jobs : threads XGBoost par entraînement (défaut : cœurs / workers)
+    - resume : saute les symboles déjà entraînés avec succès dans le checkpoint
+    - missing_only : ne traite que les symboles dont un modèle manque
+    - incremental : poursuit le boosting sur les nouvelles barres au lieu de tout réentraîner
+    """
+    predictor = MLPredictor(model_dir=model_dir) if model_dir else MLPredictor()
+    model_dir = predictor.model_dir
+    checkpoint_path = os.path.join(model_dir, CHECKPOINT_FILE)
+
+    checkpoint = load_checkpoint(checkpoint_path) if resume else {'done': {}}
+    checkpoint['started_at'] = checkpoint.get('started_at') or datetime.now().isoformat()
+
+    # File d'attente des jobs (sans doublons, dans l'ordre demandé)
+    queue = deque()
+    for symbol in dict.fromkeys(symbols):
+        if checkpoint['done'].get(symbol, {}).get('ok'):
+            continue
+        if missing_only and predictor.has_all_models(symbol):
+            continue
+        queue.append(symbol)
+
+    if not queue:
+        logger.info("Aucun symbole à entraîner.")
+        return checkpoint['done']
+
+    workers, n_jobs = default_pool_size(workers, n_jobs)
+    workers = min(workers, len(queue))
+    logger.info(f"Pool d'entraînement : {len(queue)} symboles, {workers} processus x {n_jobs} threads XGBoost")
+
+    # 'spawn' : chaque processus démarre sans hériter de l'état OpenMP du parent
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(model_dir, n_jobs)) as executor:
+        pending = set()
+        while queue or pending:
+            # On garde au plus 2 jobs en vol par processus, le reste attend dans la file
+            while queue and len(pending) < workers * 2:
+                pending.add(executor.submit(_train_symbol, queue.popleft(), incremental))
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                symbol, ok, results = future.result()
+                checkpoint['done'][symbol] = {'ok': ok, 'finished_at': datetime.now().isoformat()}
+                save_checkpoint(checkpoint, checkpoint_path)
+                if on_result:
+                    on_result(symbol, ok, results)
+
+    checkpoint['finished_at'] = datetime.now().isoformat()
+    save_checkpoint(checkpoint, checkpoint_path)
+    return checkpoint['done']
@@ -0,0 +1,165 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from .ml_processor import MLPredictor, N_ROUNDS, atomic_write_json
+from .training_pool import default_pool_size
+
+logger = logging.getLogger("TradingEngine.WalkForward")
+
+REPORT_FILE = "walk_forward_report.json"
+CACHE_DIR = "walk_forward_cache"
+MIN_TRAIN_ROWS = 150
+
+# Matrices chargées (en memmap) par chaque processus, réutilisées d'un fold à l'autre
+_worker_arrays = {}
+_worker_params = None
+
+def _init_worker(params):
+    global _worker_params
+    _worker_params = params
+
+def _load_arrays(cache_dir, symbol):
+    key = (cache_dir, symbol)
+    if key not in _worker_arrays:
+        _worker_arrays[key] = (
+            np.load(os.path.join(cache_dir, f"{symbol}_X.npy"), mmap_mode='r'),
+            np.load(os.path.join(cache_dir, f"{symbol}_Y.npy"), mmap_mode='r')
+        )
+    return _worker_arrays[key]
+
+def build_feature_cache(symbols, cache_dir, predictor=None, reuse=False):
+    """
+    Calcule une seule fois par symbole la matrice de features et les cibles multi-horizons,
+    sauvegardées en .npy pour être partagées (memmap) par tous les folds.
+    """
+    predictor = predictor or MLPredictor()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    def cache_symbol(symbol):
+        x_path = os.path.join(cache_dir, f"{symbol}_X.npy")
+        y_path = os.path.join(cache_dir, f"{symbol}_Y.npy")
+        if reuse and os.path.exists(x_path) and os.path.exists(y_path):
+            return symbol, len(np.load(y_path, mmap_mode='r'))
+        raw_df = predictor.fetch_data(symbol)
+        if raw_df is None or raw_df.empty:
+            return symbol, 0
+        df = predictor.prepare_features(raw_df)
+        X, Y = predictor.build_training_matrices(df)
+        np.save(x_path, X)
+        np.save(y_path, Y)
+        return symbol, len(X)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        return {s: n for s, n in executor.map(cache_symbol, symbols) if n}
+
+def make_folds(n_rows, horizon_days, n_folds=5, test_size=126, window="expanding", train_size=756):
+    """
+    Découpe chronologique en folds (train, test) avec purge : les lignes d'entraînement
+    dont la cible chevauche la période de test (horizon_days barres) sont exclues.
+    """
+    folds = []
+    for k in range(n_folds, 0, -1):
+        test_start = n_rows - k * test_size
+        test_end = test_start + test_size
+        train_end = test_start - horizon_days
+        train_start = max(0, train_end - train_size) if window == "rolling" else 0
+        if train_end - train_start < MIN_TRAIN_ROWS or test_start < 0:
+            continue
+        folds.append(((train_start, train_end), (test_start, test_end)))
+    return folds
+
+def _run_fold(cache_dir, symbol, horizon_index, train_range, test_range):
+    """Tâche d'un processus : entraîne sur le train du fold et prédit hors échantillon."""
+    X, Y = _load_arrays(cache_dir, symbol)
+    y_train = np.asarray(Y[train_range[0]:train_range[1], horizon_index])
+    y_test = np.asarray(Y[test_range[0]:test_range[1], horizon_index])
+    train_valid = ~np.isnan(y_train)
+    test_valid = ~np.isnan(y_test)
+    if train_valid.sum() < MIN_TRAIN_ROWS or not test_valid.any():
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    X_train = np.asarray(X[train_range[0]:train_range[1]])[train_valid]
+    X_test = np.asarray(X[test_range[0]:test_range[1]])[test_valid]
+    model = xgb.train(_worker_params, xgb.QuantileDMatrix(X_train, label=y_train[train_valid]), num_boost_round=N_ROUNDS)
+    return model.inplace_predict(X_test), y_test[test_valid]
+
+def score_predictions(preds, actuals):
+    """Taux de bon sens, IC (corrélation de rang de Spearman) et RMSE."""
+    if len(preds) < 2:
+        return None
+    preds = np.asarray(preds, dtype=np.float64)
+    actuals = np.asarray(actuals, dtype=np.float64)
+    ic = pd.Series(preds).corr(pd.Series(actuals), method='spearman')
+    return {
+        'hit_rate': round(float(np.mean(np.sign(preds) == np.sign(actuals))), 4),
+        'ic': round(float(ic), 4) if not pd.isna(ic) else None,
+        'rmse': round(float(np.sqrt(np.mean((preds - actuals) ** 2))), 5),
+        'n': int(len(preds))
+    }
+
+def run_walk_forward(symbols, model_dir=None, n_folds=5, test_size=126, window="expanding", train_size=756, workers=None, n_jobs=None, reuse_cache=False):
+    """
+    Évaluation walk-forward de tous les horizons de MLPredictor.
+    Les folds (symbole x horizon x période) tournent en parallèle sur tous les cœurs ;
+    le rapport est écrit dans model_dir/walk_forward_report.json.
+    """
+    predictor = MLPredictor(model_dir=model_dir) if model_dir else MLPredictor()
+    cache_dir = os.path.join(predictor.model_dir, CACHE_DIR)
+    rows = build_feature_cache(symbols, cache_dir, predictor, reuse=reuse_cache)
+
+    jobs = []
+    for symbol, n_rows in rows.items():
+        for j, (name, days) in enumerate(predictor.horizons.items()):
+            for train_range, test_range in make_folds(n_rows, days, n_folds, test_size, window, train_size):
+                jobs.append((symbol, name, j, train_range, test_range))
+
+    workers, n_jobs = default_pool_size(workers, n_jobs)
+    params = predictor.xgb_params()
+    params['nthread'] = n_jobs
+    logger.info(f"Walk-forward : {len(jobs)} folds, {workers} processus x {n_jobs} threads")
+
+    oos = {}
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(params,)) as executor:
+        futures = {executor.submit(_run_fold, cache_dir, symbol, j, train_range, test_range): (symbol, name)
+                   for symbol, name, j, train_range, test_range in jobs}
+        for future in as_completed(futures):
+            symbol, name = futures[future]
+            try:
+                preds, actuals = future.result()
+            except Exception as e:
+                logger.error(f"Erreur fold {symbol} horizon {name}: {e}")
+                continue
+            bucket = oos.setdefault((symbol, name), ([], []))
+            bucket[0].append(preds)
+            bucket[1].append(actuals)
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'config': {'n_folds': n_folds, 'test_size': test_size, 'window': window, 'train_size': train_size},
+        'horizons': {},
+        'symbols': {}
+    }
+    pooled = {}
+    for (symbol, name), (preds, actuals) in oos.items():
+        preds, actuals = np.concatenate(preds), np.concatenate(actuals)
+        metrics = score_predictions(preds, actuals)
+        if metrics:
+            report['symbols'].setdefault(symbol, {})[name] = metrics
+        bucket = pooled.setdefault(name, ([], []))
+        bucket[0].append(preds)
+        bucket[1].append(actuals)
+
+    for name in predictor.horizons.keys():
+        if name in pooled:
+            report['horizons'][name] = score_predictions(np.concatenate(pooled[name][0]), np.concatenate(pooled[name][1]))
+
+    atomic_write_json(report, os.path.join(predictor.model_dir, REPORT_FILE))
+    return report
@@ -0,0 +1,41 @@
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+# Ajouter le chemin du projet
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.walk_forward import run_walk_forward
+from core.training_pool import DEFAULT_SYMBOLS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - WALK-FORWARD - %(levelname)s - %(message)s'
+)
+
+def print_report(report):
+    print(f"{'HORIZON':<8} | {'HIT RATE':>8} | {'IC':>7} | {'RMSE':>8} | {'N':>6}")
+    print("-" * 50)
+    for horizon, m in report['horizons'].items():
+        if not m:
+            continue
+        ic = f"{m['ic']:>+7.3f}" if m['ic'] is not None else f"{'N/A':>7}"
+        print(f"{horizon:<8} | {m['hit_rate']:>8.1%} | {ic} | {m['rmse']:>8.4f} | {m['n']:>6}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Évaluation walk-forward des horizons IA")
+    parser.add_argument("symbols", nargs="*", help="Symboles à évaluer (défaut : liste intégrée)")
+    parser.add_argument("--folds", type=int, default=5, help="Nombre de périodes de test")
+    parser.add_argument("--test-size", type=int, default=126, help="Barres par période de test")
+    parser.add_argument("--window", choices=["expanding", "rolling"], default="expanding", help="Fenêtre d'entraînement")
+    parser.add_argument("--train-size", type=int, default=756, help="Barres d'entraînement (fenêtre glissante)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Threads XGBoost par processus")
+    parser.add_argument("--reuse-cache", action="store_true", help="Réutilise les features déjà calculées")
+    args = parser.parse_args()
+
+    start = datetime.now()
+    report = run_walk_forward(args.symbols or DEFAULT_SYMBOLS, n_folds=args.folds, test_size=args.test_size, window=args.window,
+                              train_size=args.train_size, workers=args.workers, n_jobs=args.n_jobs, reuse_cache=args.reuse_cache)
+    print_report(report)
+    print(f"\n✨ Évaluation terminée en {(datetime.now() - start).total_seconds():.0f}s.")
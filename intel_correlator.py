@@ -1,46 +1,48 @@
-import json
-import os
 import sys
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 # import yfinance as yf # Import de yfinance - Plus nécessaire ici
 
 # Ajout du chemin pour importer tes modules core
 sys.path.append('/home/corentin/trade-analyser-bourse')
-from core.news import get_combined_news # Import de get_combined_news
+from core.news_ingest import get_symbol_news
+from core.news_store import get_news_store
 from core.social_intelligence import load_social_config # Pour les symboles à analyser
+from core.event_store import get_event_store
 
-def load_memory(memory_file="/home/corentin/trade-analyser-bourse/market_memory.json"):
-    if os.path.exists(memory_file):
-        with open(memory_file, 'r') as f:
-            return json.load(f)
-    return []
+CURSOR_NAME = "intel_correlator"
+TIME_BUDGET = 20.0      # Secondes par passage ; les symboles non traités restent en attente
+MAX_WORKERS = 8
 
-def correlate_and_analyze(symbol_to_analyze: str = None):
+def analyze_symbol(symbol):
+    """Analyse commune à tous les événements en attente d'un symbole (actualités lues une seule fois)."""
+    # Actualités précalculées par l'ingestion (core/news_ingest.py), sans appel réseau
+    all_relevant_news = get_symbol_news(symbol, limit=8)
+    sentiment_score, _ = get_news_store().sentiment(symbol)
+
+    # Filtrer et formater pour l'analyse
+    relevant_news_titles = [n['title'] for n in all_relevant_news if n['title']]
+    return {
+        'potential_causes': relevant_news_titles[:8],
+        'verdict': f"Analyse préventive multi-sources pour {symbol}.",
+        'news_sentiment': round(sentiment_score, 3)
+    }
+
+def correlate_and_analyze(symbol_to_analyze: str = None, time_budget: float = TIME_BUDGET):
     """
     Analyse les événements du marché et les corrèle avec toutes les actualités disponibles (yfinance, Google News, réseaux sociaux officiels).
-    Si symbol_to_analyze est None, analyse tous les symboles présents dans la mémoire.
+    Traitement incrémental : seuls les événements postérieurs au curseur sont lus, regroupés par symbole
+    (une lecture des actualités par symbole), les symboles étant traités en parallèle dans la limite
+    de time_budget secondes. Si symbol_to_analyze est None, analyse tous les symboles en attente.
     """
-    events = load_memory()
-    if not events:
-        print("Aucun événement en mémoire à analyser.")
-        return
-
-    print("--- Analyse Intelligente des événements ---")
-    
-    # Récupérer la liste des symboles à analyser
-    symbols_in_memory = {event.get('symbol', 'UNKNOWN') for event in events if 'symbol' in event}
-    
-    social_config = load_social_config()
-    if symbol_to_analyze:
-        symbols_to_process = {symbol_to_analyze}
-    else:
-        symbols_to_process = symbols_in_memory.union(set(social_config.keys()))
+    store = get_event_store()
 
     # --- ÉTAPE NOUVELLE : S'assurer que les symboles configurés ont au moins une entrée ---
-    from datetime import datetime
-    for s in symbols_to_process:
-        if s not in symbols_in_memory:
+    configured = {symbol_to_analyze} if symbol_to_analyze else set(load_social_config().keys())
+    for s in configured:
+        if not store.has_events(s):
             print(f"Création d'un événement initial pour {s}...")
-            events.append({
+            store.append({
                 "symbol": s,
                 "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "price": 0,
@@ -48,32 +50,47 @@ def correlate_and_analyze(symbol_to_analyze: str = None):
                 "change_pct": 0,
                 "type": "INITIAL_ANALYSIS"
             })
+    store.flush()
+
+    watermark = store.cursor(CURSOR_NAME)
+    pending = {}
+    for event in store.events(symbol=symbol_to_analyze, after_seq=watermark, unanalyzed=True):
+        pending.setdefault(event['symbol'], []).append(event)
+    if not pending:
+        print("Aucun événement en mémoire à analyser.")
+        return
+
+    print(f"--- Analyse Intelligente de {sum(map(len, pending.values()))} événements ({len(pending)} symboles) ---")
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="correlator")
+    futures = {executor.submit(analyze_symbol, symbol): symbol for symbol in pending}
+    done, not_done = wait(futures, timeout=time_budget)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    unfinished = set()
+    for future, symbol in futures.items():
+        if future not in done:
+            unfinished.add(symbol)
+            continue
+        try:
+            analysis = future.result()
+        except Exception as e:
+            print(f"Erreur d'analyse pour {symbol}: {e}")
+            unfinished.add(symbol)
+            continue
+        for event in pending[symbol]:
+            print(f"Analyse de l'événement à {event['time']} pour {symbol}...")
+            store.set_analysis(event['seq'], analysis)
+
+    # Le curseur avance jusqu'au premier événement resté en attente (tout ce qui précède est traité)
+    if not symbol_to_analyze:
+        waiting = [event['seq'] for symbol in unfinished for event in pending[symbol]]
+        last_seq = max(event['seq'] for events in pending.values() for event in events)
+        store.set_cursor(CURSOR_NAME, min(waiting) - 1 if waiting else last_seq)
+    if unfinished:
+        print(f"⏳ {len(unfinished)} symboles reportés au prochain passage (budget de {time_budget}s).")
 
-    new_memory = [] # Pour stocker les événements mis à jour
-    
-    for event in events:
-        if 'analysis' not in event and event.get('symbol') in symbols_to_process:
-            symbol = event['symbol']
-            time_str = event['time']
-            print(f"Analyse de l'événement à {time_str} pour {symbol}...")
-            
-            ticker_obj = None 
-            
-            # Récupération de toutes les news combinées (yfinance, Google, Social)
-            all_relevant_news = get_combined_news(ticker_obj, symbol, name=symbol)
-            
-            # Filtrer et formater pour l'analyse
-            relevant_news_titles = [n['title'] for n in all_relevant_news if n['title']]
-            
-            event['analysis'] = {
-                'potential_causes': relevant_news_titles[:8],
-                'verdict': f"Analyse préventive multi-sources pour {symbol}."
-            }
-        new_memory.append(event)
-    
     # Sauvegarde
-    with open("/home/corentin/trade-analyser-bourse/market_memory.json", 'w') as f:
-        json.dump(new_memory, f, indent=4)
+    store.flush()
     print("✓ Mémoire mise à jour avec l'analyse sociale et dirigeants.")
 
 if __name__ == "__main__":
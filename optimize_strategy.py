@@ -0,0 +1,39 @@
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.backtest import load_price_panel
+from core.database import get_sector_map
+from core.param_sweep import run_sweep
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - SWEEP - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimisation des seuils de la stratégie par balayage de paramètres")
+    parser.add_argument("symbols", nargs="*", help="Symboles (défaut : toutes les valeurs suivies)")
+    parser.add_argument("--years", type=int, default=10, help="Profondeur d'historique")
+    parser.add_argument("--random", type=int, default=None, help="Nombre de points tirés au hasard (défaut : grille complète)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--rank-by", default="mean_sharpe", help="Métrique de classement")
+    parser.add_argument("--output", default="param_sweep_results.csv", help="Fichier CSV des résultats")
+    args = parser.parse_args()
+
+    symbols = args.symbols or [s for s in get_sector_map() if not s.startswith('^')]
+    print(f"📥 Chargement de {len(symbols)} valeurs sur {args.years} ans...")
+    panel = load_price_panel(symbols, args.years)
+    if not panel:
+        print("Erreur : Pas de données.")
+        sys.exit(1)
+
+    start = datetime.now()
+    table = run_sweep(panel, n_random=args.random, workers=args.workers, rank_by=args.rank_by)
+    table.to_csv(args.output, index=False)
+
+    print(table.head(15).to_string(index=False))
+    print(f"\n✨ {len(table)} combinaisons évaluées en {(datetime.now() - start).total_seconds():.0f}s -> {args.output}")
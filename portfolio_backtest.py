@@ -0,0 +1,57 @@
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.backtest import load_price_panel
+from core.database import get_sector_map
+from core.portfolio import strategy_portfolio
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - PORTFOLIO - %(levelname)s - %(message)s'
+)
+
+def parse_rebalance(value):
+    return int(value) if value.isdigit() else value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation de portefeuille multi-valeurs sur les signaux de la stratégie")
+    parser.add_argument("symbols", nargs="*", help="Symboles (défaut : toutes les valeurs suivies)")
+    parser.add_argument("--years", type=int, default=10, help="Profondeur d'historique")
+    parser.add_argument("--capital", type=float, default=100000, help="Capital initial")
+    parser.add_argument("--max-positions", type=int, default=20, help="Nombre maximal de lignes")
+    parser.add_argument("--max-weight", type=float, default=0.10, help="Poids maximal d'une ligne")
+    parser.add_argument("--sector-cap", type=float, default=0.30, help="Exposition maximale par secteur")
+    parser.add_argument("--cost-bps", type=float, default=10, help="Frais de transaction en points de base")
+    parser.add_argument("--rebalance", type=parse_rebalance, default="W", help="Fréquence : W, M, Q ou un nombre de séances")
+    parser.add_argument("--sizing", choices=["equal", "inverse_vol"], default="equal", help="Pondération des lignes")
+    parser.add_argument("--output", default=None, help="Fichier CSV de la courbe de valeur")
+    args = parser.parse_args()
+
+    sectors = get_sector_map()
+    symbols = args.symbols or [s for s in sectors if not s.startswith('^')]
+    print(f"📥 Chargement de {len(symbols)} valeurs sur {args.years} ans...")
+    panel = load_price_panel(symbols, args.years)
+    if not panel:
+        print("Erreur : Pas de données.")
+        sys.exit(1)
+
+    start = datetime.now()
+    result = strategy_portfolio(panel, sectors=sectors, capital=args.capital, max_positions=args.max_positions,
+                                max_weight=args.max_weight, sector_cap=args.sector_cap, cost_bps=args.cost_bps,
+                                rebalance=args.rebalance, sizing=args.sizing)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    summary = result['summary']
+    print("=== PORTEFEUILLE ===")
+    print(f"Rendement total : {summary['total_return']:>+8.2f}% (CAGR {summary['cagr']:+.2f}%)")
+    print(f"Volatilité : {summary['volatility']:>8.2f}% | Sharpe : {summary['sharpe']:>5.2f}")
+    print(f"Drawdown max : {summary['max_drawdown']:>+8.2f}%")
+    print(f"Lignes moyennes : {summary['avg_positions']:.1f} | Exposition moyenne : {summary['avg_exposure']:.1f}%")
+    print(f"Frais totaux : {summary['total_costs']:.0f} | Rotation annuelle : {summary['annual_turnover']:.0f}%")
+    if args.output:
+        result['equity'].to_csv(args.output, header=['equity'])
+    print(f"⏱️ Simulation en {elapsed:.2f}s")
@@ -0,0 +1,41 @@
+import sys
+import argparse
+import logging
+from datetime import datetime
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.backtest import load_price_panel
+from core.database import get_sector_map
+from core.event_study import event_study
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - REPLAY - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejeu historique des recommandations d'analyze_stock et rendements futurs par signal")
+    parser.add_argument("symbols", nargs="*", help="Symboles (défaut : toutes les valeurs suivies)")
+    parser.add_argument("--years", type=int, default=10, help="Profondeur d'historique")
+    parser.add_argument("--geo-score", type=float, default=None, help="Score géopolitique appliqué à toutes les dates (défaut : aucun ajustement)")
+    parser.add_argument("--by-symbol", action="store_true", help="Détail par symbole")
+    parser.add_argument("--output", default="recommendation_event_study.csv", help="Fichier CSV des résultats")
+    args = parser.parse_args()
+
+    symbols = args.symbols or [s for s in get_sector_map() if not s.startswith('^')]
+    print(f"📥 Chargement de {len(symbols)} valeurs sur {args.years} ans...")
+    panel = load_price_panel(symbols, args.years)
+    if not panel:
+        print("Erreur : Pas de données.")
+        sys.exit(1)
+
+    start = datetime.now()
+    table = event_study(panel, geo_score=args.geo_score, by_symbol=args.by_symbol)
+    table.to_csv(args.output, index=False)
+
+    if not args.by_symbol:
+        print(table.pivot(index='label', columns='horizon', values='mean_return')[[h for h in table['horizon'].unique()]].round(2).to_string())
+        print()
+    print(table.round(4).to_string(index=False, max_rows=60))
+    print(f"\n✨ {len(table)} lignes calculées en {(datetime.now() - start).total_seconds():.1f}s -> {args.output}")
@@ -1,11 +1,14 @@
 import os
 import sys
+import argparse
 import logging
 from datetime import datetime
 
 # Ajouter le chemin du projet
 sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.training_pool import run_training_pool, DEFAULT_SYMBOLS
 from core.ml_processor import MLPredictor
+from core.database import get_sector_map
 
 # Configuration du logging
 logging.basicConfig(
@@ -13,32 +16,56 @@ logging.basicConfig(
     format='%(asctime)s - RE-TRAINING - %(levelname)s - %(message)s'
 )
 
-def run_intensive_training():
-    predictor = MLPredictor()
+def print_result(symbol, ok, results):
+    if ok:
+        # On affiche la prédiction à 1 mois (21 jours de bourse)
+        pred_1m = results.get('1m', 0)
+        print(f"✅ {symbol:<8} : Succès. Projection 1 mois : {pred_1m:>+6.2f}%")
+    else:
+        print(f"❌ {symbol:<8} : Échec")
+
+def run_intensive_training(symbols=None, workers=None, n_jobs=None, resume=False, missing_only=False, incremental=False):
+    symbols = symbols or DEFAULT_SYMBOLS
     
-    symbols = [
-        "AI.PA", "MC.PA", "OR.PA", "SAN.PA", "TTE.PA", 
-        "GLE.PA", "BNP.PA", "AIR.PA", "SU.PA", "DG.PA",
-        "AAPL", "MSFT", "GOOGL", "TSLA"
-    ]
+    mode = "mise à jour incrémentale" if incremental else "réentraînement"
+    print(f"🚀 Démarrage du {mode} IA pour {len(symbols)} valeurs...")
+    print("-" * 70)
     
-    print(f"🚀 Démarrage du réentraînement IA pour {len(symbols)} valeurs...")
+    start = datetime.now()
+    run_training_pool(symbols, workers=workers, n_jobs=n_jobs, resume=resume, missing_only=missing_only, incremental=incremental, on_result=print_result)
+            
     print("-" * 70)
+    print(f"✨ Réentraînement terminé en {(datetime.now() - start).total_seconds():.0f}s.")
+
+def run_pooled_training(symbols=None, n_jobs=None, encode_symbol=False):
+    """Entraîne le modèle mutualisé (un artefact par horizon) sur tout l'univers suivi."""
+    sectors = get_sector_map()
+    symbols = symbols or list(sectors.keys()) or DEFAULT_SYMBOLS
     
-    for symbol in symbols:
-        try:
-            results = predictor.train_for_horizons(symbol)
-            if results:
-                # On affiche la prédiction à 1 mois (21 jours de bourse)
-                pred_1m = results.get('1m', 0)
-                print(f"✅ {symbol:<8} : Succès. Projection 1 mois : {pred_1m:>+6.2f}%")
-            else:
-                print(f"❌ {symbol:<8} : Échec")
-        except Exception as e:
-            print(f"⚠️ {symbol:<8} : Erreur : {e}")
+    print(f"🚀 Entraînement du modèle mutualisé sur {len(symbols)} valeurs...")
+    print("-" * 70)
+    
+    start = datetime.now()
+    results = MLPredictor(n_jobs=n_jobs).train_pooled(symbols, sectors=sectors, encode_symbol=encode_symbol)
+    for horizon, rows in (results or {}).items():
+        print(f"✅ Horizon {horizon:<3} : {rows} lignes d'entraînement")
             
     print("-" * 70)
-    print("✨ Réentraînement terminé.")
+    print(f"✨ Entraînement mutualisé terminé en {(datetime.now() - start).total_seconds():.0f}s.")
 
 if __name__ == "__main__":
-    run_intensive_training()
+    parser = argparse.ArgumentParser(description="Réentraînement parallèle des modèles IA (hors du processus web)")
+    parser.add_argument("symbols", nargs="*", help="Symboles à entraîner (défaut : liste intégrée)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus d'entraînement")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Threads XGBoost par processus")
+    parser.add_argument("--resume", action="store_true", help="Reprend après le dernier checkpoint")
+    parser.add_argument("--missing-only", action="store_true", help="N'entraîne que les symboles sans modèle complet")
+    parser.add_argument("--incremental", action="store_true", help="Poursuit le boosting sur les nouvelles barres (réentraînement complet seulement en cas de dérive)")
+    parser.add_argument("--pooled", action="store_true", help="Entraîne un modèle mutualisé par horizon sur tout l'univers")
+    parser.add_argument("--encode-symbol", action="store_true", help="Ajoute le symbole comme variable catégorielle (mode --pooled)")
+    args = parser.parse_args()
+
+    if args.pooled:
+        run_pooled_training(args.symbols, args.n_jobs, args.encode_symbol)
+    else:
+        run_intensive_training(args.symbols, args.workers, args.n_jobs, args.resume, args.missing_only, args.incremental)
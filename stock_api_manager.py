@@ -5,17 +5,43 @@ Compatible Linux Mint / Ubuntu
 """
 
 import os
+import time
+import threading
 import requests
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, TimeoutError as FutureTimeout
 from typing import Dict, List, Optional
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 import yfinance as yf
 
+from core.http_cache import get_http_cache, yf_session
+from core.quota_ledger import QuotaLedger
+from core.quote_cache import QuoteCache
+
+
+# Fenêtre des latences mémorisées par API (pour le mode "hedged")
+LATENCY_WINDOW = 200
+# Nombre minimal de mesures avant de se fier au percentile
+HEDGE_MIN_SAMPLES = 20
+# Délai de relance (s) tant qu'on n'a pas assez de mesures
+HEDGE_DEFAULT_DELAY = 1.0
+
+# Nombre maximal de symboles par requête HTTP pour chaque API
+BATCH_LIMITS = {
+    'yahoo': 200,           # yf.download multi-tickers
+    'twelve_data': 120,     # /quote?symbol=A,B,C
+    'alpha_vantage': 1,     # GLOBAL_QUOTE (REALTIME_BULK_QUOTES : 100, offre premium)
+    'finnhub': 1            # /quote n'accepte qu'un symbole
+}
+
 
 class StockAPIManager:
     """Gestionnaire intelligent qui utilise plusieurs APIs gratuites"""
     
-    def __init__(self, config_file: str = "api_config.json"):
+    def __init__(self, config_file: str = "api_config.json", max_workers: int = 16, request_timeout: float = 10,
+                 ledger: Optional[QuotaLedger] = None):
         self.config_file = config_file
         self.api_keys = self.load_config()
         self.api_call_count = {
@@ -24,6 +50,110 @@ class StockAPIManager:
             'twelve_data': 0,
             'yahoo': 0
         }
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+        self.latencies = {api: deque(maxlen=LATENCY_WINDOW) for api in self.api_call_count}
+        # Registre persistant des quotas, latences et erreurs (partagé entre les exécutions)
+        self.ledger = ledger or QuotaLedger()
+        # Cache des cours (TTL selon les horaires de marché, requêtes simultanées regroupées)
+        self.quote_cache = QuoteCache()
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._fanout_pool = None
+        self._hedge_pool = None
+    
+    # --- Couche HTTP : une session keep-alive par API, pools de threads partagés ---
+    
+    def session(self, api: str) -> requests.Session:
+        """Session HTTP persistante (connexions réutilisées) propre à chaque API"""
+        with self._lock:
+            if api not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                session.mount('https://', adapter)
+                self._sessions[api] = session
+            return self._sessions[api]
+    
+    def _get_json(self, api: str, url: str, params: Dict, cost: int = 1) -> Dict:
+        """
+        GET avec délai maximal par requête via le cache HTTP partagé ; seuls les appels
+        réellement envoyés sont consignés dans le registre des quotas
+        """
+        start = time.monotonic()
+        ok = False
+        from_cache = False
+        try:
+            response = get_http_cache().get(self.session(api).get, url, params=params, timeout=self.request_timeout)
+            from_cache = getattr(response, 'from_cache', False)
+            data = response.json()
+            ok = response.ok and not self._is_error_payload(data)
+            if not ok:
+                get_http_cache().invalidate(url, params)
+            return data
+        finally:
+            if not from_cache:
+                self.record_call(api, time.monotonic() - start, ok, cost)
+    
+    @staticmethod
+    def _is_error_payload(data) -> bool:
+        """Erreurs renvoyées avec un statut 200 (quota dépassé, clé invalide...)"""
+        if not isinstance(data, dict):
+            return False
+        return data.get('status') == 'error' or any(k in data for k in ('Note', 'Information', 'Error Message', 'error'))
+    
+    def _count(self, api: str, n: int = 1):
+        with self._lock:
+            self.api_call_count[api] += n
+    
+    def record_call(self, api: str, seconds: float, ok: bool = True, cost: int = 1):
+        with self._lock:
+            self.latencies[api].append(seconds)
+        self.ledger.record(api, seconds, ok, cost)
+    
+    def latency_percentile(self, api: str, percentile: float = 95, default: Optional[float] = None) -> Optional[float]:
+        """Percentile des dernières latences observées pour une API"""
+        with self._lock:
+            samples = sorted(self.latencies[api])
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return default
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+    
+    def fanout_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._fanout_pool is None:
+                self._fanout_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="quotes")
+            return self._fanout_pool
+    
+    def hedge_pool(self) -> ThreadPoolExecutor:
+        # Pool distinct : les requêtes de relance ne doivent pas attendre derrière les tâches par symbole
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.max_workers * 2, thread_name_prefix="hedge")
+            return self._hedge_pool
+    
+    def close(self):
+        """Libère les pools de threads et les connexions"""
+        for pool in (self._fanout_pool, self._hedge_pool):
+            if pool:
+                pool.shutdown(wait=False)
+        self.quote_cache.close()
+        for session in self._sessions.values():
+            session.close()
+        self._fanout_pool = self._hedge_pool = None
+        self._sessions = {}
+    
+    def provider_fetchers(self) -> Dict:
+        return {
+            'yahoo': self.get_stock_quote_yahoo,
+            'twelve_data': self.get_stock_quote_twelve_data,
+            'finnhub': self.get_stock_quote_finnhub,
+            'alpha_vantage': self.get_stock_quote_alpha_vantage
+        }
+    
+    def available_providers(self) -> List[str]:
+        """APIs utilisables (Yahoo sans clé, les autres si une clé est configurée), par ordre de préférence"""
+        return ['yahoo'] + [api for api in ('twelve_data', 'finnhub', 'alpha_vantage') if self.api_keys.get(api)]
         
     def load_config(self) -> Dict:
         """Charge les clés API depuis le fichier de configuration"""
@@ -47,15 +177,17 @@ class StockAPIManager:
         Récupère le cours via Yahoo Finance (GRATUIT, ILLIMITÉ)
         Meilleur pour: Tous les marchés, données fiables
         """
+        start = time.monotonic()
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = yf.Ticker(symbol, session=yf_session())
             info = ticker.info
             hist = ticker.history(period="1d")
+            self.record_call('yahoo', time.monotonic() - start, ok=not hist.empty, cost=0)
             
             if hist.empty:
                 return None
                 
-            self.api_call_count['yahoo'] += 1
+            self._count('yahoo')
             
             return {
                 'symbol': symbol,
@@ -70,6 +202,7 @@ class StockAPIManager:
                 'timestamp': datetime.now().isoformat()
             }
         except Exception as e:
+            self.record_call('yahoo', time.monotonic() - start, ok=False, cost=0)
             print(f"❌ Yahoo Finance erreur pour {symbol}: {str(e)}")
             return None
     
@@ -91,12 +224,11 @@ class StockAPIManager:
                 'apikey': self.api_keys['alpha_vantage']
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            data = self._get_json('alpha_vantage', url, params)
             
             if 'Global Quote' in data and data['Global Quote']:
                 quote = data['Global Quote']
-                self.api_call_count['alpha_vantage'] += 1
+                self._count('alpha_vantage')
                 
                 return {
                     'symbol': symbol,
@@ -133,11 +265,10 @@ class StockAPIManager:
                 'token': self.api_keys['finnhub']
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            data = self._get_json('finnhub', url, params)
             
             if data.get('c'):  # current price
-                self.api_call_count['finnhub'] += 1
+                self._count('finnhub')
                 
                 return {
                     'symbol': symbol,
@@ -174,92 +305,340 @@ class StockAPIManager:
                 'apikey': self.api_keys['twelve_data']
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            data = self._get_json('twelve_data', url, params)
             
             if data.get('close'):
-                self.api_call_count['twelve_data'] += 1
-                
-                return {
-                    'symbol': symbol,
-                    'price': float(data['close']),
-                    'open': float(data['open']),
-                    'high': float(data['high']),
-                    'low': float(data['low']),
-                    'volume': int(data.get('volume', 0)),
-                    'previous_close': float(data.get('previous_close', 0)),
-                    'change': float(data.get('change', 0)),
-                    'change_percent': data.get('percent_change', 'N/A'),
-                    'source': 'Twelve Data',
-                    'timestamp': datetime.now().isoformat()
-                }
+                self._count('twelve_data')
+                return self._twelve_data_quote(symbol, data)
             return None
             
         except Exception as e:
             print(f"❌ Twelve Data erreur pour {symbol}: {str(e)}")
             return None
     
-    def get_stock_quote(self, symbol: str, preferred_api: str = 'auto') -> Optional[Dict]:
+    def _twelve_data_quote(self, symbol: str, data: Dict) -> Dict:
+        return {
+            'symbol': symbol,
+            'price': float(data['close']),
+            'open': float(data['open']),
+            'high': float(data['high']),
+            'low': float(data['low']),
+            'volume': int(data.get('volume') or 0),
+            'previous_close': float(data.get('previous_close') or 0),
+            'change': float(data.get('change') or 0),
+            'change_percent': data.get('percent_change', 'N/A'),
+            'source': 'Twelve Data',
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    # --- Requêtes groupées : plusieurs symboles par appel HTTP ---
+    
+    def get_batch_quotes_yahoo(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Cours de plusieurs valeurs via un seul yf.download (5 dernières séances)"""
+        start = time.monotonic()
+        try:
+            data = yf.download(symbols, period="5d", group_by='ticker', auto_adjust=False, progress=False, session=yf_session())
+        except Exception as e:
+            self.record_call('yahoo', time.monotonic() - start, ok=False, cost=0)
+            print(f"❌ Yahoo Finance erreur pour le lot {symbols[0]}...: {str(e)}")
+            return {}
+        self.record_call('yahoo', time.monotonic() - start, ok=data is not None and not data.empty, cost=0)
+        if data is None or data.empty:
+            return {}
+        self._count('yahoo')
+        
+        quotes = {}
+        for symbol in symbols:
+            try:
+                hist = data[symbol] if symbol in data.columns.get_level_values(0) else None
+                hist = hist.dropna(subset=['Close']) if hist is not None else None
+                if hist is None or hist.empty:
+                    continue
+                last = hist.iloc[-1]
+                quotes[symbol] = {
+                    'symbol': symbol,
+                    'price': float(last['Close']),
+                    'open': float(last['Open']),
+                    'high': float(last['High']),
+                    'low': float(last['Low']),
+                    'volume': int(last['Volume']),
+                    'previous_close': float(hist['Close'].iloc[-2]) if len(hist) > 1 else 'N/A',
+                    'market': 'N/A',
+                    'source': 'Yahoo Finance',
+                    'timestamp': datetime.now().isoformat()
+                }
+            except Exception as e:
+                print(f"❌ Yahoo Finance erreur pour {symbol}: {str(e)}")
+        return quotes
+    
+    def get_batch_quotes_twelve_data(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Cours de plusieurs valeurs en un appel (/quote?symbol=A,B,C).
+        La réponse est indexée par symbole ; les symboles en erreur sont simplement absents.
+        """
+        if not self.api_keys.get('twelve_data'):
+            return {}
+        try:
+            params = {'symbol': ','.join(symbols), 'apikey': self.api_keys['twelve_data']}
+            data = self._get_json('twelve_data', "https://api.twelvedata.com/quote", params, cost=len(symbols))
+        except Exception as e:
+            print(f"❌ Twelve Data erreur pour le lot {symbols[0]}...: {str(e)}")
+            return {}
+        
+        # Un seul symbole : la réponse n'est pas indexée
+        if len(symbols) == 1:
+            data = {symbols[0]: data}
+        quotes = {}
+        for symbol in symbols:
+            item = data.get(symbol)
+            if isinstance(item, dict) and item.get('close') and item.get('status') != 'error':
+                try:
+                    quotes[symbol] = self._twelve_data_quote(symbol, item)
+                except (TypeError, ValueError) as e:
+                    print(f"❌ Twelve Data réponse invalide pour {symbol}: {str(e)}")
+        self._count('twelve_data', len(symbols))
+        return quotes
+    
+    def get_batch_quotes_alpha_vantage(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Requête groupée REALTIME_BULK_QUOTES (offre premium, 'alpha_vantage_premium' dans la config)"""
+        if not self.api_keys.get('alpha_vantage'):
+            return {}
+        try:
+            params = {'function': 'REALTIME_BULK_QUOTES', 'symbol': ','.join(symbols), 'apikey': self.api_keys['alpha_vantage']}
+            data = self._get_json('alpha_vantage', "https://www.alphavantage.co/query", params)
+        except Exception as e:
+            print(f"❌ Alpha Vantage erreur pour le lot {symbols[0]}...: {str(e)}")
+            return {}
+        
+        quotes = {}
+        for item in data.get('data', []):
+            symbol = item.get('symbol')
+            if symbol in symbols and item.get('close'):
+                quotes[symbol] = {
+                    'symbol': symbol,
+                    'price': float(item['close']),
+                    'open': float(item.get('open') or 0),
+                    'high': float(item.get('high') or 0),
+                    'low': float(item.get('low') or 0),
+                    'volume': int(float(item.get('volume') or 0)),
+                    'previous_close': float(item.get('previous_close') or 0),
+                    'change_percent': item.get('change_percent', 'N/A'),
+                    'source': 'Alpha Vantage',
+                    'timestamp': datetime.now().isoformat()
+                }
+        self._count('alpha_vantage')
+        return quotes
+    
+    def batch_limit(self, api: str) -> int:
+        if api == 'alpha_vantage' and self.api_keys.get('alpha_vantage_premium'):
+            return 100
+        return BATCH_LIMITS[api]
+    
+    def remaining_quota(self, api: str) -> Optional[int]:
+        """Unités de quota encore disponibles selon le registre (None = pas de quota)"""
+        return self.ledger.remaining(api)
+    
+    def _fetch_batch(self, api: str, symbols: List[str]) -> Dict[str, Dict]:
+        if api == 'yahoo':
+            return self.get_batch_quotes_yahoo(symbols)
+        if api == 'twelve_data':
+            return self.get_batch_quotes_twelve_data(symbols)
+        if api == 'alpha_vantage' and len(symbols) > 1:
+            return self.get_batch_quotes_alpha_vantage(symbols)
+        fetch = self.provider_fetchers()[api]
+        quote = fetch(symbols[0])
+        return {symbols[0]: quote} if quote else {}
+    
+    def plan_batches(self, symbols: List[str], apis: List[str]) -> tuple:
+        """
+        Répartit les symboles entre les APIs : la plus grande taille de lot permise par chacune,
+        dans la limite de son quota restant. Priorité aux plus gros lots, puis au quota le plus large.
+        Retourne [(api, [symboles]), ...] et les symboles qu'aucune API ne peut prendre.
+        """
+        def priority(api):
+            quota = self.remaining_quota(api)
+            return (-self.batch_limit(api), -(quota if quota is not None else float('inf')))
+        order = sorted(apis, key=priority)
+        remaining = list(symbols)
+        batches = []
+        for api in order:
+            if not remaining:
+                break
+            quota = self.remaining_quota(api)
+            size = self.batch_limit(api)
+            # Quota décompté par symbole (Twelve Data) ou par requête (les autres)
+            capacity = len(remaining) if quota is None else (quota if api == 'twelve_data' else quota * size)
+            assigned, remaining = remaining[:capacity], remaining[capacity:]
+            batches.extend((api, assigned[i:i + size]) for i in range(0, len(assigned), size))
+        return batches, remaining
+    
+    def get_batch_quotes(self, symbols: List[str], deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Cours de nombreuses valeurs avec le moins d'appels HTTP possible : lots par API exécutés
+        en parallèle, puis les symboles manquants (échecs partiels) repassent sur l'API suivante.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        end = time.monotonic() + deadline if deadline else None
+        apis = self.ledger.route(self.available_providers())
+        # Cours encore valides servis depuis le cache ; les symboles déjà demandés par un autre
+        # appelant (unitaire ou lot) sont attendus, seuls les autres partent en lot
+        quotes, waiting, owned = self.quote_cache.claim_many(symbols)
+        missing = list(owned)
+        pool = self.fanout_pool()
+        
+        try:
+            while missing and apis:
+                batches, _ = self.plan_batches(missing, apis)
+                if not batches:
+                    break
+                futures = {pool.submit(self._fetch_batch, api, batch): api for api, batch in batches}
+                timeout = max(0, end - time.monotonic()) if end else None
+                done, not_done = wait(futures, timeout=timeout)
+                for future in done:
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        print(f"❌ Erreur lot {futures[future]}: {e}")
+                        continue
+                    for symbol, quote in results.items():
+                        if symbol in quotes or symbol not in owned:
+                            continue
+                        quotes[symbol] = quote
+                        self.quote_cache.resolve(symbol, quote)
+                tried = {futures[future] for future in futures}
+                apis = [api for api in apis if api not in tried]
+                missing = [symbol for symbol in missing if symbol not in quotes]
+                if not_done:
+                    print(f"⏱️  Délai dépassé : {len(missing)} cours non reçus")
+                    break
+        finally:
+            # Symboles pris en charge mais non reçus : les appelants en attente sont libérés
+            for symbol in missing:
+                self.quote_cache.resolve(symbol, None)
+        
+        for symbol, future in waiting.items():
+            try:
+                quote = future.result(timeout=max(0, end - time.monotonic()) if end else None)
+            except FutureTimeout:
+                continue
+            if quote:
+                quotes[symbol] = quote
+        
+        return quotes
+    
+    def get_stock_quote(self, symbol: str, preferred_api: str = 'auto', use_cache: bool = True) -> Optional[Dict]:
         """
         Récupère le cours en utilisant la meilleure API disponible
         
         Args:
             symbol: Symbole boursier (ex: 'AAPL', 'MC.PA' pour LVMH sur Euronext)
             preferred_api: 'auto', 'yahoo', 'alpha_vantage', 'finnhub', 'twelve_data'
+            use_cache: en mode 'auto', sert le cours en cache s'il est encore valide
         """
-        print(f"\n🔍 Recherche de {symbol}...")
-        
-        # Stratégie auto: commence par Yahoo (gratuit illimité)
-        if preferred_api == 'auto' or preferred_api == 'yahoo':
-            result = self.get_stock_quote_yahoo(symbol)
-            if result:
-                return result
+        if preferred_api == 'auto' and use_cache:
+            return self.quote_cache.get(symbol, lambda: self.get_stock_quote(symbol, preferred_api, use_cache=False))
         
-        # Essaie les autres APIs si Yahoo échoue
-        apis_to_try = []
+        print(f"\n🔍 Recherche de {symbol}...")
         
+        fetchers = self.provider_fetchers()
         if preferred_api == 'auto':
-            # Ordre de préférence basé sur les limites
-            apis_to_try = [
-                ('twelve_data', self.get_stock_quote_twelve_data),
-                ('finnhub', self.get_stock_quote_finnhub),
-                ('alpha_vantage', self.get_stock_quote_alpha_vantage)
-            ]
+            # Routage par le registre : API saine la moins chère ayant encore du budget
+            apis_to_try = self.ledger.route(self.available_providers())
         else:
             # API spécifique demandée
-            api_map = {
-                'alpha_vantage': self.get_stock_quote_alpha_vantage,
-                'finnhub': self.get_stock_quote_finnhub,
-                'twelve_data': self.get_stock_quote_twelve_data
-            }
-            if preferred_api in api_map:
-                apis_to_try = [(preferred_api, api_map[preferred_api])]
+            apis_to_try = [preferred_api] if preferred_api in fetchers else []
         
-        for api_name, api_func in apis_to_try:
-            result = api_func(symbol)
+        for api_name in apis_to_try:
+            result = fetchers[api_name](symbol)
             if result:
                 return result
         
         print(f"❌ Impossible de récupérer les données pour {symbol}")
         return None
     
-    def get_multiple_quotes(self, symbols: List[str]) -> List[Dict]:
-        """Récupère plusieurs cours en optimisant les appels API"""
-        results = []
+    def get_stock_quote_hedged(self, symbol: str, primary: Optional[str] = None, percentile: float = 95,
+                               use_cache: bool = True) -> Optional[Dict]:
+        """
+        Requête "hedged" : interroge l'API principale (par défaut la première du routage) et,
+        si elle n'a pas répondu au bout de son percentile de latence habituel (ou si elle
+        échoue), lance l'API suivante en parallèle. La première réponse valide l'emporte.
+        """
+        if use_cache:
+            return self.quote_cache.get(symbol, lambda: self.get_stock_quote_hedged(symbol, primary, percentile, use_cache=False))
         
-        for symbol in symbols:
-            quote = self.get_stock_quote(symbol)
+        fetchers = self.provider_fetchers()
+        route = self.ledger.route(self.available_providers())
+        if not route and primary is None:
+            print(f"❌ Aucune API disponible pour {symbol}")
+            return None
+        primary = primary or route[0]
+        fallbacks = [api for api in route if api != primary]
+        delay = self.latency_percentile(primary, percentile, default=HEDGE_DEFAULT_DELAY)
+        deadline = time.monotonic() + self.request_timeout
+        pool = self.hedge_pool()
+        pending = {pool.submit(fetchers[primary], symbol): primary}
+        hedged = False
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            can_hedge = fallbacks and not hedged
+            done, _ = wait(list(pending), timeout=min(delay, remaining) if can_hedge else remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                result = future.result()
+                if result:
+                    return result
+            # Une seule relance sur lenteur, puis API suivante uniquement en cas d'échec
+            if fallbacks and (not pending or (not done and can_hedge)):
+                hedged = hedged or bool(pending)
+                api = fallbacks.pop(0)
+                pending[pool.submit(fetchers[api], symbol)] = api
+            elif not pending:
+                break
+        
+        print(f"❌ Impossible de récupérer les données pour {symbol}")
+        return None
+    
+    def get_multiple_quotes(self, symbols: List[str], hedged: bool = False, deadline: Optional[float] = None, batch: bool = True) -> List[Dict]:
+        """
+        Récupère plusieurs cours : par lots (batch=True, défaut) ou en parallèle symbole
+        par symbole (sessions partagées, mode hedged possible).
+        deadline : temps maximal (s) pour l'ensemble ; les cours non reçus à temps sont ignorés.
+        """
+        if batch and not hedged:
+            quotes = self.get_batch_quotes(symbols, deadline)
+            return [quotes[symbol] for symbol in dict.fromkeys(symbols) if symbol in quotes]
+        
+        fetch = self.get_stock_quote_hedged if hedged else self.get_stock_quote
+        pool = self.fanout_pool()
+        futures = {pool.submit(fetch, symbol): symbol for symbol in dict.fromkeys(symbols)}
+        done, not_done = wait(futures, timeout=deadline)
+        
+        quotes = {}
+        for future in done:
+            quote = future.result()
             if quote:
-                results.append(quote)
+                quotes[futures[future]] = quote
+        for future in not_done:
+            print(f"⏱️  Délai dépassé pour {futures[future]}")
         
-        return results
+        return [quotes[symbol] for symbol in dict.fromkeys(symbols) if symbol in quotes]
     
     def show_stats(self):
         """Affiche les statistiques d'utilisation des APIs"""
         print("\n📊 Statistiques d'utilisation des APIs:")
         print("=" * 50)
         for api, count in self.api_call_count.items():
-            print(f"{api.replace('_', ' ').title()}: {count} requêtes")
+            stats = self.ledger.stats(api)
+            remaining = self.ledger.remaining(api)
+            latency = f" | latence moy. {stats['latency_avg']:.2f}s / p95 {stats['latency_p95']:.2f}s" if stats['calls'] else ""
+            budget = "illimité" if remaining is None else f"{remaining} restants"
+            print(f"{api.replace('_', ' ').title()}: {count} requêtes ({budget}, erreurs {stats['error_rate']:.0%}){latency}")
+        cache = self.quote_cache.stats()
+        print(f"Cache: {cache['hits']} hits, {cache['misses']} miss, {cache['coalesced']} regroupés, "
+              f"{cache['stale_served']} servis expirés ({cache['refreshes']} rafraîchissements), {cache['size']} cours")
         print("=" * 50)
 
 
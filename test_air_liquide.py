@@ -1,4 +1,3 @@
-import yfinance as yf
 import pandas as pd
 import pandas_ta as ta
 import sys
@@ -7,11 +6,12 @@ import os
 # Ajouter le chemin du projet pour pouvoir importer core
 sys.path.append('/home/corentin/trade-analyser-bourse')
 from core.analysis import analyze_stock
+from core.data_source import get_ticker
 
 def test_air_liquide():
     symbol = "AI.PA"
     print(f"--- Test de récupération des données pour {symbol} ---")
-    ticker = yf.Ticker(symbol)
+    ticker = get_ticker(symbol)
     df = ticker.history(period="1y", timeout=20)
     
     if df is None or df.empty:
@@ -1,10 +1,11 @@
 import yfinance as yf
 import pandas as pd
 from datetime import datetime
-import json
-import os
 import sys # Ajout de l'import de sys
 
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.event_store import get_event_store
+
 def get_market_data(symbol):
     print(f"--- Analyse Intraday pour {symbol} ---")
     ticker = yf.Ticker(symbol)
@@ -34,26 +35,13 @@ def detect_significant_events(df, symbol, volume_threshold=1.5, price_threshold=
             events.append(event)
     return events
 
-def save_to_memory(new_events, memory_file="market_memory.json"):
-    memory_path = os.path.join("/home/corentin/trade-analyser-bourse", memory_file)
-    if os.path.exists(memory_path):
-        with open(memory_path, 'r') as f:
-            memory = json.load(f)
-    else:
-        memory = []
-    
-    # Créer un ensemble de clés uniques (symbole, temps) pour les événements déjà mémorisés
-    existing_unique_keys = {(e['symbol'], e['time']) for e in memory if 'symbol' in e and 'time' in e}
-    added = 0
+def save_to_memory(new_events):
+    # Journal d'événements : les doublons (symbole, heure, type) sont ignorés à l'insertion
+    store = get_event_store()
     for e in new_events:
-        unique_key = (e['symbol'], e['time']) # Création de la clé unique pour le nouvel événement
-        if unique_key not in existing_unique_keys:
-            memory.append(e)
-            added += 1
-            
-    with open(memory_path, 'w') as f:
-        json.dump(memory, f, indent=4)
-    print(f"✓ {added} nouveaux événements mémorisés dans {memory_file}.")
+        store.append(e)
+    store.flush()
+    print(f"✓ {len(new_events)} événements transmis au journal d'événements.")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
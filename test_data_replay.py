@@ -0,0 +1,37 @@
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.data_source import Archive, RecordingSource, ReplaySource, set_data_source
+from core.ml_processor import MLPredictor
+
+def record_replay_fetch_data(symbol):
+    """Enregistre MLPredictor.fetch_data (réseau) puis le rejoue hors-ligne : l'historique doit être identique."""
+    root = tempfile.mkdtemp(prefix="replay_check_")
+    try:
+        archive = Archive(root)
+        predictor = MLPredictor()
+
+        set_data_source(RecordingSource(archive))
+        recorded = predictor.fetch_data(symbol)
+        assert not recorded.empty, f"Aucun historique téléchargé pour {symbol}"
+
+        # start/end sont recalculés depuis datetime.now() : la clé de l'archive doit rester la même
+        time.sleep(0.01)
+        set_data_source(ReplaySource(archive))
+        replayed = predictor.fetch_data(symbol)
+        assert replayed.equals(recorded), "Le rejeu ne retrouve pas l'historique enregistré"
+        print(f"✅ {symbol} : {len(replayed)} séances rejouées à l'identique")
+    finally:
+        set_data_source(None)
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vérifie l'aller-retour enregistrement -> rejeu de fetch_data")
+    parser.add_argument("--symbol", default="AI.PA", help="Symbole à enregistrer")
+    args = parser.parse_args()
+    record_replay_fetch_data(args.symbol)
@@ -0,0 +1,56 @@
+import sys
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.news_store import dedupe, jaccard, strip_publisher, title_features, TITLE_SIMILARITY
+
+# Même article repris par plusieurs sources (titre Google News avec suffixe, reformulations mineures)
+SAME_STORY = [
+    ("TotalEnergies relève son dividende après un trimestre record",
+     "TotalEnergies relève son dividende après un trimestre record - Les Echos"),
+    ("Airbus a livré 63 avions en septembre, en ligne avec ses objectifs",
+     "Airbus livre 63 avions en septembre, en ligne avec ses objectifs - Boursorama"),
+    ("LVMH : les ventes du troisième trimestre reculent en Chine",
+     "LVMH : les ventes du troisième trimestre 2026 reculent en Chine - Le Figaro"),
+    ("Schneider Electric relève ses objectifs annuels après un solide semestre",
+     "Schneider Electric relève ses objectifs annuels après un semestre solide | Zonebourse"),
+    ("Stellantis rappelle 1,2 million de véhicules aux États-Unis",
+     "Stellantis rappelle 1,2 million de véhicules aux Etats-Unis - BFM Bourse"),
+]
+
+# Articles différents sur la même valeur : ne doivent pas être fusionnés
+DIFFERENT_STORIES = [
+    ("TotalEnergies relève son dividende après un trimestre record",
+     "TotalEnergies abaisse son dividende après un trimestre décevant"),
+    ("Airbus a livré 63 avions en septembre",
+     "Airbus remporte une commande de 40 avions auprès d'IndiGo"),
+    ("LVMH : les ventes du troisième trimestre reculent en Chine",
+     "LVMH nomme un nouveau directeur financier"),
+]
+
+def test_publisher_suffix():
+    assert strip_publisher("TotalEnergies relève son dividende - Les Echos", "Les Echos") == "TotalEnergies relève son dividende"
+    # Tiret faisant partie du titre : conservé
+    assert strip_publisher("CAC 40 - la Bourse de Paris recule") == "CAC 40 - la Bourse de Paris recule"
+
+def test_cross_source_duplicates():
+    for a, b in SAME_STORY:
+        score = jaccard(title_features(a), title_features(b))
+        print(f"{score:.2f}  {a}  <->  {b}")
+        assert score >= TITLE_SIMILARITY, (a, b, score)
+
+def test_distinct_stories():
+    for a, b in DIFFERENT_STORIES:
+        score = jaccard(title_features(a), title_features(b))
+        print(f"{score:.2f}  {a}  <->  {b}")
+        assert score < TITLE_SIMILARITY, (a, b, score)
+
+def test_dedupe():
+    titles = [title for pair in SAME_STORY for title in pair]
+    items = [{'title': title, 'link': f"https://example.com/{i}"} for i, title in enumerate(titles)]
+    assert len(dedupe(items)) == len(SAME_STORY)
+
+if __name__ == "__main__":
+    for test in (test_publisher_suffix, test_cross_source_duplicates, test_distinct_stories, test_dedupe):
+        test()
+    print("✅ Déduplication des actualités : OK")
@@ -0,0 +1,33 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Ajouter le chemin du projet pour pouvoir importer core
+sys.path.append('/home/corentin/trade-analyser-bourse')
+from core.portfolio import simulate_portfolio
+
+def holiday_panel(n_symbols=10, n_bars=40, seed=0):
+    """Panel de cours où S0, détenu, n'a pas de séance le jour d'un rebalancement (barre 5)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2020-01-01', periods=n_bars)
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_bars, n_symbols)), axis=0)),
+                         index=dates, columns=[f"S{i}" for i in range(n_symbols)])
+    close.iloc[5, 0] = np.nan
+    return close
+
+def test_no_leverage_on_holiday():
+    close = holiday_panel()
+    signals = pd.DataFrame(True, index=close.index, columns=close.columns)
+    for sector_cap in (None, 0.30):
+        sectors = {symbol: f"Secteur {i % 3}" for i, symbol in enumerate(close.columns)}
+        result = simulate_portfolio(close, signals, sectors=sectors, rebalance=1, max_weight=0.2, sector_cap=sector_cap)
+        assert (result['cash'] >= -1e-6).all(), result['cash'].min()
+        assert (result['weights'].sum(axis=1) <= 1 + 1e-9).all(), result['weights'].sum(axis=1).max()
+        if sector_cap is not None:
+            by_sector = result['weights'].T.groupby(sectors).sum()
+            assert (by_sector <= sector_cap + 1e-9).all().all(), by_sector.max().max()
+
+if __name__ == "__main__":
+    test_no_leverage_on_holiday()
+    print("✅ Portefeuille : pas de découvert lors d'un jour férié")
@@ -1,9 +1,9 @@
 import os
 import sqlite3
 import pandas as pd
-import yfinance as yf
 import time
 from app import analyze_stock
+from core.data_source import get_ticker
 
 DB_NAME = "users.db"
 
@@ -23,7 +23,7 @@ def verify_cac40():
     for symbol, name in cac40_symbols:
         print(f"🔍 Test de {symbol} ({name})...", end=" ", flush=True)
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = get_ticker(symbol)
             df = ticker.history(period="1mo")
             if df is None or df.empty:
                 print("❌ AUCUNE DONNÉE")